@@ -1,16 +1,10 @@
 #!/usr/bin/env bash
-# Probe canary URLs and report cacheability signals (HTTP status, x-vercel-cache,
-# age, cache-control, CSP presence) — the before/after gauge for the
-# static-rendering migration. Usage: bash scripts/cache-probe.sh [base-url]
-# Default base is production. The goal of the migration: x-vercel-cache flips
-# from MISS (every hit runs a function) to HIT on the content routes below.
+# Report cacheability signals (HTTP status, x-vercel-cache, age, cache-control,
+# CSP presence, TTFB) for every URL in the sitemaps — the before/after gauge
+# for the static-rendering migration, aggregated as HIT ratio per route
+# pattern and locale. Usage: bash scripts/cache-probe.sh [base-url] [--canary]
+# Default base is production; --canary probes only the original six URLs.
+# The goal of the migration: x-vercel-cache flips from MISS (every hit runs a
+# function) to HIT on the content routes. See mobile_harness/cache_probe.py.
 set -euo pipefail
-BASE="${1:-https://monkeytravel.app}"
-URLS=("/" "/it" "/blog" "/destinations/paris" "/explore" "/free-ai-trip-planner")
-for path in "${URLS[@]}"; do
-  echo "### ${BASE}${path}"
-  curl -sI "${BASE}${path}" \
-    | grep -iE '^(HTTP|x-vercel-cache|age|cache-control|content-security-policy):' \
-    || true
-  echo
-done
+exec python3 "$(dirname "$0")/mobile-harness.py" probe "$@"
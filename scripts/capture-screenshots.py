@@ -4,8 +4,9 @@ Capture app screenshots for landing page phone mockups.
 Screenshots are saved to public/screenshots/ directory.
 """
 
-from playwright.sync_api import sync_playwright
-import time
+from mobile_harness import IPHONE_14_PRO, open_page, wait_for_ready
+from mobile_harness.config import HARNESS_HOME
+from mobile_harness.image_audit import ImageAudit
 
 # Output directory
 OUTPUT_DIR = "/mnt/c/Users/Samsung/Documents/Projects/travel-app-web/public/screenshots"
@@ -19,74 +20,72 @@ SHARED_TRIPS = {
 }
 
 def capture_screenshots():
-    with sync_playwright() as p:
-        # Launch browser with iPhone 14 Pro viewport (for realistic phone mockups)
-        browser = p.chromium.launch(headless=True)
-
-        # iPhone 14 Pro dimensions: 393 x 852 (actual render: 1179 x 2556 with 3x scale)
-        context = browser.new_context(
-            viewport={"width": 393, "height": 852},
-            device_scale_factor=3,  # Retina display
-            is_mobile=True,
-            has_touch=True
-        )
-        page = context.new_page()
-
+    # iPhone 14 Pro dimensions: 393 x 852 (actual render: 1179 x 2556 with 3x scale)
+    with open_page(IPHONE_14_PRO) as page:
+        # Image bytes / format / sizing per route at DPR 3 (landing, /shared/*, /templates)
+        images = ImageAudit(page, IPHONE_14_PRO)
         # 1. Capture landing page hero section
         print("1. Capturing landing page...")
         page.goto("http://localhost:3000")
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(1000)  # Extra wait for animations
+        wait_for_ready(page)  # Fonts, images and animations settled
         page.screenshot(path=f"{OUTPUT_DIR}/landing-hero.png", full_page=False)
         print("   Saved: landing-hero.png")
+        images.audit()
 
         # 2. Capture shared Barcelona trip - full page with itinerary
         print("2. Capturing Barcelona trip (hero)...")
         page.goto(f"http://localhost:3000/shared/{SHARED_TRIPS['barcelona']}")
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)  # Wait for images and animations
+        wait_for_ready(page)  # Images decoded, animations finished
         page.screenshot(path=f"{OUTPUT_DIR}/trip-barcelona-hero.png", full_page=False)
         print("   Saved: trip-barcelona-hero.png")
 
         # Scroll to itinerary section and capture
         print("3. Capturing Barcelona trip (itinerary)...")
         page.evaluate("window.scrollTo(0, 800)")
-        page.wait_for_timeout(500)
+        wait_for_ready(page)
         page.screenshot(path=f"{OUTPUT_DIR}/trip-barcelona-itinerary.png", full_page=False)
         print("   Saved: trip-barcelona-itinerary.png")
 
         # Scroll more to see activities
         print("4. Capturing Barcelona trip (activities)...")
         page.evaluate("window.scrollTo(0, 1500)")
-        page.wait_for_timeout(500)
+        wait_for_ready(page)
         page.screenshot(path=f"{OUTPUT_DIR}/trip-barcelona-activities.png", full_page=False)
         print("   Saved: trip-barcelona-activities.png")
+        images.audit()
 
         # 3. Capture Porto trip
         print("5. Capturing Porto trip...")
         page.goto(f"http://localhost:3000/shared/{SHARED_TRIPS['porto']}")
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        wait_for_ready(page)
         page.screenshot(path=f"{OUTPUT_DIR}/trip-porto-hero.png", full_page=False)
         print("   Saved: trip-porto-hero.png")
+        images.audit()
 
         # 4. Capture Lisbon trip
         print("6. Capturing Lisbon trip...")
         page.goto(f"http://localhost:3000/shared/{SHARED_TRIPS['lisbon']}")
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        wait_for_ready(page)
         page.screenshot(path=f"{OUTPUT_DIR}/trip-lisbon-hero.png", full_page=False)
         print("   Saved: trip-lisbon-hero.png")
+        images.audit()
 
         # 5. Capture templates page
         print("7. Capturing templates page...")
         page.goto("http://localhost:3000/templates")
         page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(1000)
+        wait_for_ready(page)
         page.screenshot(path=f"{OUTPUT_DIR}/templates.png", full_page=False)
         print("   Saved: templates.png")
+        images.audit()
+
+        images.print_summary()
+        print(f"   Report: {images.write(str(HARNESS_HOME / 'image-audit' / 'capture-screenshots.json'))}")
 
-        browser.close()
         print("\nDone! Screenshots saved to public/screenshots/")
         print("\nRecommended usage:")
         print("  hero: trip-barcelona-hero.png or trip-porto-hero.png")
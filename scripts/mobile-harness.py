@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+Mobile UI harness CLI. See scripts/README.md ("Mobile UI harness") and
+`python3 scripts/mobile-harness.py --help`.
+"""
+
+import sys
+
+from mobile_harness.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Shared Playwright harness for the Python mobile UI scripts in scripts/.
+
+The scripts run as `python3 scripts/<name>.py`, which puts scripts/ on
+sys.path, so they import this package directly:
+
+    from mobile_harness import BrowserPool, FINAL_VIEWPORTS
+
+The Playwright-backed exports load on first use, so Playwright-free tools
+(cache_probe, the store and diff commands) run without it installed.
+"""
+
+from .devices import (
+    DESKTOP,
+    FINAL_VIEWPORTS,
+    IPHONE_14,
+    IPHONE_14_PRO,
+    IPHONE_14_PRO_SAFARI,
+    MATRICES,
+    MODAL_VIEWPORTS,
+    DeviceProfile,
+    find_profile,
+)
+from .readiness import ReadinessTimeout, async_wait_for_ready, track_network, wait_for_ready
+
+_LAZY = {
+    "AsyncBrowserPool": "async_runner",
+    "JobResult": "async_runner",
+    "run_matrix": "async_runner",
+    "BrowserPool": "browser_pool",
+    "open_page": "browser_pool",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
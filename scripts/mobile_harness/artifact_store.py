@@ -0,0 +1,191 @@
+"""
+Content-addressed, deduplicating screenshot store.
+
+Many captures are byte-identical run to run (/auth/login, unchanged wizard
+steps), yet every run used to write and upload fresh files. The store keeps
+each distinct blob once, under its SHA-256:
+
+    <root>/blobs/ab/abcdef....png
+    <root>/runs/<script>/<run_id>.json    {"entries": {"<viewport>/<step>": {"hash": ..}}}
+
+A run manifest maps (script, viewport, step) to a hash, so "what changed
+since the last run" is a dict comparison between two small JSON files —
+no image is reopened. Blobs are copied, never hard-linked: the scripts
+rewrite their capture files in place on the next run.
+
+`gc` can run while another process ingests. It never deletes a `*.tmp`
+file (a put in progress), or a blob written or re-put within `grace`
+seconds: a run's blobs exist before its manifest is saved.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from .config import HARNESS_HOME
+
+STORE_ROOT = HARNESS_HOME / "store"
+CHUNK = 1 << 20
+GC_GRACE = 3600
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def split_capture_name(filename, profile_names):
+    """'iphone_se_step2.png' -> ('iphone_se', 'step2'), matching the longest profile prefix."""
+    stem = os.path.splitext(filename)[0]
+    for name in sorted(profile_names, key=len, reverse=True):
+        if stem.startswith(name + "_"):
+            return name, stem[len(name) + 1:]
+    return None, stem
+
+
+def _new_run_id():
+    now = time.time()
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"{int(now * 1000) % 1000:03d}-{os.getpid()}"
+
+
+class RunManifest:
+    def __init__(self, store, script, run_id=None, entries=None, created=None):
+        self.store = store
+        self.script = script
+        self.run_id = run_id or _new_run_id()
+        self.entries = entries or {}
+        self.created = created or time.time()
+
+    @property
+    def path(self):
+        return self.store.runs_dir(self.script) / f"{self.run_id}.json"
+
+    def add(self, viewport, step, source_path):
+        digest, size = self.store.put_file(source_path)
+        self.entries[f"{viewport}/{step}"] = {"hash": digest, "size": size, "source": str(source_path)}
+        return digest
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "script": self.script,
+                "run_id": self.run_id,
+                "created": self.created,
+                "entries": self.entries,
+            }, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        return self.path
+
+
+class ArtifactStore:
+    def __init__(self, root=STORE_ROOT):
+        self.root = root
+        self.blobs = root / "blobs"
+
+    def runs_dir(self, script):
+        return self.root / "runs" / script
+
+    def blob_path(self, digest, ext=".png"):
+        return self.blobs / digest[:2] / f"{digest}{ext}"
+
+    def put_file(self, path):
+        """Store a file's content once; returns (hash, size)."""
+        digest = file_hash(path)
+        blob = self.blob_path(digest, os.path.splitext(str(path))[1] or ".bin")
+        if blob.exists():
+            # restart gc's grace period: a run being ingested now refers to it
+            os.utime(blob)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(blob.name + f".{os.getpid()}.tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, blob)
+        return digest, os.path.getsize(path)
+
+    def begin_run(self, script):
+        return RunManifest(self, script)
+
+    def run_ids(self, script):
+        directory = self.runs_dir(script)
+        if not directory.exists():
+            return []
+        return sorted(p.stem for p in directory.glob("*.json"))
+
+    def load_run(self, script, run_id):
+        with open(self.runs_dir(script) / f"{run_id}.json", encoding="utf-8") as f:
+            data = json.load(f)
+        return RunManifest(self, script, data["run_id"], data["entries"], data["created"])
+
+    def previous_run(self, run):
+        """The newest run of the same script recorded before `run`, if any."""
+        earlier = [r for r in self.run_ids(run.script) if r < run.run_id]
+        return self.load_run(run.script, earlier[-1]) if earlier else None
+
+    def changes(self, run, since=None):
+        """Diff `run` against `since` (default: the previous run of the same script)."""
+        since = since or self.previous_run(run)
+        old = since.entries if since else {}
+        new = run.entries
+        return {
+            "since": since.run_id if since else None,
+            "added": sorted(k for k in new if k not in old),
+            "removed": sorted(k for k in old if k not in new),
+            "changed": sorted(k for k in new if k in old and new[k]["hash"] != old[k]["hash"]),
+            "unchanged": sorted(k for k in new if k in old and new[k]["hash"] == old[k]["hash"]),
+        }
+
+    def ingest_dir(self, directory, script, profile_names, since=None):
+        """Record every PNG in `directory` (modified after `since`, if given) as a run."""
+        run = self.begin_run(script)
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.lower().endswith(".png"):
+                continue
+            if since and os.path.getmtime(path) < since:
+                continue
+            viewport, step = split_capture_name(name, profile_names)
+            run.add(viewport or "-", step, path)
+        run.save()
+        return run
+
+    def gc(self, keep_runs=20, grace=GC_GRACE):
+        """Drop all but the newest `keep_runs` runs per script and unreferenced blobs
+        older than `grace` seconds; `*.tmp` files are left alone."""
+        referenced = set()
+        runs_root = self.root / "runs"
+        for script_dir in (runs_root.iterdir() if runs_root.exists() else []):
+            run_ids = self.run_ids(script_dir.name)
+            for stale in run_ids[:-keep_runs] if keep_runs else run_ids:
+                (script_dir / f"{stale}.json").unlink()
+            for run_id in self.run_ids(script_dir.name):
+                referenced.update(e["hash"] for e in self.load_run(script_dir.name, run_id).entries.values())
+        removed = 0
+        cutoff = time.time() - grace
+        for blob in (self.blobs.glob("*/*") if self.blobs.exists() else []):
+            if blob.suffix == ".tmp" or blob.name.split(".")[0] in referenced:
+                continue
+            try:
+                if blob.stat().st_mtime > cutoff:
+                    continue
+                blob.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+        return removed
+
+
+def print_changes(changes):
+    since = changes["since"] or "no previous run"
+    print(f"\n🗂  Artifact store: vs {since} — "
+          f"{len(changes['changed'])} changed, {len(changes['added'])} new, "
+          f"{len(changes['removed'])} gone, {len(changes['unchanged'])} unchanged")
+    for label in ("changed", "added", "removed"):
+        for key in changes[label]:
+            print(f"   {label}: {key}")
@@ -0,0 +1,168 @@
+"""
+Concurrent matrix runner on `playwright.async_api`.
+
+The sync scripts walk viewport after viewport, flow after flow, so a
+5-viewport x 4-flow run costs the sum of every flow. Here each
+(profile, flow) pair is a job; jobs share one warm browser and run
+concurrently up to `concurrency` (default: one per job, capped at the CPU
+count), so the run takes roughly as long as the slowest job.
+
+A flow is `async def flow(page, profile) -> value`. Each job gets its own
+page in an isolated context by default, since flows that run side by side
+must not share cookies/localStorage (the onboarding flow needs empty localStorage).
+
+    results = run_matrix(MODAL_VIEWPORTS, [("wizard", wizard)], concurrency=5)
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from playwright.async_api import async_playwright
+
+from .devices import DeviceProfile
+from .page_errors import flush_errors, track_errors
+from .readiness import track_network
+from .throttling import async_apply_throttling, default_mode
+
+
+@dataclass
+class JobResult:
+    profile: DeviceProfile
+    flow: str
+    value: object = None
+    error: BaseException | None = None
+    duration: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class AsyncBrowserPool:
+    """Async twin of BrowserPool: one browser, one warm context per profile."""
+
+    def __init__(self, profiles=(), headless=True, launch_options=None, throttle=None):
+        self.profiles = list(profiles)
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self.throttle = throttle or default_mode()
+        self._playwright = None
+        self.browser = None
+        self._contexts = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if self.browser:
+            return self
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(
+            headless=self.headless, **self.launch_options,
+        )
+        await asyncio.gather(*(self.context(profile) for profile in self.profiles))
+        return self
+
+    async def close(self):
+        for context in self._contexts.values():
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        flush_errors()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def context(self, profile):
+        async with self._lock:
+            context = self._contexts.get(profile.name)
+            if context is None:
+                context = await self.browser.new_context(**profile.context_options())
+                self._contexts[profile.name] = context
+            return context
+
+    @asynccontextmanager
+    async def page(self, profile, timeout=None, isolated=False, setup=None):
+        """Borrow a page; `isolated=True` gives it a throwaway context of its own.
+
+        `await setup(context)` runs on that throwaway context before the page
+        opens (HAR routing, init scripts, ...); it implies `isolated`. A
+        `setup.context_options` dict is passed to new_context.
+        """
+        isolated = isolated or setup is not None
+        if isolated:
+            options = {**profile.context_options(), **getattr(setup, "context_options", {})}
+            context = await self.browser.new_context(**options)
+            if setup:
+                await setup(context)
+        else:
+            context = await self.context(profile)
+        page = await context.new_page()
+        track_network(page)
+        track_errors(page, profile.name)
+        await async_apply_throttling(page, profile, self.throttle)
+        if timeout:
+            page.set_default_timeout(timeout)
+        try:
+            yield page
+        finally:
+            await page.close()
+            if isolated:
+                await context.close()
+
+
+def default_concurrency(jobs):
+    """One slot per job, capped at the CPU count."""
+    return min(len(jobs), os.cpu_count() or 1) or 1
+
+
+async def run_jobs(pool, jobs, concurrency=None, timeout=None, isolated=True, setup=None):
+    """Run (profile, flow_name, flow) jobs with at most `concurrency` in flight.
+
+    `setup(profile, flow_name)` may return an async context hook for a job.
+    """
+    jobs = list(jobs)
+    semaphore = asyncio.Semaphore(max(1, concurrency or default_concurrency(jobs)))
+
+    async def run_one(profile, flow_name, flow):
+        async with semaphore:
+            result = JobResult(profile, flow_name)
+            started = time.perf_counter()
+            try:
+                job_setup = setup(profile, flow_name) if setup else None
+                async with pool.page(profile, timeout=timeout, isolated=isolated,
+                                     setup=job_setup) as page:
+                    result.value = await flow(page, profile)
+            except Exception as e:
+                result.error = e
+            result.duration = time.perf_counter() - started
+            return result
+
+    return await asyncio.gather(*(run_one(*job) for job in jobs))
+
+
+async def run_matrix_async(profiles, flows, concurrency=None, timeout=None, headless=True,
+                           setup=None, throttle=None):
+    jobs = [(profile, name, flow) for profile in profiles for name, flow in flows]
+    async with AsyncBrowserPool(headless=headless, throttle=throttle) as pool:
+        return await run_jobs(pool, jobs, concurrency=concurrency, timeout=timeout, setup=setup)
+
+
+def run_matrix(profiles, flows, concurrency=None, timeout=None, headless=True, setup=None, throttle=None):
+    """Run every flow on every profile; results come back in matrix order."""
+    return asyncio.run(run_matrix_async(
+        profiles, flows, concurrency=concurrency, timeout=timeout, headless=headless,
+        setup=setup, throttle=throttle,
+    ))
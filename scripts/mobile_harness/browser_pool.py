@@ -0,0 +1,126 @@
+"""
+Warm browser + per-profile context pool.
+
+The scripts used to call `p.chromium.launch()` once per viewport, paying the
+full Chromium cold start for every entry in the matrix. A BrowserPool
+launches the browser once and keeps one preconfigured context per device
+profile; scripts borrow pages from it:
+
+    with BrowserPool(FINAL_VIEWPORTS) as pool:
+        for profile in FINAL_VIEWPORTS:
+            with pool.page(profile, timeout=20000) as page:
+                page.goto(...)
+
+Contexts are created eagerly for the profiles passed to the constructor and
+lazily for anything else. Use `fresh=True` (or `pool.reset(profile)`) when a
+flow needs empty cookies/localStorage — recreating a context is cheap, the
+browser launch is what we're avoiding.
+
+With `throttle` (a throttling.MODES value; default $HARNESS_THROTTLE) every
+borrowed page gets its profile's CPU and network emulation.
+
+Every borrowed page records console errors, page errors and failed
+requests into the page_errors index, which is saved when the pool closes.
+"""
+
+from contextlib import contextmanager
+
+from playwright.sync_api import sync_playwright
+
+from .page_errors import flush_errors, track_errors
+from .readiness import track_network
+from .throttling import apply_throttling, default_mode
+
+
+class BrowserPool:
+    def __init__(self, profiles=(), headless=True, launch_options=None, throttle=None):
+        self.profiles = list(profiles)
+        self.headless = headless
+        self.launch_options = launch_options or {}
+        self.throttle = throttle or default_mode()
+        self._playwright = None
+        self.browser = None
+        self._contexts = {}
+
+    def start(self):
+        if self.browser:
+            return self
+        self._playwright = sync_playwright().start()
+        self.browser = self._playwright.chromium.launch(
+            headless=self.headless, **self.launch_options,
+        )
+        for profile in self.profiles:
+            self.context(profile)
+        return self
+
+    def close(self):
+        for context in self._contexts.values():
+            try:
+                context.close()
+            except Exception:
+                pass
+        self._contexts.clear()
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self._playwright:
+            self._playwright.stop()
+            self._playwright = None
+        flush_errors()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def context(self, profile):
+        """Return the warm context for `profile`, creating it on first use."""
+        context = self._contexts.get(profile.name)
+        if context is None:
+            context = self.browser.new_context(**profile.context_options())
+            self._contexts[profile.name] = context
+        return context
+
+    def reset(self, profile):
+        """Drop the profile's context so the next borrow starts with clean storage."""
+        context = self._contexts.pop(profile.name, None)
+        if context:
+            context.close()
+
+    @contextmanager
+    def page(self, profile, timeout=None, fresh=False, setup=None):
+        """Borrow a new page in the profile's context; closed on exit.
+
+        `setup(context)` gets a throwaway context of its own (closed with the
+        page) for per-flow context state such as HAR routing; a
+        `setup.context_options` dict is passed to new_context.
+        """
+        if fresh:
+            self.reset(profile)
+        if setup:
+            options = {**profile.context_options(), **getattr(setup, "context_options", {})}
+            context = self.browser.new_context(**options)
+            setup(context)
+        else:
+            context = self.context(profile)
+        page = context.new_page()
+        track_network(page)
+        track_errors(page, profile.name)
+        apply_throttling(page, profile, self.throttle)
+        if timeout:
+            page.set_default_timeout(timeout)
+        try:
+            yield page
+        finally:
+            page.close()
+            if setup:
+                context.close()
+
+
+@contextmanager
+def open_page(profile, timeout=None, headless=True, setup=None, throttle=None):
+    """One-shot helper for single-page scripts: warm pool of one, one page."""
+    with BrowserPool([profile], headless=headless, throttle=throttle) as pool:
+        with pool.page(profile, timeout=timeout, setup=setup) as page:
+            yield page
@@ -0,0 +1,130 @@
+"""
+Declarative per-route performance budgets.
+
+Budgets live in mobile_harness/budgets.json: one entry per route glob
+(matched against the locale-stripped path, first match wins) with any of
+
+  lcp_ms          Largest Contentful Paint
+  js_bytes        script bytes transferred (encoded size when cached/opaque)
+  transfer_bytes  document + every resource
+  long_task_ms    summed long-task duration since navigation
+  dom_nodes       elements in the document
+
+Measuring is one evaluate per check. LCP and long tasks come from the
+vitals observers, so the page (or its context) needs `install_vitals`
+before navigation; without them those two limits are skipped.
+"""
+
+import fnmatch
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from urllib.parse import urlparse
+
+from .locales import DEFAULT_LOCALE, LOCALES
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+MEASURE_SCRIPT = """
+() => {
+  const v = window.__harnessVitals || {};
+  const nav = performance.getEntriesByType('navigation')[0];
+  const size = (e) => Math.max(e.transferSize || 0, e.encodedBodySize || 0);
+  let js = 0, transfer = nav ? size(nav) : 0;
+  for (const r of performance.getEntriesByType('resource')) {
+    transfer += size(r);
+    if (r.initiatorType === 'script' || /\\.m?js(\\?|$)/.test(r.name)) js += size(r);
+  }
+  return {
+    lcp_ms: v.lcp == null ? null : Math.round(v.lcp),
+    js_bytes: js,
+    transfer_bytes: transfer,
+    long_task_ms: v.longTaskMs == null ? null : Math.round(v.longTaskMs),
+    dom_nodes: document.getElementsByTagName('*').length,
+  };
+}
+"""
+
+UNITS = {
+    "lcp_ms": "ms",
+    "js_bytes": "B",
+    "transfer_bytes": "B",
+    "long_task_ms": "ms",
+    "dom_nodes": " nodes",
+}
+
+
+@dataclass
+class Budget:
+    route: str
+    lcp_ms: int | None = None
+    js_bytes: int | None = None
+    transfer_bytes: int | None = None
+    long_task_ms: int | None = None
+    dom_nodes: int | None = None
+
+    def limits(self):
+        return {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name != "route" and getattr(self, f.name) is not None}
+
+
+def load_budgets(path=BUDGETS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [Budget(**entry) for entry in json.load(f)["budgets"]]
+
+
+def route_path(url):
+    """Path of `url` with the locale prefix stripped: /it/trips/new -> /trips/new."""
+    path = urlparse(url).path or "/"
+    parts = path.split("/", 2)
+    if len(parts) > 1 and parts[1] in LOCALES and parts[1] != DEFAULT_LOCALE:
+        path = "/" + (parts[2] if len(parts) > 2 else "")
+    return path.rstrip("/") or "/"
+
+
+def budget_for(url, budgets):
+    path = route_path(url)
+    for budget in budgets:
+        if fnmatch.fnmatchcase(path, budget.route):
+            return budget
+    return None
+
+
+def violations(budget, measured):
+    """Human-readable list of limits `measured` exceeds."""
+    found = []
+    for metric, limit in budget.limits().items():
+        value = measured.get(metric)
+        if value is not None and value > limit:
+            unit = UNITS[metric]
+            found.append(f"Budget {budget.route} {metric}: {value}{unit} > {limit}{unit}")
+    return found
+
+
+class BudgetChecker:
+    """Checks pages against the budgets and remembers every violation."""
+
+    def __init__(self, budgets=None):
+        self.budgets = budgets if budgets is not None else load_budgets()
+        self.failures = []
+        # every check's raw measurements, budgeted route or not (results_db records them)
+        self.measurements = []
+
+    def _evaluate(self, url, profile, measured):
+        self.measurements.append({"url": url, "profile": profile.name, **measured})
+        budget = budget_for(url, self.budgets)
+        if budget is None:
+            return []
+        found = violations(budget, measured)
+        self.failures.extend({"url": url, "profile": profile.name, "violation": v} for v in found)
+        return found
+
+    def check(self, page, profile):
+        return self._evaluate(page.url, profile, page.evaluate(MEASURE_SCRIPT))
+
+    async def async_check(self, page, profile):
+        return self._evaluate(page.url, profile, await page.evaluate(MEASURE_SCRIPT))
+
+    @property
+    def exit_code(self):
+        return 1 if self.failures else 0
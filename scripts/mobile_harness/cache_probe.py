@@ -0,0 +1,287 @@
+"""
+Sitemap-driven edge-cache and TTFB prober.
+
+scripts/cache-probe.sh curled six hand-picked URLs, which says little about
+whether the static-rendering migration actually flipped the site's
+thousands of content pages from MISS to HIT. This prober streams every
+<loc> out of /sitemap.xml, /sitemap-trips.xml and /sitemap-creators.xml
+(sitemap indexes are followed), rewrites them onto the probed base URL and
+HEADs them from a thread pool, with at most two URLs per worker in flight
+so a large sitemap is never read ahead into memory. Each worker thread
+keeps one keep-alive connection per host, so thousands of probes reuse a
+few dozen TLS sessions.
+
+Per URL it records status, x-vercel-cache, age, cache-control, CSP
+presence and TTFB (request sent -> status line and headers parsed). A
+probe that had to open its connection records the TCP/TLS setup as
+connect_ms, outside TTFB, so a worker's first request to a host doesn't
+skew the percentiles. The summary aggregates HIT ratio and TTFB
+percentiles per route pattern (/blog/*, /destinations/*, ...) and per
+locale (en, /es, /it, /pt).
+
+Stdlib only: http.client + xml.etree.iterparse, no extra dependencies.
+"""
+
+import http.client
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from .locales import DEFAULT_LOCALE, LOCALES
+from .vitals import percentile
+
+SITEMAPS = ("/sitemap.xml", "/sitemap-trips.xml", "/sitemap-creators.xml")
+# The old cache-probe.sh canaries: the static-rendering migration's gauge.
+CANARY_PATHS = ("/", "/it", "/blog", "/destinations/paris", "/explore", "/free-ai-trip-planner")
+USER_AGENT = "monkeytravel-cache-probe/1.0"
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+@dataclass
+class ProbeResult:
+    url: str
+    path: str
+    status: int | None = None
+    cache: str | None = None
+    age: int | None = None
+    cache_control: str | None = None
+    csp: bool = False
+    ttfb_ms: float | None = None
+    connect_ms: float | None = None     # set when the probe opened its connection
+    error: str | None = None
+
+    @property
+    def route(self):
+        return route_pattern(self.path)
+
+    @property
+    def locale(self):
+        return path_locale(self.path)
+
+
+def path_locale(path):
+    first = path.split("/", 2)[1] if path.count("/") else ""
+    return first if first in LOCALES else DEFAULT_LOCALE
+
+
+def route_pattern(path):
+    """Locale-stripped first segment, with anything deeper collapsed: /it/blog/x -> /blog/*."""
+    parts = [p for p in path.split("/") if p]
+    if parts and parts[0] in LOCALES:
+        parts = parts[1:]
+    if not parts:
+        return "/"
+    return f"/{parts[0]}/*" if len(parts) > 1 else f"/{parts[0]}"
+
+
+def rebase(url, base_url):
+    """Move an absolute sitemap URL onto `base_url` (sitemaps always say production)."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    return base_url.rstrip("/") + path + (f"?{parts.query}" if parts.query else ""), path
+
+
+def stream_sitemap(url, base_url, timeout=30):
+    """Yield every page URL in a sitemap (or sitemap index) without loading it whole."""
+    request = Request(url, headers={"User-Agent": USER_AGENT})
+    with urlopen(request, timeout=timeout) as response:
+        children = []
+        for _, elem in ET.iterparse(response, events=("end",)):
+            if elem.tag == f"{SITEMAP_NS}loc":
+                children.append(elem.text.strip())
+            elif elem.tag == f"{SITEMAP_NS}url":
+                yield from children
+                children.clear()
+                elem.clear()
+            elif elem.tag == f"{SITEMAP_NS}sitemap":
+                nested = [rebase(c, base_url)[0] for c in children]
+                children.clear()
+                for child in nested:
+                    yield from stream_sitemap(child, base_url, timeout)
+                elem.clear()
+
+
+def sitemap_urls(base_url, sitemaps=SITEMAPS, limit=None):
+    """Deduplicated (url, path) pairs from every sitemap, rebased onto base_url."""
+    seen = set()
+    for sitemap in sitemaps:
+        try:
+            for loc in stream_sitemap(base_url.rstrip("/") + sitemap, base_url):
+                url, path = rebase(loc, base_url)
+                if url in seen:
+                    continue
+                seen.add(url)
+                yield url, path
+                if limit and len(seen) >= limit:
+                    return
+        except (OSError, ET.ParseError) as e:
+            print(f"  ⚠️  {sitemap}: {e}")
+
+
+class ConnectionPool:
+    """One keep-alive connection per (thread, scheme, host)."""
+
+    def __init__(self, timeout=15):
+        self.timeout = timeout
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme, netloc, fresh=False):
+        conns = self._local.__dict__.setdefault("conns", {})
+        key = (scheme, netloc)
+        if fresh and key in conns:
+            conns.pop(key).close()
+        if key not in conns:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conns[key] = cls(netloc, timeout=self.timeout)
+            with self._lock:
+                self._all.append(conns[key])
+        return conns[key]
+
+    def head(self, url):
+        """(status, headers, ttfb_ms, connect_ms); retries once on a dropped keep-alive connection.
+
+        connect_ms is None when an open connection was reused.
+        """
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                connect = None
+                if conn.sock is None:
+                    started = time.perf_counter()
+                    conn.connect()
+                    connect = (time.perf_counter() - started) * 1000
+                started = time.perf_counter()
+                conn.request("HEAD", target, headers={"User-Agent": USER_AGENT})
+                response = conn.getresponse()
+                ttfb = (time.perf_counter() - started) * 1000
+                response.read()
+                return response.status, response.headers, ttfb, connect
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest,
+                    ConnectionResetError, BrokenPipeError):
+                if attempt:
+                    raise
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+def probe(pool, url, path):
+    result = ProbeResult(url, path)
+    try:
+        status, headers, ttfb, connect = pool.head(url)
+    except (OSError, http.client.HTTPException) as e:
+        result.error = str(e) or type(e).__name__
+        return result
+    age = headers.get("age")
+    result.status = status
+    result.cache = headers.get("x-vercel-cache")
+    result.age = int(age) if age and age.isdigit() else None
+    result.cache_control = headers.get("cache-control")
+    result.csp = "content-security-policy" in headers
+    result.ttfb_ms = round(ttfb, 1)
+    result.connect_ms = round(connect, 1) if connect is not None else None
+    return result
+
+
+def probe_all(pairs, workers=32, timeout=15, on_result=None):
+    """Probe (url, path) pairs on `workers` threads; results in input order.
+
+    `pairs` is consumed lazily: at most workers * 2 probes are in flight,
+    and `on_result` sees each result as it completes.
+    """
+    pool = ConnectionPool(timeout)
+    pairs = iter(pairs)
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+
+            def submit(n):
+                for _, (url, path) in zip(range(n), pairs):
+                    pending[executor.submit(probe, pool, url, path)] = len(results) + len(pending)
+
+            submit(workers * 2)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = results[pending.pop(future)] = future.result()
+                    if on_result:
+                        on_result(result)
+                submit(len(done))
+    finally:
+        pool.close()
+    return [results[i] for i in range(len(results))]
+
+
+def _aggregate(results):
+    cache = [r.cache for r in results if r.cache]
+    ttfb = [r.ttfb_ms for r in results]
+    connect = [r.connect_ms for r in results]
+    return {
+        "n": len(results),
+        "errors": sum(1 for r in results if r.error),
+        "non_200": sum(1 for r in results if r.status and r.status != 200),
+        "hit": cache.count("HIT"),
+        "stale": cache.count("STALE"),
+        "miss": cache.count("MISS"),
+        "hit_ratio": round(cache.count("HIT") / len(cache), 3) if cache else None,
+        "ttfb_p50": percentile(ttfb, 50),
+        "ttfb_p95": percentile(ttfb, 95),
+        "connects": sum(1 for c in connect if c is not None),
+        "connect_p50": percentile(connect, 50),
+    }
+
+
+def summarize(results):
+    def group(key):
+        groups = {}
+        for r in results:
+            groups.setdefault(key(r), []).append(r)
+        return {name: _aggregate(rows) for name, rows in sorted(groups.items())}
+
+    return {
+        "overall": _aggregate(results),
+        "by_route": group(lambda r: r.route),
+        "by_locale": group(lambda r: r.locale),
+    }
+
+
+def write_report(results, summary, path, base_url):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "base_url": base_url,
+            "generated": time.time(),
+            "summary": summary,
+            "results": [asdict(r) for r in results],
+        }, f, indent=2)
+    return path
+
+
+def print_summary(summary):
+    def fmt(name, s):
+        ratio = f"{s['hit_ratio']:.0%}" if s["hit_ratio"] is not None else "  -"
+        ttfb = (f"p50 {s['ttfb_p50']:.0f}ms  p95 {s['ttfb_p95']:.0f}ms"
+                if s["ttfb_p50"] is not None else "")
+        extra = f"  ({s['errors']} errors, {s['non_200']} non-200)" if s["errors"] or s["non_200"] else ""
+        return f"  {name:32} {s['n']:6}  HIT {ratio:>4}  {ttfb}{extra}"
+
+    print("\nBy route:")
+    for name, stats in summary["by_route"].items():
+        print(fmt(name, stats))
+    print("\nBy locale:")
+    for name, stats in summary["by_locale"].items():
+        print(fmt(name, stats))
+    print("\n" + fmt("overall", summary["overall"]))
@@ -0,0 +1,153 @@
+"""
+Storage-state checkpoints at flow steps.
+
+A checkpoint saves what the browser holds at a step — cookies and
+localStorage (Playwright's storage_state), sessionStorage, and the URL to
+resume from — under CHECKPOINT_ROOT/<scope>/<profile>/<name>.json, so a
+later run restores it and starts there instead of replaying the UI.
+flow_engine `checkpoint` steps save them and `resume=<name>` restores one
+(mobile_harness/onboarding.py checkpoints every /onboarding step).
+
+Restoring works on a fresh page: cookies go into its context, and an init
+script seeds localStorage/sessionStorage once per tab (marked in
+sessionStorage) before any app code runs, then the page opens the URL.
+
+Only pages that keep their progress in storage can be checkpointed. The
+/onboarding page does (currentStep and the answers so far, in
+localStorage). The /trips/new wizard does not: destination, dates and
+vibes are React state, saved only as a draft at Generate, so wizard flows
+always replay from the start.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+
+from .config import HARNESS_HOME
+from .readiness import async_wait_for_ready, wait_for_ready
+
+CHECKPOINT_ROOT = HARNESS_HOME / "checkpoints"
+DEFAULT_MAX_AGE = 24 * 3600
+
+SESSION_SCRIPT = "() => Object.entries(sessionStorage)"
+
+SEED_SCRIPT = """
+(() => {
+  const state = %s;
+  try {
+    if (sessionStorage.getItem('__harnessCheckpoint')) return;
+    const origin = state.origins.find((o) => o.origin === location.origin);
+    for (const item of (origin ? origin.localStorage : [])) localStorage.setItem(item.name, item.value);
+    if (state.sessionOrigin === location.origin) {
+      for (const [name, value] of state.sessionStorage) sessionStorage.setItem(name, value);
+    }
+    sessionStorage.setItem('__harnessCheckpoint', state.name);
+  } catch (e) {}
+})();
+"""
+
+
+@dataclass
+class Checkpoint:
+    name: str
+    profile: str
+    url: str
+    storage_state: dict
+    session_storage: list = field(default_factory=list)
+    created: float = field(default_factory=time.time)
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+    def seed_script(self):
+        origin = "/".join(self.url.split("/", 3)[:3])
+        return SEED_SCRIPT % json.dumps({
+            "name": self.name,
+            "origins": self.storage_state.get("origins", []),
+            "sessionOrigin": origin,
+            "sessionStorage": self.session_storage,
+        })
+
+
+class CheckpointStore:
+    def __init__(self, scope, root=CHECKPOINT_ROOT, max_age=DEFAULT_MAX_AGE):
+        self.root = root / scope
+        self.max_age = max_age
+
+    def path(self, profile, name):
+        return self.root / profile / f"{name}.json"
+
+    def _write(self, checkpoint):
+        path = self.path(checkpoint.profile, checkpoint.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(asdict(checkpoint), f)
+        os.replace(tmp, path)
+        return checkpoint
+
+    def save(self, page, profile, name, url=None):
+        """Checkpoint the page's storage; `url` overrides where resuming lands."""
+        return self._write(Checkpoint(
+            name, profile, url or page.url,
+            page.context.storage_state(), page.evaluate(SESSION_SCRIPT),
+        ))
+
+    async def async_save(self, page, profile, name, url=None):
+        return self._write(Checkpoint(
+            name, profile, url or page.url,
+            await page.context.storage_state(), await page.evaluate(SESSION_SCRIPT),
+        ))
+
+    def save_steps(self, page, profile, name, url=None):
+        """save() for flow_engine steps: a generator that yields each page call."""
+        state = yield page.context.storage_state()
+        session = yield page.evaluate(SESSION_SCRIPT)
+        return self._write(Checkpoint(name, profile, url or page.url, state, session))
+
+    def load(self, profile, name):
+        """The checkpoint, or None when missing or older than max_age."""
+        path = self.path(profile, name)
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            checkpoint = Checkpoint(**json.load(f))
+        if self.max_age is not None and checkpoint.age > self.max_age:
+            return None
+        return checkpoint
+
+    def resume(self, page, profile, name, **ready):
+        """Restore a checkpoint into a fresh page and open its URL; False if none."""
+        checkpoint = self.load(profile, name)
+        if checkpoint is None:
+            return False
+        page.context.add_cookies(checkpoint.storage_state.get("cookies", []))
+        page.add_init_script(checkpoint.seed_script())
+        page.goto(checkpoint.url, wait_until="domcontentloaded")
+        wait_for_ready(page, **ready)
+        return True
+
+    async def async_resume(self, page, profile, name, **ready):
+        checkpoint = self.load(profile, name)
+        if checkpoint is None:
+            return False
+        await page.context.add_cookies(checkpoint.storage_state.get("cookies", []))
+        await page.add_init_script(checkpoint.seed_script())
+        await page.goto(checkpoint.url, wait_until="domcontentloaded")
+        await async_wait_for_ready(page, **ready)
+        return True
+
+    def restore_steps(self, page, checkpoint):
+        """Seed `checkpoint` into a fresh page and open its URL (flow_engine steps)."""
+        yield page.context.add_cookies(checkpoint.storage_state.get("cookies", []))
+        yield page.add_init_script(checkpoint.seed_script())
+        yield page.goto(checkpoint.url, wait_until="domcontentloaded")
+
+    def clear(self):
+        removed = 0
+        for path in (self.root.glob("*/*.json") if self.root.exists() else []):
+            path.unlink()
+            removed += 1
+        return removed
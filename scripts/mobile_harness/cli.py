@@ -0,0 +1,511 @@
+"""
+Command-line entry point for the harness: `python3 scripts/mobile-harness.py <command>`.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .artifact_store import GC_GRACE, ArtifactStore, print_changes
+from .config import BASE_URL, HARNESS_HOME, PROD_URL
+from .devices import MATRICES, find_profile
+from .durations import DURATIONS_PATH
+from .locales import LOCALES, localized_path
+from .page_errors import ERRORS_PATH, KINDS
+from .results_db import RESULTS_DB, ResultsDB
+from .screenshot_writer import add_screenshot_arguments
+from .throttling import add_throttle_arguments
+
+
+def _csv(value):
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def _profiles(args):
+    if args.profiles:
+        return [find_profile(name) for name in args.profiles]
+    return MATRICES[args.matrix]
+
+
+def _impact(args):
+    from .impact import analyze_impact
+
+    try:
+        impact = analyze_impact(args.since)
+    except subprocess.CalledProcessError as e:
+        sys.exit(f"git diff against {args.since!r} failed: {e.stderr.strip()}")
+    scope = "everything" if impact.everything else f"{len(impact.routes)} route(s)"
+    print(f"Changes since {args.since}: {len(impact.files)} file(s) -> {scope}")
+    return impact
+
+
+def cmd_shard(args):
+    from .durations import DurationHistory, history_key, parse_shard, select_shard
+    from .sharded import FLOW_ROUTES, FLOWS, build_items, load_results, run_sharded
+
+    unknown = [f for f in args.flows if f not in FLOWS]
+    if unknown:
+        sys.exit(f"Unknown flow(s): {', '.join(unknown)} (known: {', '.join(FLOWS)})")
+    items = build_items(args.flows, _profiles(args), args.locales)
+    history = DurationHistory(args.durations)
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            sys.exit(str(e))
+        total = len(items)
+        items, load = select_shard(items, shard, history, key=lambda item: history_key(item.key, args.throttle))
+        print(f"Shard {args.shard}: {len(items)}/{total} items, predicted "
+              f"{load[shard[0] - 1]:.0f}s (shards: {', '.join(f'{s:.0f}s' for s in load)})")
+        if not items:
+            print("\n✅ Nothing to run on this shard")
+            return 0
+    reused = []
+    if args.since:
+        impact = _impact(args)
+        previous = load_results(os.path.join(args.out, "manifest.json"))
+        affected = [
+            item for item in items
+            if item.key not in previous
+            or any(impact.affects(localized_path(route, item.locale)) for route in FLOW_ROUTES[item.flow])
+        ]
+        reused = [previous[item.key] for item in items if item not in affected]
+        items = affected
+        print(f"Reusing {len(reused)} stored result(s) from {args.out}")
+    print(f"Running {len(items)} work items on {args.workers or 'all'} workers -> {args.out}")
+    if args.throttle != "off":
+        from .throttling import describe
+
+        for profile in _profiles(args):
+            print(f"  {profile.name}: {describe(profile, args.throttle)}")
+
+    def report(result):
+        status = f"{len(result.issues)} issue(s)" if result.issues else "ok"
+        print(f"  {result.key}: {status} ({result.duration:.1f}s)", flush=True)
+
+    started = time.time()
+    collector = run_sharded(
+        items, args.out, workers=args.workers, base_url=args.base_url, on_result=report, reused=reused,
+        trace=args.trace, throttle=args.throttle,
+    )
+    print(f"\nManifest: {args.out}/manifest.json "
+          f"({len(collector.screenshots)} screenshots)")
+    if args.trace:
+        from .tracing import print_step_summaries
+
+        print_step_summaries([
+            s for r in sorted(collector.results, key=lambda r: r.key)
+            for label, s in r.audits.items() if label.endswith(" trace")
+        ])
+    for result in collector.results:
+        if not result.reused:
+            history.record(history_key(result.key, args.throttle), result.duration)
+    history.save()
+    store = ArtifactStore()
+    script = f"shard-{'+'.join(args.flows)}"
+    run = collector.record(store, script)
+    print_changes(store.changes(run))
+    with ResultsDB() as db:
+        run_id = db.begin_run(script, args.base_url, args.throttle, started=started)
+        hashes = {entry["source"]: entry["hash"] for entry in run.entries.values()}
+        for result in collector.results:
+            if not result.reused:
+                db.add_flow_result(run_id, result, FLOW_ROUTES[result.flow][0], hashes)
+        db.finish_run(run_id)
+    if collector.issues:
+        print("\n⚠️ Issues:")
+        for key, issues in sorted(collector.issues.items()):
+            print(f"  {key}:")
+            for issue in issues:
+                print(f"    - {issue}")
+        return 1
+    print("\n✅ No issues")
+    return 0
+
+
+def cmd_durations(args):
+    from .durations import DurationHistory
+
+    history = DurationHistory(args.durations)
+    if args.action == "merge":
+        if not args.manifests:
+            sys.exit("durations merge needs one or more manifest.json files")
+        read = sum(history.record_manifest(path) for path in args.manifests)
+        history.save()
+        print(f"Merged {read} result(s) from {len(args.manifests)} manifest(s) into {history.path}")
+        return 0
+    for key in sorted(history.samples, key=history.estimate, reverse=True):
+        samples = ", ".join(f"{s:.1f}" for s in history.samples[key])
+        print(f"  {history.estimate(key):6.1f}s  {key}  [{samples}]")
+    return 0
+
+
+def _baseline_dir(args):
+    from .visual_diff import BASELINE_ROOT
+
+    name = args.name or os.path.basename(os.path.normpath(args.current))
+    return BASELINE_ROOT / name
+
+
+def cmd_baseline(args):
+    from .visual_diff import promote_baselines
+
+    baseline_dir = _baseline_dir(args)
+    names = promote_baselines(args.current, baseline_dir, names=args.only)
+    print(f"Promoted {len(names)} capture(s) to {baseline_dir}")
+    return 0
+
+
+def _compare(args, baseline_dir, diff_dir):
+    """compare_dirs plus <diff_dir>/diff-report.json; returns (results, missing, report path)."""
+    from .visual_diff import compare_dirs
+
+    results, missing = compare_dirs(
+        args.current, baseline_dir, diff_dir,
+        channel_tolerance=args.tolerance,
+        anti_aliasing=not args.no_aa,
+        tile=args.tile,
+    )
+    report_path = os.path.join(diff_dir, "diff-report.json")
+    os.makedirs(diff_dir, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "baseline": str(baseline_dir),
+            "results": [r.to_dict() for r in results],
+            "missing": missing,
+        }, f, indent=2)
+    return results, missing, report_path
+
+
+def cmd_compare(args):
+    baseline_dir = _baseline_dir(args)
+    diff_dir = args.diff_dir or os.path.join(args.current, "_diff")
+    results, missing, report_path = _compare(args, baseline_dir, diff_dir)
+    failed = [r for r in results if r.size_changed or r.ratio > args.max_ratio]
+    for r in results:
+        mark = "✗" if r in failed else ("~" if r.changed else "✓")
+        print(f"  {mark} {r.name}: {r.ratio:.4%} changed, {len(r.regions)} region(s)"
+              + (" [size changed]" if r.size_changed else ""))
+    for name in missing:
+        print(f"  ? {name}: no baseline (run `baseline` to accept it)")
+
+    print(f"\n{len(failed)}/{len(results)} capture(s) over {args.max_ratio:.2%} — report: {report_path}")
+    return 1 if failed else 0
+
+
+def cmd_report(args):
+    from .report import build_report
+
+    baseline_dir = _baseline_dir(args)
+    diff_dir = args.diff_dir or os.path.join(args.current, "_diff")
+    if args.compare:
+        if not baseline_dir.exists():
+            sys.exit(f"No baseline at {baseline_dir} (run `baseline` first)")
+        results, missing, _ = _compare(args, baseline_dir, diff_dir)
+        print(f"Compared {len(results)} capture(s) with {baseline_dir} ({len(missing)} without baseline)")
+    if args.profiles or args.matrix:
+        names = [p.name for p in _profiles(args)]
+    else:
+        names = sorted({p.name for profiles in MATRICES.values() for p in profiles})
+    started = time.perf_counter()
+    path, captures, run_id = build_report(
+        args.current, names, out_dir=args.out, baseline_dir=str(baseline_dir), diff_dir=diff_dir,
+        title=args.title, workers=args.workers, thumb_width=args.thumb_width, db_path=args.db, copy=args.copy,
+    )
+    source = f"results run #{run_id}" if run_id else "no matching results run"
+    print(f"📄 {len(captures)} capture(s), {source}, {time.perf_counter() - started:.1f}s -> {path}")
+    return 0
+
+
+def cmd_store(args):
+    if args.action in ("ingest", "changed") and not args.script:
+        sys.exit(f"store {args.action} needs --script")
+    if args.action == "ingest" and not args.directory:
+        sys.exit("store ingest needs a capture directory")
+    store = ArtifactStore()
+    if args.action == "ingest":
+        names = [p.name for p in _profiles(args)]
+        run = store.ingest_dir(args.directory, args.script, names)
+        print(f"Recorded {len(run.entries)} capture(s) as {args.script}/{run.run_id}")
+        print_changes(store.changes(run))
+    elif args.action == "changed":
+        run_ids = store.run_ids(args.script)
+        if not run_ids:
+            sys.exit(f"No runs recorded for {args.script}")
+        print_changes(store.changes(store.load_run(args.script, run_ids[-1])))
+    elif args.action == "gc":
+        removed = store.gc(keep_runs=args.keep, grace=args.grace)
+        print(f"Removed {removed} unreferenced blob(s)")
+    return 0
+
+
+def cmd_probe(args):
+    from .cache_probe import CANARY_PATHS, probe_all, print_summary, sitemap_urls, summarize, write_report
+
+    base_url = args.base_url.rstrip("/")
+    if args.canary:
+        pairs = [(base_url + path, path) for path in CANARY_PATHS]
+    else:
+        pairs = sitemap_urls(base_url, limit=args.limit)
+    print(f"Probing {base_url} ({'canaries' if args.canary else 'sitemaps'}, {args.workers} connections)")
+
+    def report(result):
+        if args.verbose or args.canary:
+            detail = result.error or (f"{result.status} {result.cache or '-'} age={result.age} "
+                                      f"{result.ttfb_ms:.0f}ms csp={'yes' if result.csp else 'no'} "
+                                      f"cache-control: {result.cache_control}")
+            print(f"  {result.path}: {detail}", flush=True)
+
+    results = probe_all(pairs, workers=args.workers, on_result=report)
+    if not results:
+        sys.exit("No URLs to probe")
+    summary = summarize(results)
+    print_summary(summary)
+    out = args.out or HARNESS_HOME / "cache-probe" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    write_report(results, summary, out, base_url)
+    print(f"\nReport: {out}")
+    return 0
+
+
+def cmd_crawl(args):
+    from .crawler import CrawlQueue, crawl
+    from .screenshot_writer import writer_from_args
+
+    profiles = _profiles(args)
+    if args.status:
+        queue = CrawlQueue(args.name)
+        if not queue.seeded:
+            sys.exit(f"No crawl named {args.name!r} yet")
+        print(f"{len(queue.items())} URLs queued in {queue.dir}")
+        for profile, counts in sorted(queue.summary().items()):
+            print(f"  {profile}: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+        return 0
+
+    def report(row):
+        mark = "✓" if row["status"] == "ok" else "✗"
+        detail = row.get("error") or row.get("http_status")
+        print(f"  {mark} [{row['profile']}] {row['url']} ({detail}, {row['duration']:.1f}s)", flush=True)
+
+    impact = _impact(args) if args.since else None
+    with writer_from_args(args) as writer:
+        try:
+            queue, attempted = crawl(
+                args.base_url, profiles, writer, name=args.name, fresh=args.fresh, limit=args.limit,
+                impact=impact, concurrency=args.concurrency, full_page=args.full_page,
+                max_attempts=args.max_attempts, on_result=report, throttle=args.throttle,
+            )
+        except ValueError as e:
+            sys.exit(str(e))
+    print(f"\nAttempted {attempted} (url, viewport) pairs; screenshots in {queue.shots_dir}")
+    failed = 0
+    for profile, counts in sorted(queue.summary().items()):
+        failed += sum(n for status, n in counts.items() if status != "ok")
+        print(f"  {profile}: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    return 1 if failed else 0
+
+
+def cmd_impact(args):
+    impact = _impact(args)
+    if args.json:
+        print(json.dumps(impact.to_dict(), indent=2))
+    elif not args.route:
+        for route in sorted(impact.routes):
+            locales = impact.routes[route]
+            scope = f" [{', '.join(sorted(locales))}]" if locales is not None else ""
+            print(f"  {route}{scope}  <- {impact.reasons[route]}")
+    if args.route:
+        hit = [path for path in args.route if impact.affects(path)]
+        for path in args.route:
+            print(f"  {'✓' if path in hit else '-'} {path}")
+        return 0 if hit else 1
+    return 0
+
+
+def cmd_errors(args):
+    from .page_errors import ErrorIndex, print_ranked, ranked
+
+    index = ErrorIndex(args.path)
+    if args.clear:
+        index.clear()
+        print(f"Cleared {index.path}")
+        return 0
+    since = time.time() - args.days * 86400 if args.days else None
+    rows = ranked(index.load(), kind=args.kind, route=args.route, viewport=args.viewport, since=since)
+    if args.json:
+        print(json.dumps(dict(rows[:args.limit]), indent=2))
+    else:
+        print_ranked(rows, limit=args.limit)
+    return 0
+
+
+def cmd_results(args):
+    from .results_db import format_value
+
+    with ResultsDB(args.db) as db:
+        if args.action == "runs":
+            for run in db.runs(args.script, args.last):
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+                commit = (run["commit_sha"] or "?")[:8] + ("+" if run["dirty"] else "")
+                print(f"  #{run['id']:<5} {when}  {commit:9}  {run['script']}  {run['base_url']}"
+                      f"  throttle={run['throttle'] or 'off'}")
+        elif args.action == "issues":
+            for row in db.top_issues(args.route, args.profile, args.last):
+                print(f"  {row['runs']:3d} run(s) {row['count']:4d}x  {row['route'] or '-'}  {row['message']}"
+                      f"  [{row['profiles']}]")
+        else:
+            if not args.metric:
+                sys.exit("results trend needs a metric, e.g. lcp, cls, inp, step_ms, duration_ms")
+            series, overall = db.trend(args.metric, args.pct, route=args.route, profile=args.profile,
+                                       step=args.step, script=args.script, last=args.last)
+            scope = " ".join(filter(None, (args.metric, args.route, args.step and f"[{args.step}]",
+                                           args.profile and f"on {args.profile}")))
+            print(f"p{args.pct} {scope} over {len(series)} run(s): "
+                  f"{format_value(args.metric, overall)}")
+            for run in series:
+                when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+                print(f"  #{run['run']:<5} {when}  {(run['commit'] or '?')[:8]:8}  n={run['n']:<3} "
+                      f"p{args.pct}={format_value(args.metric, run[f'p{args.pct}'])}")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="mobile-harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    shard = sub.add_parser("shard", help="run flow x viewport x locale items across processes")
+    shard.add_argument("--flows", type=_csv, default=["wizard"])
+    shard.add_argument("--matrix", choices=sorted(MATRICES), default="final")
+    shard.add_argument("--profiles", type=_csv, help="profile names (overrides --matrix)")
+    shard.add_argument("--locales", type=_csv, default=list(LOCALES))
+    shard.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    shard.add_argument("--base-url", default=BASE_URL)
+    shard.add_argument("--out", default=str(HARNESS_HOME / "sharded"))
+    shard.add_argument("--shard", help="run only CI shard i of N (1-based), balanced by past durations")
+    shard.add_argument("--durations", default=str(DURATIONS_PATH),
+                       help="per-item duration history (share one file across CI nodes)")
+    add_throttle_arguments(shard)
+    shard.add_argument("--trace", action="store_true",
+                       help="record a Chromium trace around traced flow steps (Continue, vibe selection)")
+    shard.add_argument("--since", metavar="REF",
+                       help="only re-run items whose pages changed since REF; reuse <out>/manifest.json for the rest")
+    shard.set_defaults(func=cmd_shard)
+
+    durations = sub.add_parser("durations", help="show or merge the per-item duration history")
+    durations.add_argument("action", choices=["show", "merge"])
+    durations.add_argument("manifests", nargs="*", help="manifest.json files from each node (merge)")
+    durations.add_argument("--durations", default=str(DURATIONS_PATH))
+    durations.set_defaults(func=cmd_durations)
+
+    baseline = sub.add_parser("baseline", help="accept a capture directory as the new baseline")
+    baseline.add_argument("current", help="directory of PNG captures, e.g. /tmp/mobile-final")
+    baseline.add_argument("--name", help="baseline set name (default: directory name)")
+    baseline.add_argument("--only", type=_csv, help="promote just these file names")
+    baseline.set_defaults(func=cmd_baseline)
+
+    compare = sub.add_parser("compare", help="diff a capture directory against its baseline")
+    compare.add_argument("current", help="directory of PNG captures, e.g. /tmp/mobile-final")
+    compare.add_argument("--name", help="baseline set name (default: directory name)")
+    compare.add_argument("--diff-dir", help="where diff images go (default: <current>/_diff)")
+    compare.add_argument("--tolerance", type=int, default=16, help="per-channel tolerance 0-255")
+    compare.add_argument("--no-aa", action="store_true", help="disable anti-aliasing tolerance")
+    compare.add_argument("--tile", type=int, default=32, help="tile size for region detection")
+    compare.add_argument("--max-ratio", type=float, default=0.001,
+                         help="changed-pixel fraction that fails a capture (default: 0.1%%)")
+    compare.set_defaults(func=cmd_compare)
+
+    report = sub.add_parser("report", help="static HTML report of a capture directory")
+    report.add_argument("current", help="directory of PNG captures, e.g. /tmp/mobile-modal-tests")
+    report.add_argument("--name", help="baseline set name (default: directory name)")
+    report.add_argument("--out", help="report directory (default: <current>/_report)")
+    report.add_argument("--diff-dir", help="diff images and diff-report.json (default: <current>/_diff)")
+    report.add_argument("--compare", action="store_true", help="diff against the baseline first")
+    report.add_argument("--tolerance", type=int, default=16, help="per-channel tolerance 0-255 (--compare)")
+    report.add_argument("--no-aa", action="store_true", help="disable anti-aliasing tolerance (--compare)")
+    report.add_argument("--tile", type=int, default=32, help="tile size for region detection (--compare)")
+    report.add_argument("--matrix", choices=sorted(MATRICES),
+                        help="profiles used to split <viewport>_<step>.png names (default: every profile)")
+    report.add_argument("--profiles", type=_csv)
+    report.add_argument("--title")
+    report.add_argument("--workers", type=int, help="thumbnail threads (default: CPU count)")
+    report.add_argument("--thumb-width", type=int, default=240)
+    report.add_argument("--copy", action="store_true", help="copy full images into the report directory")
+    report.add_argument("--db", default=str(RESULTS_DB), help="results store for routes, timings and issues")
+    report.set_defaults(func=cmd_report)
+
+    store = sub.add_parser("store", help="content-addressed screenshot store")
+    store.add_argument("action", choices=["ingest", "changed", "gc"])
+    store.add_argument("directory", nargs="?", help="capture directory (ingest)")
+    store.add_argument("--script", help="script/run name, e.g. test-mobile-final")
+    store.add_argument("--matrix", choices=sorted(MATRICES), default="final",
+                       help="profiles used to split <viewport>_<step>.png names")
+    store.add_argument("--profiles", type=_csv)
+    store.add_argument("--keep", type=int, default=20, help="runs kept per script (gc)")
+    store.add_argument("--grace", type=int, default=GC_GRACE,
+                       help="seconds an unreferenced blob is kept after its last write (gc)")
+    store.set_defaults(func=cmd_store)
+
+    crawl = sub.add_parser("crawl", help="screenshot every sitemap URL (resumable queue)")
+    crawl.add_argument("--base-url", default=BASE_URL)
+    crawl.add_argument("--name", default="default", help="queue name under $HARNESS_HOME/crawl/")
+    crawl.add_argument("--matrix", choices=sorted(MATRICES), default="final")
+    crawl.add_argument("--profiles", type=_csv, help="profile names (overrides --matrix)")
+    crawl.add_argument("--concurrency", type=int, default=4, help="browser contexts per viewport")
+    crawl.add_argument("--limit", type=int, help="seed at most N sitemap URLs")
+    crawl.add_argument("--full-page", action="store_true")
+    crawl.add_argument("--max-attempts", type=int, default=2, help="tries per URL before giving up")
+    crawl.add_argument("--fresh", action="store_true", help="discard the queue and reseed from the sitemaps")
+    crawl.add_argument("--status", action="store_true", help="print per-viewport progress and exit")
+    crawl.add_argument("--since", metavar="REF", help="re-capture only URLs whose routes changed since REF")
+    add_screenshot_arguments(crawl)
+    add_throttle_arguments(crawl)
+    crawl.set_defaults(func=cmd_crawl)
+
+    impact = sub.add_parser("impact", help="routes affected by the changes since a git ref")
+    impact.add_argument("--since", metavar="REF", default="origin/main")
+    impact.add_argument("--route", action="append",
+                        help="exit 0 only if this URL path is affected (repeatable), for gating CI jobs")
+    impact.add_argument("--json", action="store_true")
+    impact.set_defaults(func=cmd_impact)
+
+    errors = sub.add_parser("errors", help="ranked console/page errors recorded across runs")
+    errors.add_argument("--kind", choices=KINDS)
+    errors.add_argument("--route", help="only errors seen on this route, e.g. /trips/new")
+    errors.add_argument("--viewport", help="only errors seen on this profile")
+    errors.add_argument("--days", type=float, help="only errors seen in the last N days")
+    errors.add_argument("--limit", type=int, default=20)
+    errors.add_argument("--json", action="store_true")
+    errors.add_argument("--clear", action="store_true", help="delete the index and start over")
+    errors.add_argument("--path", default=str(ERRORS_PATH))
+    errors.set_defaults(func=cmd_errors)
+
+    results = sub.add_parser("results", help="query the SQLite results store for trends")
+    results.add_argument("action", choices=["trend", "runs", "issues"])
+    results.add_argument("metric", nargs="?", help="trend metric: lcp, cls, inp, fcp, ttfb, step_ms, duration_ms, ...")
+    results.add_argument("--route", help="locale-free route, e.g. /trips/new")
+    results.add_argument("--profile", help="device profile, e.g. iphone_se")
+    results.add_argument("--step", help="only this step (vitals step, flow name or '<flow> <step>')")
+    results.add_argument("--script", help="only runs of this script")
+    results.add_argument("--last", type=int, default=30, help="runs to look back over (default: 30)")
+    results.add_argument("--pct", type=int, default=75, help="percentile (default: 75)")
+    results.add_argument("--db", default=str(RESULTS_DB))
+    results.set_defaults(func=cmd_results)
+
+    probe = sub.add_parser("probe", help="edge-cache status and TTFB for every sitemap URL")
+    probe.add_argument("base_url", nargs="?", default=PROD_URL)
+    probe.add_argument("--canary", action="store_true", help="only the old cache-probe.sh canary URLs")
+    probe.add_argument("--workers", type=int, default=32, help="concurrent keep-alive connections")
+    probe.add_argument("--limit", type=int, help="probe at most N sitemap URLs")
+    probe.add_argument("--out", type=Path, help="JSON report path (default: $HARNESS_HOME/cache-probe/)")
+    probe.add_argument("--verbose", action="store_true", help="print every URL as it is probed")
+    probe.set_defaults(func=cmd_probe)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
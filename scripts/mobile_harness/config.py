@@ -0,0 +1,16 @@
+"""
+Harness-wide settings, overridable from the environment.
+
+HARNESS_BASE_URL  target deployment (default: local dev server)
+HARNESS_HOME      where runs, stores and indexes persist between runs
+HARNESS_THROTTLE  default CPU/network emulation mode (throttling.py)
+"""
+
+import os
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+BASE_URL = os.environ.get("HARNESS_BASE_URL", "http://localhost:3000").rstrip("/")
+PROD_URL = "https://monkeytravel.app"
+HARNESS_HOME = Path(os.environ.get("HARNESS_HOME", "/tmp/mobile-harness"))
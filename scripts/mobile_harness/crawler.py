@@ -0,0 +1,220 @@
+"""
+Sitemap-driven full-site screenshot crawler with a resumable queue.
+
+`mobile-harness.py crawl` seeds a queue from the sitemaps (via
+cache_probe.sitemap_urls) and screenshots every URL on every selected
+viewport. The queue lives on disk under HARNESS_HOME/crawl/<name>/:
+
+    queue.json     the seeded [{"url", "path"}] list, written once (an
+                   empty seed raises instead, so a sitemap outage can't
+                   leave an empty queue behind)
+    status.jsonl   one appended line per attempt:
+                   {"url", "profile", "status", "http_status", "shot", ...}
+
+A crashed or interrupted crawl resumes where it stopped: on start, every
+(url, profile) with an "ok" line whose screenshot is on disk is skipped,
+and failed ones are retried up to `max_attempts`. A pair is recorded "ok"
+only once its screenshot has been written. Lines are flushed as they are written, and a torn
+last line is ignored. `--since REF` appends "stale" lines for URLs on
+routes changed since REF (impact.py), so only those are re-captured.
+
+The queue is drained by `concurrency` workers per viewport. Each worker
+owns a browser context it reuses across URLs and recycles every
+RECYCLE_AFTER pages, so memory stays flat over thousands of pages.
+Screenshots go through ScreenshotWriter, so encoding runs off the event
+loop and other workers carry on while one waits for its write.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+
+from .async_runner import AsyncBrowserPool
+from .cache_probe import sitemap_urls
+from .config import HARNESS_HOME
+from .page_errors import track_errors
+from .readiness import async_wait_for_ready, track_network
+from .throttling import async_apply_throttling
+
+CRAWL_ROOT = HARNESS_HOME / "crawl"
+RECYCLE_AFTER = 50
+MAX_SLUG = 120
+
+
+def url_slug(path):
+    """'/it/blog/some-post' -> 'it__blog__some-post'; long paths get a hash suffix."""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "_", path.strip("/").replace("/", "__")) or "index"
+    if len(slug) > MAX_SLUG:
+        digest = hashlib.sha1(path.encode()).hexdigest()[:10]
+        slug = f"{slug[:MAX_SLUG - 11]}-{digest}"
+    return slug
+
+
+class CrawlQueue:
+    def __init__(self, name="default", root=CRAWL_ROOT):
+        self.dir = root / name
+        self.queue_path = self.dir / "queue.json"
+        self.status_path = self.dir / "status.jsonl"
+        self.shots_dir = self.dir / "shots"
+
+    @property
+    def seeded(self):
+        return self.queue_path.exists()
+
+    def seed(self, pairs):
+        items = [{"url": url, "path": path} for url, path in pairs]
+        if not items:
+            raise ValueError(f"Nothing to seed crawl {self.dir.name!r} with (sitemaps empty or unreachable?)")
+        self.dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.queue_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(items, f)
+        os.replace(tmp, self.queue_path)
+        return items
+
+    def reset(self):
+        for path in (self.queue_path, self.status_path):
+            if path.exists():
+                path.unlink()
+
+    def items(self):
+        with open(self.queue_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def attempts(self):
+        """Every recorded attempt, oldest first (a torn last line is skipped)."""
+        if not self.status_path.exists():
+            return []
+        rows = []
+        with open(self.status_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return rows
+
+    def latest(self):
+        """{(url, profile): (last attempt, attempt count)}; a "stale" line resets the count."""
+        latest = {}
+        for row in self.attempts():
+            key = (row["url"], row["profile"])
+            count = 0 if row["status"] == "stale" else latest.get(key, (None, 0))[1] + 1
+            latest[key] = (row, count)
+        return latest
+
+    def invalidate(self, urls, profiles):
+        """Mark captured (url, profile) pairs stale so the next crawl re-captures them."""
+        latest = self.latest()
+        stale = [(url, p.name) for url in urls for p in profiles if (url, p.name) in latest]
+        for url, profile in stale:
+            self.record({"url": url, "profile": profile, "status": "stale", "at": time.time()})
+        return len(stale)
+
+    def pending(self, profiles, max_attempts=2):
+        latest = self.latest()
+        todo = []
+        for item in self.items():
+            for profile in profiles:
+                row, count = latest.get((item["url"], profile.name), (None, 0))
+                if row and row["status"] == "ok" and os.path.exists(row["shot"]):
+                    continue
+                if row and row["status"] != "ok" and count >= max_attempts:
+                    continue
+                todo.append((item, profile))
+        return todo
+
+    def record(self, row):
+        with open(self.status_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row) + "\n")
+            f.flush()
+
+    def summary(self):
+        """{profile: {status: count}} over the latest attempt per (url, profile)."""
+        counts = {}
+        for (_, profile), (row, _) in self.latest().items():
+            bucket = counts.setdefault(profile, {})
+            bucket[row["status"]] = bucket.get(row["status"], 0) + 1
+        return counts
+
+
+async def _worker(pool, profile, jobs, queue, writer, full_page, timeout, on_result):
+    context, used = None, 0
+    try:
+        while True:
+            try:
+                item = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if context is None or used >= RECYCLE_AFTER:
+                if context:
+                    await context.close()
+                context, used = await pool.browser.new_context(**profile.context_options()), 0
+            used += 1
+            row = {"url": item["url"], "profile": profile.name, "at": time.time()}
+            started = time.perf_counter()
+            page = await context.new_page()
+            track_network(page)
+            track_errors(page, profile.name)
+            await async_apply_throttling(page, profile, pool.throttle)
+            page.set_default_timeout(timeout)
+            try:
+                response = await page.goto(item["url"], wait_until="domcontentloaded")
+                row["http_status"] = response.status if response else None
+                ready = await async_wait_for_ready(page, timeout=timeout)
+                if ready["pending"]:
+                    row["pending"] = ready["pending"]
+                shot = queue.shots_dir / profile.name / f"{url_slug(item['path'])}.png"
+                row["shot"] = await writer.async_write(await page.screenshot(full_page=full_page), str(shot))
+                row["status"] = "ok" if row["http_status"] and row["http_status"] < 400 else "http_error"
+            except Exception as e:
+                row["status"] = "error"
+                row["error"] = str(e).splitlines()[0]
+            finally:
+                await page.close()
+            row["duration"] = round(time.perf_counter() - started, 3)
+            queue.record(row)
+            if on_result:
+                on_result(row)
+    finally:
+        if context:
+            await context.close()
+
+
+async def crawl_async(queue, profiles, writer, concurrency=4, full_page=False, timeout=20000,
+                      max_attempts=2, headless=True, on_result=None, throttle=None):
+    todo = queue.pending(profiles, max_attempts)
+    if not todo:
+        return 0
+    async with AsyncBrowserPool(headless=headless, throttle=throttle) as pool:
+        workers = []
+        for profile in profiles:
+            jobs = asyncio.Queue()
+            for item, p in todo:
+                if p is profile:
+                    jobs.put_nowait(item)
+            workers += [
+                _worker(pool, profile, jobs, queue, writer, full_page, timeout, on_result)
+                for _ in range(min(concurrency, jobs.qsize()))
+            ]
+        await asyncio.gather(*workers)
+    return len(todo)
+
+
+def crawl(base_url, profiles, writer, name="default", fresh=False, limit=None, impact=None, **options):
+    """Seed (unless resuming) and drain the queue; returns (queue, attempted).
+
+    With an `impact` (impact.analyze_impact), only URLs on affected routes
+    are re-captured; every other URL keeps its stored screenshot.
+    """
+    queue = CrawlQueue(name)
+    if fresh:
+        queue.reset()
+    if not queue.seeded:
+        queue.seed(sitemap_urls(base_url, limit=limit))
+    if impact:
+        queue.invalidate([item["url"] for item in queue.items() if impact.affects(item["path"])], profiles)
+    return queue, asyncio.run(crawl_async(queue, profiles, writer, **options))
@@ -0,0 +1,103 @@
+"""
+Device profiles shared by the mobile UI scripts.
+
+Each profile carries everything needed to build a Playwright browser
+context, so scripts no longer hand-roll `browser.new_context(...)` kwargs.
+The matrices below are the viewport lists the scripts used to define
+inline (`VIEWPORTS` in test-mobile-final.py, `MOBILE_VIEWPORTS` in
+test-mobile-modals.py).
+
+`cpu_slowdown` and `network` describe the real device behind a profile
+(Lighthouse's 4x CPU for a mid-range phone, more for low-end Androids).
+They only take effect when throttling is on; see throttling.py.
+"""
+
+from dataclasses import dataclass, field
+
+IPHONE_SAFARI_UA = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) "
+    "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 "
+    "Mobile/15E148 Safari/604.1"
+)
+
+
+@dataclass(frozen=True)
+class DeviceProfile:
+    name: str
+    width: int
+    height: int
+    device_scale_factor: float = 2
+    is_mobile: bool = True
+    has_touch: bool = True
+    user_agent: str | None = None
+    # Emulated when throttling is on (throttling.py): CPU slowdown factor
+    # and a throttling.NETWORK_PROFILES name.
+    cpu_slowdown: float = 1
+    network: str | None = None
+    # Extra `new_context` kwargs (e.g. bypass_csp) that aren't device traits.
+    context_overrides: dict = field(default_factory=dict, compare=False)
+
+    @property
+    def viewport(self):
+        return {"width": self.width, "height": self.height}
+
+    def context_options(self):
+        options = {
+            "viewport": self.viewport,
+            "device_scale_factor": self.device_scale_factor,
+            "is_mobile": self.is_mobile,
+            "has_touch": self.has_touch,
+        }
+        if self.user_agent:
+            options["user_agent"] = self.user_agent
+        options.update(self.context_overrides)
+        return options
+
+    def __str__(self):
+        return f"{self.name} ({self.width}x{self.height})"
+
+
+# Single-device profiles used by the one-off scripts.
+IPHONE_14 = DeviceProfile("iphone_14", 390, 844, cpu_slowdown=2, network="slow_4g")
+# iPhone 14 Pro: 393x852 logical, 1179x2556 rendered at DPR 3.
+IPHONE_14_PRO = DeviceProfile("iphone_14_pro", 393, 852, device_scale_factor=3,
+                              cpu_slowdown=2, network="slow_4g")
+IPHONE_14_PRO_SAFARI = DeviceProfile(
+    "iphone_14_pro_safari", 393, 852, device_scale_factor=3, user_agent=IPHONE_SAFARI_UA,
+    cpu_slowdown=2, network="slow_4g",
+)
+DESKTOP = DeviceProfile("desktop", 1440, 900, is_mobile=False, has_touch=False)
+
+# test-mobile-final.py matrix
+FINAL_VIEWPORTS = [
+    DeviceProfile("iphone_se", 375, 667, cpu_slowdown=4, network="slow_4g"),      # Smallest common iPhone
+    DeviceProfile("iphone_14", 390, 844, cpu_slowdown=2, network="slow_4g"),      # Standard iPhone
+    DeviceProfile("iphone_14_max", 430, 932, cpu_slowdown=2, network="slow_4g"),  # Largest iPhone
+    DeviceProfile("android_sm", 360, 640, cpu_slowdown=6, network="fast_3g"),     # Small Android
+    DeviceProfile("android_lg", 412, 915, cpu_slowdown=3, network="slow_4g"),     # Large Android (Pixel)
+]
+
+# test-mobile-modals.py matrix
+MODAL_VIEWPORTS = [
+    DeviceProfile("iphone_se", 375, 667, cpu_slowdown=4, network="slow_4g"),
+    DeviceProfile("iphone_12", 390, 844, cpu_slowdown=2, network="slow_4g"),
+    DeviceProfile("iphone_14_pro_max", 430, 932, cpu_slowdown=2, network="slow_4g"),
+    DeviceProfile("pixel_7", 412, 915, cpu_slowdown=3, network="slow_4g"),
+    DeviceProfile("galaxy_s21", 360, 800, cpu_slowdown=3, network="slow_4g"),
+]
+
+MATRICES = {
+    "final": FINAL_VIEWPORTS,
+    "modals": MODAL_VIEWPORTS,
+}
+
+
+def find_profile(name):
+    """Look up a profile by name across the single profiles and matrices."""
+    candidates = [IPHONE_14, IPHONE_14_PRO, IPHONE_14_PRO_SAFARI, DESKTOP]
+    for matrix in MATRICES.values():
+        candidates.extend(matrix)
+    for profile in candidates:
+        if profile.name == name:
+            return profile
+    raise KeyError(f"Unknown device profile: {name}")
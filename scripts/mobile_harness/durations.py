@@ -0,0 +1,131 @@
+"""
+Per-item duration history and duration-balanced CI sharding.
+
+Splitting (flow x viewport x locale) items round-robin across CI nodes
+leaves them unbalanced: a wizard walk on a DPR-3 viewport takes several
+times longer than one on a small viewport, and one slow item can hold up
+a node for minutes. `DurationHistory` keeps the last few durations of
+every item key in HARNESS_HOME/durations.json. `plan_shards` uses them to
+split the items so every node gets about the same predicted wall-clock
+time:
+
+  - items with no history are placed by a stable hash of their key
+    (every node computes the same placement, with no coordination)
+    and counted at the median known duration
+  - known items are then placed longest first, each on the node with
+    the least predicted time so far (the LPT heuristic, within 4/3 of
+    optimal)
+
+Throttled runs take far longer than unthrottled ones, so the history is
+keyed by throttle mode too (`history_key`): "wizard/iphone_se/en" for
+unthrottled runs, "wizard/iphone_se/en@slow_4g" for `--throttle slow_4g`.
+
+Every node must plan from the same history file, or items may run twice
+or not at all. CI restores one shared file (`--durations`) on every node,
+then merges the manifests of all nodes back into it with
+`mobile-harness.py durations merge`.
+"""
+
+import hashlib
+import json
+import os
+import statistics
+
+from .config import HARNESS_HOME
+
+DURATIONS_PATH = HARNESS_HOME / "durations.json"
+# Samples kept per key; the estimate is their median, so one slow run
+# doesn't reshuffle every node.
+KEEP_SAMPLES = 5
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4); shards are 1-based like most CI matrix indexes."""
+    try:
+        index, total = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"--shard expects i/N, got {value!r}") from None
+    if not 1 <= index <= total:
+        raise ValueError(f"--shard {value}: i must be between 1 and N")
+    return index, total
+
+
+def history_key(key, throttle=None):
+    """The history key of an item key under a throttle mode; unthrottled keys are unchanged."""
+    return key if throttle in (None, "off") else f"{key}@{throttle}"
+
+
+def hash_shard(key, total):
+    """0-based shard for a key, stable across processes and machines."""
+    return int(hashlib.sha1(key.encode()).hexdigest()[:8], 16) % total
+
+
+class DurationHistory:
+    def __init__(self, path=DURATIONS_PATH):
+        self.path = path
+        self.samples = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.samples = json.load(f)
+
+    def record(self, key, seconds):
+        if seconds and seconds > 0:
+            self.samples[key] = (self.samples.get(key, []) + [round(seconds, 3)])[-KEEP_SAMPLES:]
+
+    def record_manifest(self, path):
+        """Fold a sharded run's manifest.json into the history; returns the items read.
+
+        Manifests without a "throttle" field predate it and were unthrottled.
+        """
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        results = manifest["results"]
+        throttle = manifest.get("throttle")
+        for r in results:
+            if r.get("reused"):
+                continue
+            self.record(history_key(f"{r['flow']}/{r['profile']}/{r['locale']}", throttle), r["duration"])
+        return len(results)
+
+    def estimate(self, key):
+        samples = self.samples.get(key)
+        return statistics.median(samples) if samples else None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.samples, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def plan_shards(items, total, history, key=lambda item: item.key):
+    """Split items into `total` lists with about equal predicted time.
+
+    Returns (shards, predicted_seconds); both are indexed 0..total-1.
+    """
+    known, unseen = [], []
+    for item in items:
+        estimate = history.estimate(key(item))
+        (unseen if estimate is None else known).append((estimate, item))
+    fallback = statistics.median(e for e, _ in known) if known else 1.0
+
+    shards = [[] for _ in range(total)]
+    load = [0.0] * total
+    for _, item in unseen:
+        n = hash_shard(key(item), total)
+        shards[n].append(item)
+        load[n] += fallback
+    # ties broken by key so every node sorts identically
+    for estimate, item in sorted(known, key=lambda pair: (-pair[0], key(pair[1]))):
+        n = min(range(total), key=lambda i: (load[i], i))
+        shards[n].append(item)
+        load[n] += estimate
+    return shards, load
+
+
+def select_shard(items, shard, history, key=lambda item: item.key):
+    """The items of 1-based `shard` (index, total), plus the plan's predicted load per shard."""
+    index, total = shard
+    shards, load = plan_shards(items, total, history, key)
+    return shards[index - 1], load
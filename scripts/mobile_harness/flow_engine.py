@@ -0,0 +1,328 @@
+"""
+Declarative flows: steps, locators and success checks declared once.
+
+Each script used to hand-code the same wizard walk with its own selectors
+(`button:has-text('Continue')` in one, `get_by_role(name="Continue →")`
+and calendar cells in another) and probe every control with
+`.all()` / `is_visible()` / `is_enabled()` before acting on it. A `Flow`
+declares the walk once:
+
+    targets   name -> Target (CSS or role + name), label placeholders like
+              "{continue}" filled from messages/<locale>/ per run
+    steps     Step(action, target, ...) in order
+    checks    steps that always run at the end, typically required
+              `expect`s: the flow's success assertions
+
+The engine builds every Locator once per run and checks an optional
+control with a single `evaluate_all` (exists, visible, enabled, count)
+before acting on it. Before, that took two or three round trips.
+
+One step implementation serves both Playwright APIs. Steps are
+generators that `yield` every page call. The sync driver passes each
+result straight back. The async driver awaits it first and throws errors
+back into the step. `run_flow` and `async_run_flow` return a
+FlowResult.
+
+Each step that runs gets its wall time in `result.timings`, keyed
+"<index> <action> <target>". Given a tracing.StepProfiler, steps declared
+with `trace=True` run inside a Chromium trace; their summaries land in
+`result.audits` as "<label> trace". Given a ScreenshotWriter, shots are
+encoded and written off-thread; with `out_dir=None` none are taken.
+
+Given a checkpoints.CheckpointStore, `checkpoint` steps save the page's
+storage under their name. `resume=<name>` restores that checkpoint into
+the page and continues with the step after it; the steps before it don't
+run. `result.resumed` records which checkpoint it was and how old. A
+missing checkpoint is an issue and the flow replays from the start.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+from .config import BASE_URL
+from .layout_audit import DEFAULT_TOLERANCE_PX, LAYOUT_AUDIT_SCRIPT, MAX_PER_KIND, layout_issues
+from .locales import localized_url, message
+from .readiness import async_wait_for_ready, wait_for_ready
+from .results import FlowResult
+from .tap_targets import MAX_PER_KIND as TAP_CAP, MIN_TARGET_PX, TAP_SCRIPT, tap_issues
+
+PROBE_SCRIPT = """
+(els) => {
+  const el = els[0];
+  if (!el) return { count: 0, visible: false, enabled: false };
+  const rect = el.getBoundingClientRect();
+  const style = getComputedStyle(el);
+  return {
+    count: els.length,
+    visible: rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none',
+    enabled: !el.disabled && el.getAttribute('aria-disabled') !== 'true',
+  };
+}
+"""
+
+# The DateRangePicker caption: "{month name in the page locale} {year}"
+MONTH_CAPTION_SCRIPT = """
+([locale, year, month]) => {
+  const date = new Date(year, month, 15);
+  let name;
+  try { name = new Intl.DateTimeFormat(locale, { month: 'long' }).format(date); }
+  catch { name = new Intl.DateTimeFormat('en-US', { month: 'long' }).format(date); }
+  return `${name} ${year}`;
+}
+"""
+MAX_MONTH_STEPS = 13
+
+
+@dataclass(frozen=True)
+class Target:
+    """How to find a control; `{label}` placeholders are filled per locale."""
+    css: str | None = None
+    role: str | None = None
+    name: str | None = None
+    has_text: str | None = None
+
+    def locator(self, page, labels):
+        fill = lambda s: s.format(**labels) if s else s
+        if self.role:
+            loc = page.get_by_role(self.role, name=fill(self.name)) if self.name else page.get_by_role(self.role)
+        else:
+            loc = page.locator(fill(self.css))
+        if self.has_text:
+            loc = loc.filter(has_text=fill(self.has_text))
+        return loc
+
+
+@dataclass(frozen=True)
+class Step:
+    """One action. `optional` steps are skipped when their control is missing
+    or disabled, required ones record `issue`; `stop=True` ends the walk
+    there instead (checks still run). `trace=True` steps are traced when
+    the run has a profiler."""
+    action: str             # goto | click | fill | dates | shot | layout | taps | expect | checkpoint
+    target: str | None = None
+    value: str | None = None
+    shot: str | None = None
+    optional: bool = True
+    stop: bool = False
+    issue: str | None = None
+    trace: bool = False
+
+
+@dataclass(frozen=True)
+class Flow:
+    name: str
+    labels: dict = field(default_factory=dict)   # label -> (namespace, dotted key)
+    targets: dict = field(default_factory=dict)
+    steps: tuple = ()
+    checks: tuple = ()
+
+    def resolve_labels(self, locale):
+        return {label: message(locale, ns, key) for label, (ns, key) in self.labels.items()}
+
+
+class _Skip(Exception):
+    pass
+
+
+class _Run:
+    """State of one flow run; its methods are generators driven by a driver."""
+
+    def __init__(self, flow, page, profile, locale, out_dir, base_url, ready, dates, profiler=None, writer=None,
+                 checkpoints=None, resume=None):
+        self.flow = flow
+        self.page = page
+        self.profile = profile
+        self.locale = locale
+        self.out_dir = out_dir
+        self.base_url = base_url
+        self.ready = ready
+        self.dates = dates
+        self.profiler = profiler
+        self.writer = writer
+        self.checkpoints = checkpoints
+        self.resume_from = resume
+        self.labels = flow.resolve_labels(locale)
+        self.locators = {name: t.locator(page, self.labels) for name, t in flow.targets.items()}
+        self.result = FlowResult(flow.name, profile.name, locale)
+
+    def probe(self, target):
+        return (yield from self.probe_locator(self.locators[target]))
+
+    def probe_locator(self, loc):
+        return (yield loc.evaluate_all(PROBE_SCRIPT))
+
+    def shot(self, step):
+        if not self.out_dir:
+            return
+        path = f"{self.out_dir}/{self.profile.name}_{step}.png"
+        if self.writer:
+            path = self.writer.submit((yield self.page.screenshot()), path)
+        else:
+            yield self.page.screenshot(path=path)
+        self.result.screenshots.append({"step": step, "path": path})
+
+    def act(self, step):
+        page, loc = self.page, self.locators.get(step.target)
+        if step.action == "goto":
+            yield page.goto(localized_url(step.value, self.locale, self.base_url),
+                            wait_until="domcontentloaded")
+        elif step.action in ("click", "fill"):
+            state = yield from self.probe(step.target)
+            if not (state["visible"] and state["enabled"]):
+                raise _Skip(step.target)
+            if step.action == "click":
+                yield loc.first.click()
+            else:
+                yield loc.first.fill(step.value.format(**self.labels))
+        elif step.action == "dates":
+            yield from self.pick_dates(step)
+        elif step.action == "layout":
+            report = yield page.evaluate(LAYOUT_AUDIT_SCRIPT, [DEFAULT_TOLERANCE_PX, MAX_PER_KIND])
+            self.result.audits[step.value] = report
+            self.result.issues.extend(layout_issues(report, step.value))
+            return
+        elif step.action == "taps":
+            report = yield page.evaluate(TAP_SCRIPT, [MIN_TARGET_PX, TAP_CAP])
+            self.result.audits[step.value] = report
+            self.result.issues.extend(tap_issues(report, step.value))
+            return
+        elif step.action == "expect":
+            state = yield from self.probe(step.target)
+            if not state["visible"]:
+                raise _Skip(step.target)
+            return
+        elif step.action == "checkpoint":
+            if self.checkpoints:
+                yield from self.checkpoints.save_steps(page, self.profile.name, step.value)
+            return
+        if step.action != "shot":
+            yield self.ready(page)
+
+    def pick_dates(self, step):
+        """Native date inputs (old wizard) or the DateRangePicker calendar (current)."""
+        start, end = self.dates
+        inputs = self.locators["date_inputs"]
+        if (yield from self.probe("date_inputs"))["count"] >= 2:
+            yield inputs.nth(0).fill(start.isoformat())
+            yield inputs.nth(1).fill(end.isoformat())
+            return
+        state = yield from self.probe("checkin")
+        if not state["visible"]:
+            raise _Skip("checkin")
+        yield self.locators["checkin"].first.click()
+        yield self.ready(self.page)
+        for day in (start, end):
+            yield from self.show_month(day)
+            cell = self.locators["calendar_day"].filter(has_text=re.compile(rf"^\s*{day.day}\s*$"))
+            if not (yield from self.probe_locator(cell))["enabled"]:
+                raise _Skip("calendar_day")
+            yield cell.first.click()
+
+    def show_month(self, day):
+        """Page the calendar forward until its caption is `day`'s month."""
+        caption = yield self.page.evaluate(MONTH_CAPTION_SCRIPT, [self.locale, day.year, day.month - 1])
+        for _ in range(MAX_MONTH_STEPS):
+            if (yield self.page.get_by_text(caption, exact=True).count()):
+                return
+            state = yield from self.probe("next_month")
+            if not (state["visible"] and state["enabled"]):
+                break
+            yield self.locators["next_month"].first.click()
+        raise _Skip("next_month")
+
+    def traced(self, index, step):
+        if not (step.trace and self.profiler):
+            return (yield from self.act(step))
+        label = f"{self.flow.name} {index:02d} {step.action} {step.target or step.value}"
+        handle = yield from self.profiler.begin(self.page)
+        try:
+            yield from self.act(step)
+        finally:
+            summary = yield from self.profiler.end(self.page, handle, self.profile.name, label)
+            self.result.audits[f"{label} trace"] = summary
+
+    def resume(self):
+        """Restore the `resume` checkpoint; the index of the step to continue from."""
+        index = next((i for i, step in enumerate(self.flow.steps)
+                      if step.action == "checkpoint" and step.value == self.resume_from), None)
+        if index is None:
+            raise ValueError(f"{self.flow.name} has no checkpoint step {self.resume_from!r}")
+        checkpoint = self.checkpoints.load(self.profile.name, self.resume_from)
+        if checkpoint is None:
+            self.result.issues.append(f"No checkpoint {self.resume_from!r}; replayed from the start")
+            return 0
+        yield from self.checkpoints.restore_steps(self.page, checkpoint)
+        yield self.ready(self.page)
+        self.result.resumed = {"checkpoint": checkpoint.name, "age": round(checkpoint.age, 1)}
+        return index + 1
+
+    def run_steps(self, steps, start=0):
+        for index, step in enumerate(steps, start):
+            started = time.perf_counter()
+            try:
+                yield from self.traced(index, step)
+            except _Skip:
+                if step.stop:
+                    return
+                if not step.optional:
+                    self.result.issues.append(step.issue or f"{step.action} {step.target}: not available")
+                continue
+            self.result.timings[f"{index:02d} {step.action} {step.target or step.value}"] = round(
+                time.perf_counter() - started, 3)
+            if step.shot:
+                yield from self.shot(step.shot)
+
+    def run(self):
+        started = time.perf_counter()
+        if self.out_dir:
+            os.makedirs(self.out_dir, exist_ok=True)
+        try:
+            start = (yield from self.resume()) if self.resume_from else 0
+            yield from self.run_steps(self.flow.steps[start:], start)
+            yield from self.run_steps(self.flow.checks, len(self.flow.steps))
+        except Exception as e:
+            self.result.issues.append(f"Error: {e}")
+            try:
+                yield from self.shot("error")
+            except Exception:
+                pass
+        self.result.duration = time.perf_counter() - started
+        return self.result
+
+
+def _drive(gen):
+    value = None
+    while True:
+        try:
+            value = gen.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def _drive_async(gen):
+    send, value = gen.send, None
+    while True:
+        try:
+            awaitable = send(value)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            value, send = await awaitable, gen.send
+        except Exception as e:
+            value, send = e, gen.throw
+
+
+def run_flow(flow, page, profile, locale, out_dir, dates, base_url=BASE_URL, profiler=None, writer=None,
+             checkpoints=None, resume=None):
+    run = _Run(flow, page, profile, locale, out_dir, base_url, wait_for_ready, dates, profiler, writer,
+               checkpoints, resume)
+    return _drive(run.run())
+
+
+async def async_run_flow(flow, page, profile, locale, out_dir, dates, base_url=BASE_URL, profiler=None,
+                         writer=None, checkpoints=None, resume=None):
+    run = _Run(flow, page, profile, locale, out_dir, base_url, async_wait_for_ready, dates, profiler, writer,
+               checkpoints, resume)
+    return await _drive_async(run.run())
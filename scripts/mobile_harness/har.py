@@ -0,0 +1,103 @@
+"""
+HAR record/replay so flows can run offline against recorded traffic.
+
+    live    talk to the real server (default)
+    record  go to the network as usual and save every request/response of
+            the flow into a HAR (bodies embedded, so one file is the fixture)
+    replay  serve every request from that HAR through Playwright routing;
+            nothing reaches the network, so a run needs no dev server and
+            no Supabase/Gemini backend, and takes no server time
+
+Each flow/profile pair gets its own HAR under HAR_ROOT/<name>/, because
+responses differ per viewport (images, user agent) and per flow. Requests
+the recording does not contain are aborted in replay (`strict=True`) so a
+stale fixture fails loudly; `strict=False` lets them fall through to the
+network instead.
+
+Playwright writes a recorded HAR when the context closes, which is why the
+pools give HAR-routed pages a throwaway context (see `setup=` on
+BrowserPool.page / AsyncBrowserPool.page / run_matrix).
+
+Service workers are blocked in those contexts. Requests a service worker
+makes (public/sw.js handles /trips/*) bypass `route_from_har`, so they
+would go unrecorded, or reach the network during replay. The setup hooks
+carry HAR_CONTEXT_OPTIONS as `context_options`, which the pools pass to
+`new_context`.
+"""
+
+import os
+
+from .config import HARNESS_HOME
+
+HAR_ROOT = HARNESS_HOME / "har"
+MODES = ("live", "record", "replay")
+HAR_CONTEXT_OPTIONS = {"service_workers": "block"}
+
+
+class NetworkMode:
+    def __init__(self, mode="live", name="default", root=HAR_ROOT, strict=True):
+        if mode not in MODES:
+            raise ValueError(f"Unknown network mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.mode = mode
+        self.name = name
+        self.root = root
+        self.strict = strict
+
+    @classmethod
+    def from_args(cls, args, name):
+        return cls(args.network, name, strict=not args.har_fallback)
+
+    @property
+    def live(self):
+        return self.mode == "live"
+
+    def har_path(self, *parts):
+        return self.root / self.name / ("_".join(str(p) for p in parts) + ".har")
+
+    def _route_options(self, path):
+        if self.mode == "record":
+            path.parent.mkdir(parents=True, exist_ok=True)
+            return {"update": True, "update_content": "embed", "update_mode": "full"}
+        if not path.exists():
+            raise FileNotFoundError(f"No recording at {path}; run once with --network record first")
+        return {"not_found": "abort" if self.strict else "fallback"}
+
+    def setup(self, *parts):
+        """Sync context hook for BrowserPool.page(setup=...); None when live."""
+        if self.live:
+            return None
+        path = self.har_path(*parts)
+
+        def apply(context):
+            context.route_from_har(path, **self._route_options(path))
+        apply.context_options = HAR_CONTEXT_OPTIONS
+        return apply
+
+    def async_setup(self, *parts):
+        """Async context hook for AsyncBrowserPool.page(setup=...); None when live."""
+        if self.live:
+            return None
+        path = self.har_path(*parts)
+
+        async def apply(context):
+            await context.route_from_har(path, **self._route_options(path))
+        apply.context_options = HAR_CONTEXT_OPTIONS
+        return apply
+
+    def job_setup(self, profile, flow_name):
+        """`setup=` for run_matrix: one HAR per (profile, flow) job."""
+        return self.async_setup(profile.name, flow_name)
+
+    def describe(self):
+        if self.live:
+            return "live network"
+        verb = "recording to" if self.mode == "record" else "replaying from"
+        return f"{verb} {os.path.join(str(self.root), self.name)}"
+
+
+def add_network_arguments(parser):
+    parser.add_argument("--network", choices=MODES,
+                        default=os.environ.get("HARNESS_NETWORK", "live"),
+                        help="live, record to HAR, or replay from HAR (env HARNESS_NETWORK)")
+    parser.add_argument("--har-fallback", action="store_true",
+                        help="in replay, send requests missing from the HAR to the network")
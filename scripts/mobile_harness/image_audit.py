@@ -0,0 +1,167 @@
+"""
+Network-level image audit: bytes, format and sizing per image.
+
+The landing and shared-trip scripts only checked whether each <img> had
+loaded. `ImageAudit(page, profile)` also listens to the page's network
+traffic. Each `audit()` joins what the browser fetched with what the page
+renders, in one async evaluate:
+
+  bytes        encoded body bytes transferred (Playwright request sizes)
+  format       response content-type (webp/avif vs legacy jpeg/png/gif)
+  intrinsic    naturalWidth x naturalHeight
+  rendered     CSS box x device_scale_factor, the pixels actually needed
+  decode_ms    time to decode a fresh Image() of the same source
+
+An image with more intrinsic pixels than it needs wastes roughly
+bytes * (1 - needed / intrinsic). That is the estimate Lighthouse uses for
+"properly size images". Totals are kept per route and viewport. Images
+fetched but not in the DOM (CSS backgrounds, preloads) are counted with
+bytes and format only.
+
+Sync API only, like the scripts that use it (verify-landing-*.py,
+capture-screenshots.py).
+"""
+
+import json
+import mimetypes
+import os
+from urllib.parse import urlparse
+
+from .budgets import route_path
+
+LEGACY_FORMATS = ("image/jpeg", "image/png", "image/gif", "image/bmp")
+# Intrinsic pixels this many times the needed ones count as oversized.
+OVERSIZE_RATIO = 1.5
+MAX_DECODES = 60
+
+IMAGE_SCRIPT = """
+async ([maxDecodes]) => {
+  const dpr = window.devicePixelRatio || 1;
+  const rows = new Map();
+  for (const img of document.images) {
+    const src = img.currentSrc || img.src;
+    if (!src || src.startsWith('data:')) continue;
+    const rect = img.getBoundingClientRect();
+    const row = rows.get(src) || {
+      src, complete: img.complete, loading: img.loading || 'auto',
+      intrinsic: [img.naturalWidth, img.naturalHeight], rendered: [0, 0], in_viewport: false,
+    };
+    // the same source rendered twice needs pixels for its largest box
+    row.rendered = [Math.max(row.rendered[0], rect.width), Math.max(row.rendered[1], rect.height)];
+    row.in_viewport = row.in_viewport || (rect.bottom > 0 && rect.top < innerHeight && rect.width > 0);
+    rows.set(src, row);
+  }
+  let decoded = 0;
+  for (const row of rows.values()) {
+    if (!row.complete || !row.intrinsic[0] || decoded >= maxDecodes) continue;
+    decoded += 1;
+    const probe = new Image();
+    probe.src = row.src;
+    const start = performance.now();
+    try { await probe.decode(); row.decode_ms = Math.round((performance.now() - start) * 10) / 10; }
+    catch (e) { row.decode_ms = null; }
+  }
+  return { dpr, images: [...rows.values()] };
+}
+"""
+
+
+def _format(content_type, url):
+    if content_type:
+        return content_type.split(";")[0].strip().lower()
+    guessed, _ = mimetypes.guess_type(urlparse(url).path)
+    return guessed or "unknown"
+
+
+def wasted_bytes(size, intrinsic, needed):
+    """Bytes beyond what the rendered size needs (0 when not oversized)."""
+    natural_px = intrinsic[0] * intrinsic[1]
+    needed_px = needed[0] * needed[1]
+    if not size or not natural_px or not needed_px or natural_px <= needed_px:
+        return 0
+    return round(size * (1 - needed_px / natural_px))
+
+
+class ImageAudit:
+    def __init__(self, page, profile):
+        self.page = page
+        self.profile = profile
+        self._requests = {}
+        self.rows = {}
+        page.on("requestfinished", self._on_finished)
+
+    def _on_finished(self, request):
+        if request.resource_type == "image":
+            # remember which page fetched it, so off-DOM images land on the right route
+            self._requests[request.url] = (request, request.frame.url)
+
+    def _transfer(self, url):
+        if url not in self._requests:
+            return None, None
+        request = self._requests[url][0]
+        response = request.response()
+        sizes = request.sizes()
+        return sizes.get("responseBodySize", 0), _format(response.headers.get("content-type") if response else None, url)
+
+    def audit(self, label=None):
+        """Audit the images on the page now; returns this pass's rows."""
+        route = label or route_path(self.page.url)
+        data = self.page.evaluate(IMAGE_SCRIPT, [MAX_DECODES])
+        dpr = data["dpr"]
+        rows = []
+        in_dom = set()
+        for img in data["images"]:
+            in_dom.add(img["src"])
+            size, fmt = self._transfer(img["src"])
+            needed = [round(img["rendered"][0] * dpr), round(img["rendered"][1] * dpr)]
+            natural_px = img["intrinsic"][0] * img["intrinsic"][1]
+            rows.append({
+                **img,
+                "in_dom": True,
+                "bytes": size,
+                "format": fmt or _format(None, img["src"]),
+                "needed": needed,
+                "oversize": round(natural_px / (needed[0] * needed[1]), 2) if needed[0] and needed[1] else None,
+                "wasted_bytes": wasted_bytes(size, img["intrinsic"], needed),
+            })
+        page_route = route_path(self.page.url)
+        for url, (_, fetched_on) in self._requests.items():
+            if url not in in_dom and route_path(fetched_on) == page_route:
+                size, fmt = self._transfer(url)
+                rows.append({"src": url, "bytes": size, "format": fmt, "in_dom": False, "wasted_bytes": 0})
+        for row in rows:
+            self.rows[(self.profile.name, route, row["src"])] = {"viewport": self.profile.name, "route": route, **row}
+        return rows
+
+    def summary(self):
+        """{"<route> @ <viewport>": {images, bytes, wasted_bytes, oversized, legacy_format}}"""
+        groups = {}
+        for row in self.rows.values():
+            g = groups.setdefault(f"{row['route']} @ {row['viewport']}", {
+                "images": 0, "bytes": 0, "wasted_bytes": 0, "oversized": 0, "legacy_format": 0,
+            })
+            g["images"] += 1
+            g["bytes"] += row["bytes"] or 0
+            g["wasted_bytes"] += row["wasted_bytes"]
+            g["oversized"] += bool(row.get("oversize") and row["oversize"] > OVERSIZE_RATIO)
+            g["legacy_format"] += row["format"] in LEGACY_FORMATS
+        return groups
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"summary": self.summary(), "images": list(self.rows.values())}, f, indent=2)
+        return path
+
+    def print_summary(self, top=5):
+        print("\n🖼  Image audit:")
+        for key, g in self.summary().items():
+            print(f"  {key}: {g['images']} images, {g['bytes'] // 1024}KB, "
+                  f"~{g['wasted_bytes'] // 1024}KB wasted, {g['oversized']} oversized, "
+                  f"{g['legacy_format']} legacy format")
+        worst = sorted(self.rows.values(), key=lambda r: r["wasted_bytes"], reverse=True)[:top]
+        for row in worst:
+            if row["wasted_bytes"]:
+                print(f"    -{row['wasted_bytes'] // 1024}KB {row['format']} "
+                      f"{row['intrinsic'][0]}x{row['intrinsic'][1]} for {row['needed'][0]}x{row['needed'][1]} "
+                      f"{row['src'][:80]}")
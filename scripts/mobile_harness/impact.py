@@ -0,0 +1,266 @@
+"""
+Change-aware incremental runs: which routes does a diff touch?
+
+`analyze_impact(base_ref)` diffs the working tree against the merge base
+with `base_ref` and maps each changed file to the app routes it can
+affect:
+
+  app/.../page.tsx            that route
+  layout / template / loading / error / not-found
+                              every route at or below its directory
+  components/, lib/, hooks/   every page or layout that imports it,
+                              directly or transitively (`@/` and relative
+                              imports)
+  messages/<locale>/<ns>.json files calling useTranslations/getTranslations
+                              with namespace <ns>, for that locale only
+  public/ and data files      files that mention the asset URL or the data
+                              directory (content/blog -> lib/blog/api.ts)
+  GLOBAL_FILES                everything (dependencies, next/tailwind
+                              config, middleware)
+
+Tests, API route handlers and files that no page reaches affect nothing.
+Routes are app-router patterns with [locale], (groups) and @slots
+removed: `/`, `/blog/[slug]`, `/trips/new`. `Impact.affects(path)`
+matches a concrete URL path, such as a sitemap entry or a flow's start
+page, to its most specific route.
+
+`shard --since REF` and `crawl --since REF` use this to re-run only the
+affected items and reuse stored results for the rest. Scripts that always
+walk fixed pages can be gated in CI with
+`mobile-harness.py impact --since REF --route /trips/new`.
+"""
+
+import fnmatch
+import os
+import re
+import subprocess
+from collections import deque
+from dataclasses import dataclass, field
+
+from .config import REPO_ROOT
+from .locales import DEFAULT_LOCALE, LOCALES
+
+SOURCE_DIRS = ("app", "components", "lib", "hooks", "types")
+SOURCE_EXTS = (".tsx", ".ts", ".jsx", ".js", ".mjs", ".css")
+TEST_PATTERNS = ("*.test.*", "*.spec.*", "*.vitest.*", "*/__tests__/*")
+GLOBAL_FILES = (
+    "package.json", "package-lock.json", "next.config.*", "middleware.ts", "i18n.ts",
+    "tailwind.config.*", "postcss.config.*", "tsconfig.json", "instrumentation-client.ts",
+)
+PAGE_FILES = ("page",)
+SUBTREE_FILES = ("layout", "template", "loading", "error", "not-found", "default")
+
+IMPORT_RE = re.compile(r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\(\s*|@import\s+)["']([^"']+)["']""")
+NAMESPACE_RE = re.compile(
+    r"""(?:useTranslations|getTranslations)\(\s*(?:\{[^}]*?namespace:\s*)?["']([\w-]+)"""
+)
+
+
+def _stem(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _is_test(path):
+    return any(fnmatch.fnmatch(path, pattern) for pattern in TEST_PATTERNS)
+
+
+def route_of_dir(directory):
+    """'app/[locale]/(marketing)/blog/[slug]' -> '/blog/[slug]'."""
+    parts = directory.split("/")[1:]
+    kept = [p for p in parts if p != "[locale]" and not p.startswith(("(", "@"))]
+    return "/" + "/".join(kept)
+
+
+def _route_regex(route):
+    pattern = ""
+    for part in route.strip("/").split("/") if route != "/" else []:
+        if part.startswith("[[..."):
+            pattern += "(?:/.*)?"
+        elif part.startswith("[..."):
+            pattern += "/.+"
+        elif part.startswith("["):
+            pattern += "/[^/]+"
+        else:
+            pattern += "/" + re.escape(part)
+    return re.compile(f"^{pattern or '/'}$")
+
+
+def split_locale(path):
+    """'/it/blog/x' -> ('it', '/blog/x'); unprefixed paths are the default locale."""
+    parts = path.split("/", 2)
+    if len(parts) > 1 and parts[1] in LOCALES:
+        return parts[1], "/" + (parts[2] if len(parts) > 2 else "")
+    return DEFAULT_LOCALE, path
+
+
+def git_changed_files(base_ref, repo=REPO_ROOT):
+    """Files changed since the merge base with `base_ref`, including uncommitted and untracked ones."""
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+    try:
+        base = git("merge-base", base_ref, "HEAD").strip()
+    except subprocess.CalledProcessError:
+        base = base_ref
+    changed = git("diff", "--name-only", "--no-renames", base).splitlines()
+    changed += git("ls-files", "--others", "--exclude-standard").splitlines()
+    return sorted(set(filter(None, changed)))
+
+
+class SourceGraph:
+    """Reverse import graph over the app's TS/JS/CSS sources."""
+
+    def __init__(self, repo=REPO_ROOT):
+        self.repo = str(repo)
+        self.texts = {}
+        for top in SOURCE_DIRS:
+            for root, dirs, files in os.walk(os.path.join(self.repo, top)):
+                dirs[:] = [d for d in dirs if d not in ("node_modules", "__tests__")]
+                for name in files:
+                    rel = os.path.relpath(os.path.join(root, name), self.repo).replace(os.sep, "/")
+                    if name.endswith(SOURCE_EXTS) and not _is_test(rel):
+                        with open(os.path.join(root, name), encoding="utf-8", errors="replace") as f:
+                            self.texts[rel] = f.read()
+        self.importers = {}
+        for rel, text in self.texts.items():
+            for spec in IMPORT_RE.findall(text):
+                target = self.resolve(spec, rel)
+                if target:
+                    self.importers.setdefault(target, set()).add(rel)
+        # route -> directory of its page file
+        self.pages = {
+            route_of_dir(os.path.dirname(rel)): os.path.dirname(rel) for rel in sorted(self.texts)
+            if rel.startswith("app/") and _stem(rel) in PAGE_FILES
+        }
+        self.routes = sorted(self.pages)
+        self._regexes = [(route, _route_regex(route)) for route in self.routes]
+
+    def resolve(self, spec, importer):
+        if spec.startswith("@/"):
+            base = spec[2:]
+        elif spec.startswith("."):
+            base = os.path.normpath(os.path.join(os.path.dirname(importer), spec)).replace(os.sep, "/")
+        else:
+            return None
+        for candidate in (base, *(base + ext for ext in SOURCE_EXTS),
+                          *(f"{base}/index{ext}" for ext in SOURCE_EXTS)):
+            if candidate in self.texts:
+                return candidate
+        return None
+
+    def dependents(self, start):
+        """`start` plus every source that imports it, transitively."""
+        seen, todo = {start}, deque([start])
+        while todo:
+            for importer in self.importers.get(todo.popleft(), ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    todo.append(importer)
+        return seen
+
+    def routes_for_source(self, rel):
+        """Routes rendered by an app/ page or under an app/ layout-like file."""
+        if not rel.startswith("app/") or "/api/" in rel:
+            return []
+        if _stem(rel) in PAGE_FILES:
+            return [route_of_dir(os.path.dirname(rel))]
+        if _stem(rel) in SUBTREE_FILES:
+            return self.subtree(os.path.dirname(rel))
+        return []
+
+    def subtree(self, directory):
+        """Routes whose page lives in `directory` or below it."""
+        return [r for r, d in self.pages.items() if d == directory or d.startswith(directory + "/")]
+
+    def mentioning(self, needle):
+        return [rel for rel, text in self.texts.items() if needle in text]
+
+    def namespace_users(self, namespace):
+        return [rel for rel, text in self.texts.items() if namespace in NAMESPACE_RE.findall(text)]
+
+    def route_for_path(self, path):
+        """The most specific route pattern serving a locale-stripped path (static segments win)."""
+        matches = [route for route, regex in self._regexes if regex.match(path.rstrip("/") or "/")]
+        return min(matches, key=lambda r: (r.count("["), -len(r)), default=None)
+
+
+@dataclass
+class Impact:
+    base: str
+    files: list
+    everything: bool = False
+    # route -> set of locales, or None for every locale
+    routes: dict = field(default_factory=dict)
+    # route -> the changed file that first reached it
+    reasons: dict = field(default_factory=dict)
+    graph: SourceGraph = None
+
+    def add(self, route, locales, reason):
+        if route in self.routes and self.routes[route] is None:
+            return
+        self.routes[route] = None if locales is None else set(locales) | (self.routes.get(route) or set())
+        self.reasons.setdefault(route, reason)
+
+    def affects(self, path):
+        """Whether a concrete URL path (with or without locale prefix) needs re-running."""
+        if self.everything:
+            return True
+        locale, bare = split_locale(path.split("?")[0])
+        route = self.graph.route_for_path(bare)
+        if route not in self.routes:
+            return False
+        locales = self.routes[route]
+        return locales is None or locale in locales
+
+    def to_dict(self):
+        return {
+            "base": self.base,
+            "files": self.files,
+            "everything": self.everything,
+            "routes": {r: sorted(l) if l is not None else "*" for r, l in sorted(self.routes.items())},
+            "reasons": self.reasons,
+        }
+
+
+def _seeds(path, graph):
+    """(sources to propagate from, locales or None) for one changed file."""
+    if path in graph.texts:
+        return [path], None
+    if _is_test(path) or path.endswith(SOURCE_EXTS):
+        return [], None  # tests, deleted sources (their importers changed too), scripts
+    match = re.match(r"messages/([\w-]+)/([\w-]+)\.json$", path)
+    if match:
+        return graph.namespace_users(match.group(2)), {match.group(1)}
+    if path.startswith("public/"):
+        return graph.mentioning(path[len("public"):]), None
+    if path.startswith("app/"):
+        return [], None  # colocated with a route; handled by directory
+    directory = os.path.dirname(path)
+    while directory.count("/") >= 1:
+        users = graph.mentioning(directory)
+        if users:
+            return users, None
+        directory = os.path.dirname(directory)
+    return [], None
+
+
+def analyze_impact(base_ref, repo=REPO_ROOT, files=None):
+    files = git_changed_files(base_ref, repo) if files is None else files
+    graph = SourceGraph(repo)
+    impact = Impact(base_ref, files, graph=graph)
+    for path in files:
+        if any(fnmatch.fnmatch(path, pattern) for pattern in GLOBAL_FILES):
+            impact.everything = True
+            impact.reasons.setdefault("*", path)
+            continue
+        sources, locales = _seeds(path, graph)
+        if not sources and path.startswith("app/") and "/api/" not in path:
+            # colocated assets (opengraph-image.png, ...) belong to their directory
+            for route in graph.subtree(os.path.dirname(path)):
+                impact.add(route, locales, path)
+            continue
+        for source in sources:
+            for dependent in graph.dependents(source):
+                for route in graph.routes_for_source(dependent):
+                    impact.add(route, locales, path)
+    return impact
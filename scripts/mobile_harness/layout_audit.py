@@ -0,0 +1,127 @@
+"""
+Single-pass in-page layout audit.
+
+The scripts checked layout with `document.documentElement.scrollWidth` vs
+`window.innerWidth` (one or two evaluates per check), which says that
+something overflows but not what. `audit_layout(page)` walks the DOM once
+inside a single evaluate and returns a structured payload:
+
+  overflow_x     outermost elements reaching past the viewport's left or
+                 right edge (elements inside a clipping/scrolling ancestor
+                 are skipped — carousels are meant to overflow)
+  clipped_fixed  position:fixed/sticky bars cut off by the viewport, or
+                 whose own content is wider than the bar
+  text_overflow  text containers whose content is wider than their box
+                 (spilling out, or cut off without an ellipsis)
+
+plus the document's scroll width. Each offender comes with a short CSS
+path, its rect and a text snippet; lists are capped so the payload stays
+small on big pages. `layout_issues(report, label)` turns it into the
+issue strings the scripts collect.
+"""
+
+import json
+
+DEFAULT_TOLERANCE_PX = 5
+MAX_PER_KIND = 25
+
+LAYOUT_AUDIT_SCRIPT = """
+([tol, cap]) => {
+  const vw = window.innerWidth, vh = window.innerHeight;
+  const out = { overflow_x: [], clipped_fixed: [], text_overflow: [] };
+  const counts = { overflow_x: 0, clipped_fixed: 0, text_overflow: 0 };
+  const describe = (el) => {
+    const parts = [];
+    for (let n = el; n && n.nodeType === 1 && parts.length < 4; n = n.parentElement) {
+      let part = n.tagName.toLowerCase();
+      if (n.id) { parts.unshift(part + '#' + n.id); break; }
+      const cls = (n.getAttribute('class') || '').split(/\\s+/).filter(Boolean).slice(0, 2);
+      if (cls.length) part += '.' + cls.join('.');
+      parts.unshift(part);
+    }
+    return parts.join(' > ');
+  };
+  const add = (kind, el, rect, extra) => {
+    counts[kind] += 1;
+    if (out[kind].length >= cap) return;
+    out[kind].push({
+      selector: describe(el),
+      rect: [Math.round(rect.left), Math.round(rect.top), Math.round(rect.width), Math.round(rect.height)],
+      text: (el.innerText || '').trim().slice(0, 60),
+      ...extra,
+    });
+  };
+  const hasOwnText = (el) => {
+    for (const c of el.childNodes) if (c.nodeType === 3 && c.textContent.trim()) return true;
+    return false;
+  };
+
+  // state per element: { clipped: inside an x-clipping ancestor, reported: an ancestor already overflows }
+  const state = new Map([[document.body, { clipped: false, reported: false }]]);
+  const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+  for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+    const parent = state.get(el.parentElement) || { clipped: false, reported: false };
+    const style = getComputedStyle(el);
+    const mine = { clipped: parent.clipped, reported: parent.reported };
+    state.set(el, mine);
+    if (style.display === 'none') { mine.reported = true; continue; }
+    const rect = el.getBoundingClientRect();
+    const visible = rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden';
+    const fixed = style.position === 'fixed' || style.position === 'sticky';
+
+    if (visible && !mine.clipped && !mine.reported && (rect.right > vw + tol || rect.left < -tol)) {
+      add('overflow_x', el, rect, { past_px: Math.round(Math.max(rect.right - vw, -rect.left)) });
+      mine.reported = true;
+    }
+    if (visible && fixed) {
+      const cut = rect.left < -tol || rect.right > vw + tol || (style.position === 'fixed' && (rect.top < -tol || rect.bottom > vh + tol));
+      const cramped = el.scrollWidth > el.clientWidth + tol && style.overflowX !== 'visible';
+      if (cut || cramped) add('clipped_fixed', el, rect, { position: style.position, cut, cramped });
+    }
+    if (visible && hasOwnText(el) && el.scrollWidth > el.clientWidth + tol && el.clientWidth > 0
+        && style.textOverflow !== 'ellipsis') {
+      add('text_overflow', el, rect, {
+        content_px: el.scrollWidth, box_px: el.clientWidth,
+        clipped: style.overflowX !== 'visible',
+      });
+    }
+    if (style.overflowX !== 'visible' && el !== document.documentElement) mine.clipped = true;
+  }
+  return {
+    viewport: [vw, vh],
+    scroll_width: document.documentElement.scrollWidth,
+    document_overflow: document.documentElement.scrollWidth > vw + tol,
+    counts,
+    ...out,
+  };
+}
+"""
+
+
+def audit_layout(page, tolerance=DEFAULT_TOLERANCE_PX, cap=MAX_PER_KIND):
+    return page.evaluate(LAYOUT_AUDIT_SCRIPT, [tolerance, cap])
+
+
+async def async_audit_layout(page, tolerance=DEFAULT_TOLERANCE_PX, cap=MAX_PER_KIND):
+    return await page.evaluate(LAYOUT_AUDIT_SCRIPT, [tolerance, cap])
+
+
+def layout_issues(report, label):
+    """Issue strings for a report: the document overflow plus the first offender of each kind."""
+    issues = []
+    width = report["viewport"][0]
+    if report["document_overflow"]:
+        culprit = report["overflow_x"][0]["selector"] if report["overflow_x"] else "unknown element"
+        issues.append(f"{label}: {report['scroll_width']}px > {width}px ({culprit})")
+    for kind, what in (("clipped_fixed", "clipped fixed bar"), ("text_overflow", "text overflow")):
+        if report["counts"][kind]:
+            first = report[kind][0]
+            issues.append(f"{label}: {report['counts'][kind]} {what}(s), e.g. {first['selector']}")
+    return issues
+
+
+def write_audits(audits, path):
+    """Write {key: report} audits collected over a run as one JSON file."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(audits, f, indent=2, sort_keys=True)
+    return path
@@ -0,0 +1,40 @@
+"""
+Locale helpers mirroring the app's next-intl setup (i18n.ts,
+lib/i18n/routing.ts): `localePrefix: "as-needed"`, so the default locale
+has no URL prefix. UI labels are read from messages/<locale>/*.json so
+locators work on every locale, not just English.
+"""
+
+import json
+from functools import lru_cache
+
+from .config import BASE_URL, REPO_ROOT
+
+LOCALES = ("en", "es", "it", "pt")
+DEFAULT_LOCALE = "en"
+
+
+def localized_path(path, locale=DEFAULT_LOCALE):
+    if not path.startswith("/"):
+        path = "/" + path
+    if locale == DEFAULT_LOCALE:
+        return path
+    return f"/{locale}" if path == "/" else f"/{locale}{path}"
+
+
+def localized_url(path, locale=DEFAULT_LOCALE, base_url=BASE_URL):
+    return base_url.rstrip("/") + localized_path(path, locale)
+
+
+@lru_cache(maxsize=None)
+def _messages(locale, namespace):
+    with open(REPO_ROOT / "messages" / locale / f"{namespace}.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def message(locale, namespace, key):
+    """Look up a dotted key, e.g. message("it", "trips", "wizard.step1.continue")."""
+    value = _messages(locale, namespace)
+    for part in key.split("."):
+        value = value[part]
+    return value
@@ -0,0 +1,74 @@
+"""
+The /onboarding page flow, with a checkpoint after every step.
+
+Travel style -> dietary -> accessibility -> active hours -> Create Account
+(/auth/signup for anonymous visitors), declared as a flow_engine.Flow like
+wizard.WIZARD. The page keeps its progress in localStorage
+(`monkeytravel-onboarding-preferences`: currentStep plus the answers so
+far) and restores it on load. So the checkpoint taken after each Continue
+is exactly the state the next step needs, and resuming from it reopens
+/onboarding on that step with the earlier answers.
+
+A full run from empty storage records the checkpoints (STEP_CHECKPOINTS).
+A run with `resume=<checkpoint>` starts there and first checks the page
+came back on the right step. The page's buttons are hard-coded English
+("Continue", "Create Account"); the step content is localised.
+"""
+
+from .config import BASE_URL
+from .flow_engine import Flow, Step, Target, async_run_flow, run_flow
+
+# checkpoint name -> the step the page resumes on
+STEP_CHECKPOINTS = {"dietary": 2, "accessibility": 3, "active_hours": 4}
+TOTAL_STEPS = 4
+
+ONBOARDING = Flow(
+    name="onboarding",
+    labels={
+        "style": ("common", "onboarding.travelStyle.styles.adventure.label"),
+        "signup": ("auth", "signup.title"),
+    },
+    targets={
+        "style": Target(role="button", has_text="{style}"),
+        "continue": Target(role="button", name="Continue"),
+        "create_account": Target(role="button", name="Create Account"),
+        "signup": Target(css="text={signup}"),
+        **{f"step{n}": Target(css=f'text="Step {n} of {TOTAL_STEPS}"') for n in range(1, TOTAL_STEPS + 1)},
+    },
+    steps=(
+        Step("goto", value="/onboarding"),
+        Step("expect", "step1", shot="onboarding_page_step1_travel_style", optional=False,
+             issue="Onboarding did not open on step 1"),
+        Step("layout", value="Onboarding step 1 layout"),
+        Step("taps", value="Onboarding step 1 taps"),
+        Step("click", "style", shot="onboarding_page_step1_selected"),
+        *(
+            step
+            for name, n in STEP_CHECKPOINTS.items()
+            for step in (
+                Step("click", "continue", stop=True, trace=True),
+                Step("checkpoint", value=name),
+                Step("expect", f"step{n}", shot=f"onboarding_page_step{n}_{name}", optional=False,
+                     issue=f"Onboarding not on step {n} ({name})"),
+                Step("layout", value=f"Onboarding step {n} layout"),
+                Step("taps", value=f"Onboarding step {n} taps"),
+            )
+        ),
+        Step("click", "create_account", trace=True),
+    ),
+    checks=(
+        Step("expect", "signup", shot="signup", optional=False,
+             issue="Create Account never reached the signup page"),
+    ),
+)
+
+
+def run_onboarding(page, profile, locale, out_dir, base_url=BASE_URL, profiler=None, checkpoints=None, resume=None):
+    return run_flow(ONBOARDING, page, profile, locale, out_dir, None, base_url, profiler,
+                    checkpoints=checkpoints, resume=resume)
+
+
+async def async_run_onboarding(page, profile, locale, out_dir, base_url=BASE_URL, profiler=None, checkpoints=None,
+                               resume=None):
+    return await async_run_flow(ONBOARDING, page, profile, locale, out_dir, None, base_url, profiler,
+                                checkpoints=checkpoints, resume=resume)
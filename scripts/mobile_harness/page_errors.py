@@ -0,0 +1,289 @@
+"""
+Console / page-error index across runs, routes and viewports.
+
+Only test-wizard-mobile.py looked at the browser console, and only in its
+own run log. Every page the pools (and the crawler) open now records:
+
+  pageerror     uncaught exceptions
+  console       console.error messages
+  hydration     React hydration mismatches (warnings, errors and the
+                minified #418/#423/#425 family)
+  requestfailed requests that never got a response (net::ERR_ABORTED is
+                skipped; cancelled prefetches are not failures)
+  http          responses with status >= 400
+
+Messages are normalized before they are counted. URLs, line:column
+positions, UUIDs, long hex ids and bare numbers are replaced with
+placeholders (`#418` style error codes are kept), so the same bug hit on
+200 pages becomes one fingerprint. Request URLs keep their path shape,
+with id-like segments as `[id]`. Routes are the page's path without a
+locale prefix, with id-like segments folded the same way.
+
+Each fingerprint keeps its count, counts per route and per viewport, one
+raw example and first/last seen times, in HARNESS_HOME/errors.json. The
+pools flush into it when they close. Sharded worker processes flush too,
+under a file lock (flock; msvcrt.locking on Windows). `mobile-harness.py
+errors` prints the ranked list.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import weakref
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from .config import HARNESS_HOME
+from .locales import LOCALES
+
+ERRORS_PATH = HARNESS_HOME / "errors.json"
+KINDS = ("pageerror", "console", "hydration", "requestfailed", "http")
+MAX_MESSAGE = 200
+
+HYDRATION_RE = re.compile(
+    r"hydrat|did not match|server rendered HTML|Minified React error #(?:418|423|425)\b", re.I)
+URL_RE = re.compile(r"\b(?:https?|wss?|blob|webpack(?:-internal)?)://\S+")
+POSITION_RE = re.compile(r"(?<=\S)(?::\d+){1,2}\b")
+UUID_RE = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I)
+HEX_RE = re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.I)
+NUMBER_RE = re.compile(r"(?<![#\w<])\d+(?:\.\d+)?")
+# Path segments folded to [id]: numbers, UUIDs, hex with a digit (like HEX_RE),
+# and long tokens that mix letters with digits or mix case. Readable slugs
+# (lowercase words joined by hyphens, digits or not) stay as they are.
+ID_SEGMENT_RE = re.compile(r"""^(?:
+    \d+
+  | [0-9a-fA-F-]{36}
+  | (?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}
+  | (?=[\w-]*\d)(?=[\w-]*[A-Za-z])\w{16,}
+  | (?=[\w-]*[a-z])(?=[\w-]*[A-Z])[\w-]{16,}
+)$""", re.X)
+
+
+def normalize(message):
+    """First line of a message with volatile parts replaced; stable across pages and runs."""
+    text = (message or "").strip().splitlines()[0] if message and message.strip() else ""
+    text = URL_RE.sub("<url>", text)
+    text = UUID_RE.sub("<id>", text)
+    text = HEX_RE.sub("<id>", text)
+    text = POSITION_RE.sub("", text)
+    text = NUMBER_RE.sub("<n>", text)
+    return re.sub(r"\s+", " ", text).strip()[:MAX_MESSAGE]
+
+
+def path_shape(path):
+    """'/api/trips/8f3c.../share' -> '/api/trips/[id]/share'."""
+    segments = [("[id]" if ID_SEGMENT_RE.match(s) else s) for s in path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def route_of(url):
+    """Locale-free path shape of a page URL; non-http pages keep their URL."""
+    parsed = urlparse(url or "")
+    if parsed.scheme not in ("http", "https"):
+        return url or "?"
+    parts = parsed.path.split("/", 2)
+    if len(parts) > 1 and parts[1] in LOCALES:
+        path = "/" + (parts[2] if len(parts) > 2 else "")
+    else:
+        path = parsed.path or "/"
+    return path_shape(path.rstrip("/") or "/")
+
+
+def request_shape(url):
+    parsed = urlparse(url)
+    return f"{parsed.netloc}{path_shape(parsed.path)}"
+
+
+def fingerprint(kind, normalized):
+    return hashlib.sha1(f"{kind}|{normalized}".encode()).hexdigest()[:12]
+
+
+def classify(msg_type, text):
+    """Kind for a console message, or None when it isn't indexed."""
+    if HYDRATION_RE.search(text):
+        return "hydration"
+    if msg_type == "error" and not text.startswith("Failed to load resource"):
+        # "Failed to load resource" duplicates the http / requestfailed entry
+        return "console"
+    return None
+
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive inter-process lock on `path`; unlocked where neither flock nor msvcrt exists."""
+    with open(path, "a+") as lock:
+        try:
+            import fcntl
+        except ImportError:
+            fcntl = None
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+            return
+        try:
+            import msvcrt
+        except ImportError:
+            yield
+            return
+        lock.seek(0)
+        msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            lock.seek(0)
+            msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ErrorIndex:
+    """Fingerprint -> counts. Records go to `pending` until `save` merges them into the file."""
+
+    def __init__(self, path=ERRORS_PATH):
+        self.path = str(path)
+        self.pending = {}
+
+    def record(self, kind, message, page_url, viewport, normalized=None):
+        normalized = normalize(message) if normalized is None else normalized
+        key = fingerprint(kind, normalized)
+        entry = self.pending.get(key)
+        now = time.time()
+        if entry is None:
+            entry = self.pending[key] = {
+                "kind": kind, "message": normalized, "example": (message or "")[:1000],
+                "count": 0, "routes": {}, "viewports": {}, "first_seen": now,
+            }
+        route = route_of(page_url)
+        entry["count"] += 1
+        entry["routes"][route] = entry["routes"].get(route, 0) + 1
+        entry["viewports"][viewport] = entry["viewports"].get(viewport, 0) + 1
+        entry["last_seen"] = now
+        return key
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self):
+        """Merge pending records into the file (locked, so processes can flush concurrently)."""
+        if not self.pending:
+            return 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with _file_lock(f"{self.path}.lock"):
+            entries = self.load()
+            for key, new in self.pending.items():
+                old = entries.get(key)
+                if old is None:
+                    entries[key] = new
+                    continue
+                old["count"] += new["count"]
+                for field in ("routes", "viewports"):
+                    for name, n in new[field].items():
+                        old[field][name] = old[field].get(name, 0) + n
+                old["last_seen"] = new["last_seen"]
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.path)
+        saved, self.pending = len(self.pending), {}
+        return saved
+
+    def clear(self):
+        self.pending = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def ranked(entries, kind=None, route=None, viewport=None, since=None):
+    """(fingerprint, entry) pairs, most frequent first, optionally filtered."""
+    rows = [
+        (key, e) for key, e in entries.items()
+        if (kind is None or e["kind"] == kind)
+        and (route is None or route in e["routes"])
+        and (viewport is None or viewport in e["viewports"])
+        and (since is None or e["last_seen"] >= since)
+    ]
+    return sorted(rows, key=lambda row: (-row[1]["count"], row[0]))
+
+
+def print_ranked(rows, limit=20):
+    if not rows:
+        print("✅ No console or page errors recorded")
+        return
+    print(f"\n🧯 {len(rows)} distinct error(s):")
+    for key, e in rows[:limit]:
+        routes = sorted(e["routes"].items(), key=lambda kv: -kv[1])
+        where = ", ".join(f"{r} ×{n}" for r, n in routes[:3]) + (" …" if len(routes) > 3 else "")
+        print(f"  {e['count']:5d}  [{e['kind']}] {e['message']}  ({key})")
+        print(f"         {where} | {', '.join(sorted(e['viewports']))}")
+    if len(rows) > limit:
+        print(f"  … {len(rows) - limit} more")
+
+
+class PageErrors:
+    """Listens on one page; `events` keeps this page's (kind, raw message) pairs."""
+
+    def __init__(self, page, viewport, index):
+        # weak, so the recorder (the value in _recorders) doesn't keep its key alive
+        self._page = weakref.ref(page)
+        self.viewport = viewport
+        self.index = index
+        self.events = []
+        page.on("pageerror", self._page_error)
+        page.on("console", self._console)
+        page.on("requestfailed", self._request_failed)
+        page.on("response", self._response)
+
+    def _record(self, kind, message, normalized=None):
+        self.events.append((kind, message))
+        page = self._page()
+        self.index.record(kind, message, page.url if page else None, self.viewport, normalized)
+
+    def _page_error(self, error):
+        message = str(error)
+        self._record("hydration" if HYDRATION_RE.search(message) else "pageerror", message)
+
+    def _console(self, msg):
+        kind = classify(msg.type, msg.text)
+        if kind:
+            self._record(kind, msg.text)
+
+    def _request_failed(self, request):
+        failure = request.failure or "failed"
+        if "ERR_ABORTED" in failure:
+            return
+        self._record("requestfailed", f"{request.method} {request.url} {failure}",
+                     f"{request.method} {request_shape(request.url)} {failure}")
+
+    def _response(self, response):
+        if response.status >= 400:
+            request = response.request
+            self._record("http", f"{response.status} {request.method} {response.url}",
+                         f"{response.status} {request.method} {request_shape(response.url)}")
+
+
+_index = None
+_recorders = weakref.WeakKeyDictionary()
+
+
+def error_index():
+    """The process-wide index the pools record into."""
+    global _index
+    if _index is None:
+        _index = ErrorIndex()
+    return _index
+
+
+def track_errors(page, viewport="?"):
+    """Start (or return) the error recorder for `page`."""
+    recorder = _recorders.get(page)
+    if recorder is None:
+        recorder = _recorders[page] = PageErrors(page, viewport, error_index())
+    return recorder
+
+
+def flush_errors():
+    """Merge this process's records into the persisted index; returns the fingerprints written."""
+    return error_index().save() if _index is not None else 0
@@ -0,0 +1,182 @@
+"""
+Signal-based page readiness, replacing fixed `wait_for_timeout` sleeps.
+
+`wait_for_ready(page)` returns as soon as the page is actually settled:
+
+  1. network quiet — no request started/finished for `quiet_ms`
+     (requests open longer than `long_poll_ms` are treated as long-polls
+     and ignored), tracked from Python via page request events;
+  2. web fonts loaded — `document.fonts.ready`;
+  3. images decoded — `img.decode()` for every complete or in-viewport image;
+  4. CSS animations/transitions finished — every running finite animation
+     from `document.getAnimations()` (infinite spinners are skipped);
+  5. layout stable — `stable_frames` consecutive animation frames with no
+     `layout-shift` entries and no change in document scroll size.
+
+Steps 2-5 run in a single in-page evaluate. Pages borrowed from BrowserPool
+/ AsyncBrowserPool are tracked from creation; other pages start tracking
+on their first wait, so requests already in flight at that point are missed.
+
+On timeout the wait returns a report listing the signals that never
+settled (pass `strict=True` to raise ReadinessTimeout instead).
+"""
+
+import time
+import weakref
+
+POLL_MS = 50
+
+READY_SCRIPT = """
+async ({ timeout, stableFrames, fonts, images, animations }) => {
+  const deadline = performance.now() + timeout;
+  const remaining = () => Math.max(0, deadline - performance.now());
+  const until = (promise) => Promise.race([
+    promise.then(() => true, () => true),
+    new Promise((resolve) => setTimeout(() => resolve(false), remaining())),
+  ]);
+  const frame = () => new Promise((resolve) => requestAnimationFrame(() => resolve()));
+  const report = { fonts: true, images: true, animations: true, layout: true };
+
+  // Let a just-dispatched click commit and start its transitions first.
+  await frame();
+  if (fonts && document.fonts) {
+    report.fonts = await until(document.fonts.ready);
+  }
+  if (images) {
+    const inViewport = (img) => {
+      const r = img.getBoundingClientRect();
+      return r.bottom > 0 && r.top < innerHeight && r.right > 0 && r.left < innerWidth;
+    };
+    const pending = Array.from(document.images)
+      .filter((img) => img.complete || img.loading !== 'lazy' || inViewport(img))
+      .map((img) => img.decode().catch(() => null));
+    report.images = await until(Promise.all(pending));
+  }
+  if (animations && document.getAnimations) {
+    const running = document.getAnimations().filter((a) => {
+      if (a.playState !== 'running' || !a.effect) return false;
+      return Number.isFinite(a.effect.getComputedTiming().endTime);
+    });
+    report.animations = await until(Promise.all(running.map((a) => a.finished)));
+  }
+
+  let shifts = 0;
+  let observer = null;
+  try {
+    observer = new PerformanceObserver((list) => { shifts += list.getEntries().length; });
+    observer.observe({ type: 'layout-shift' });
+  } catch (e) {}
+  let stable = 0;
+  let last = null;
+  while (stable < stableFrames) {
+    if (remaining() === 0) { report.layout = false; break; }
+    const before = shifts;
+    await frame();
+    const root = document.documentElement;
+    const size = root.scrollWidth + 'x' + root.scrollHeight;
+    stable = size === last && shifts === before ? stable + 1 : 0;
+    last = size;
+  }
+  if (observer) observer.disconnect();
+  return report;
+}
+"""
+
+
+class ReadinessTimeout(Exception):
+    pass
+
+
+class NetworkTracker:
+    """Counts in-flight requests for a page from Playwright's request events."""
+
+    def __init__(self, page):
+        self.inflight = {}
+        self.last_activity = time.monotonic()
+        page.on("request", self._started)
+        page.on("requestfinished", self._ended)
+        page.on("requestfailed", self._ended)
+
+    def _started(self, request):
+        self.inflight[request] = self.last_activity = time.monotonic()
+
+    def _ended(self, request):
+        self.inflight.pop(request, None)
+        self.last_activity = time.monotonic()
+
+    def is_quiet(self, quiet_ms, long_poll_ms):
+        now = time.monotonic()
+        active = [t for t in self.inflight.values() if (now - t) * 1000 < long_poll_ms]
+        return not active and (now - self.last_activity) * 1000 >= quiet_ms
+
+
+_trackers = weakref.WeakKeyDictionary()
+
+
+def track_network(page):
+    """Start (or return) the network tracker for `page`."""
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _trackers[page] = NetworkTracker(page)
+    return tracker
+
+
+def _script_args(timeout, stable_frames, fonts, images, animations):
+    return {
+        "timeout": timeout,
+        "stableFrames": stable_frames,
+        "fonts": fonts,
+        "images": images,
+        "animations": animations,
+    }
+
+
+def _finish(report, started, strict):
+    report["elapsed_ms"] = round((time.monotonic() - started) * 1000)
+    report["pending"] = [k for k in ("network", "fonts", "images", "animations", "layout")
+                         if report.get(k) is False]
+    if strict and report["pending"]:
+        raise ReadinessTimeout(f"Page not ready: {', '.join(report['pending'])}")
+    return report
+
+
+def wait_for_ready(page, timeout=10000, quiet_ms=300, long_poll_ms=10000,
+                   stable_frames=3, network=True, fonts=True, images=True,
+                   animations=True, strict=False):
+    """Block until the page is settled (see module docstring); returns a report."""
+    started = time.monotonic()
+    deadline = started + timeout / 1000
+    report = {"network": True}
+    if network:
+        tracker = track_network(page)
+        while not tracker.is_quiet(quiet_ms, long_poll_ms):
+            if time.monotonic() >= deadline:
+                report["network"] = False
+                break
+            page.wait_for_timeout(POLL_MS)
+    remaining = max(0, round((deadline - time.monotonic()) * 1000))
+    report.update(page.evaluate(READY_SCRIPT, _script_args(
+        remaining, stable_frames, fonts, images, animations,
+    )))
+    return _finish(report, started, strict)
+
+
+async def async_wait_for_ready(page, timeout=10000, quiet_ms=300, long_poll_ms=10000,
+                               stable_frames=3, network=True, fonts=True, images=True,
+                               animations=True, strict=False):
+    """`wait_for_ready` for `playwright.async_api` pages."""
+    started = time.monotonic()
+    deadline = started + timeout / 1000
+    report = {"network": True}
+    if network:
+        tracker = track_network(page)
+        while not tracker.is_quiet(quiet_ms, long_poll_ms):
+            if time.monotonic() >= deadline:
+                report["network"] = False
+                break
+            await page.wait_for_timeout(POLL_MS)
+    remaining = max(0, round((deadline - time.monotonic()) * 1000))
+    report.update(await page.evaluate(READY_SCRIPT, _script_args(
+        remaining, stable_frames, fonts, images, animations,
+    )))
+    return _finish(report, started, strict)
@@ -0,0 +1,360 @@
+"""
+Static HTML run report: captures grouped by route, step and viewport.
+
+Reviewing a run meant opening a folder of full-size DPR-3 PNGs one by one.
+`build_report(capture_dir)` writes `<capture_dir>/_report/index.html`, a
+single file with no external CSS, JS or fonts:
+
+  - captures grouped by route, then step, then viewport (a card each)
+  - small JPEG thumbnails, generated on a thread pool and stored by
+    content hash under _report/thumbs, so an unchanged capture is never
+    resized again
+  - full-size baseline / current / diff images, loaded only when a card is
+    opened (the viewer sets `src` on click); thumbnails are
+    `loading="lazy"` and routes are closed <details> until expanded, so a
+    run with thousands of captures opens instantly
+  - the flow timings, vitals and issues of the run that recorded these
+    captures, from the results store (results_db)
+
+Baselines come from the `compare` / `baseline` layout: a capture matches
+`HARNESS_HOME/baselines/<name>/<file>`, and its diff is
+`<capture_dir>/_diff/<file>` with diff-report.json for the changed ratio.
+`--compare` runs the comparison first. Routes and the results run come
+from screenshot hashes in the results store; captures it has never seen
+go under "unrecorded".
+
+Full images are linked by relative path, not copied. Keep the report
+next to its captures (the default), or pass `--copy` to bring them along.
+
+Requires Pillow for thumbnails (`pip install pillow`).
+"""
+
+import html
+import json
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .artifact_store import file_hash, split_capture_name
+from .results_db import RESULTS_DB, format_value
+from .vitals import METRICS, percentile
+
+THUMB_WIDTH = 240
+THUMB_QUALITY = 70
+UNRECORDED = "unrecorded"
+
+
+def _image_lib():
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise SystemExit(f"Report thumbnails need Pillow: pip install pillow ({e})")
+    return Image
+
+
+def make_thumb(path, thumbs_dir, width=THUMB_WIDTH):
+    """(sha256, thumbnail file name, (width, height) of the original); skips thumbs that exist."""
+    digest = file_hash(path)
+    name = f"{digest[:16]}-{width}.jpg"
+    target = os.path.join(thumbs_dir, name)
+    Image = _image_lib()
+    with Image.open(path) as img:
+        size = img.size
+        if not os.path.exists(target):
+            img.draft("RGB", (width, width * img.height // max(1, img.width)))
+            thumb = img.convert("RGB")
+            thumb.thumbnail((width, width * 8))
+            tmp = f"{target}.{os.getpid()}.tmp"
+            thumb.save(tmp, "JPEG", quality=THUMB_QUALITY, optimize=True)
+            os.replace(tmp, target)
+    return digest, name, size
+
+
+def _lookup_results(db_path, hashes):
+    """({hash: (route, run_id)}, newest run id recording any of them) from the results store."""
+    if not os.path.exists(db_path) or not hashes:
+        return {}, None
+    db = sqlite3.connect(db_path)
+    try:
+        found = {}
+        hashes = list(hashes)
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            rows = db.execute(
+                f"SELECT hash, route, run_id FROM screenshots WHERE hash IN ({','.join('?' * len(chunk))}) "
+                "ORDER BY run_id", chunk,
+            )
+            found.update({digest: (route, run_id) for digest, route, run_id in rows})
+    finally:
+        db.close()
+    runs = [run_id for _, run_id in found.values()]
+    return found, max(runs) if runs else None
+
+
+def _run_tables(db_path, run_id):
+    """The run's row, timings, vitals p75 and issues from the results store."""
+    db = sqlite3.connect(db_path)
+    db.row_factory = sqlite3.Row
+    try:
+        run = dict(db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone())
+        timings = [dict(r) for r in db.execute(
+            "SELECT profile, route, step, metric, value FROM measurements "
+            "WHERE run_id = ? AND metric IN ('duration_ms', 'step_ms') ORDER BY route, step, profile",
+            (run_id,),
+        )]
+        samples = {}
+        for r in db.execute(
+            f"SELECT profile, route, metric, value FROM measurements WHERE run_id = ? "
+            f"AND metric IN ({','.join('?' * len(METRICS))})", (run_id, *METRICS),
+        ):
+            samples.setdefault((r["route"], r["profile"]), {}).setdefault(r["metric"], []).append(r["value"])
+        vitals = [
+            {"route": route, "profile": profile, **{m: percentile(values.get(m, []), 75) for m in METRICS}}
+            for (route, profile), values in sorted(samples.items(), key=lambda kv: (kv[0][0] or "", kv[0][1]))
+        ]
+        issues = [dict(r) for r in db.execute(
+            "SELECT profile, route, flow, message FROM issues WHERE run_id = ? ORDER BY route, profile",
+            (run_id,),
+        )]
+    finally:
+        db.close()
+    return run, timings, vitals, issues
+
+
+def _load_diffs(diff_dir):
+    path = os.path.join(diff_dir, "diff-report.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {r["name"]: r for r in json.load(f)["results"]}
+
+
+def collect(capture_dir, profile_names, baseline_dir=None, diff_dir=None, thumbs_dir=None,
+            workers=None, thumb_width=THUMB_WIDTH):
+    """One entry per capture (viewport, step, paths, thumbnails, diff status), thumbnails made in parallel."""
+    names = sorted(f for f in os.listdir(capture_dir) if f.lower().endswith(".png"))
+    diffs = _load_diffs(diff_dir) if diff_dir else {}
+    captures = []
+    for name in names:
+        viewport, step = split_capture_name(name, profile_names)
+        entry = {"name": name, "viewport": viewport or "-", "step": step,
+                 "current": os.path.join(capture_dir, name)}
+        if baseline_dir and os.path.exists(os.path.join(baseline_dir, name)):
+            entry["baseline"] = os.path.join(baseline_dir, name)
+        if diff_dir and os.path.exists(os.path.join(diff_dir, name)):
+            entry["diff"] = os.path.join(diff_dir, name)
+        if name in diffs:
+            entry["ratio"] = diffs[name]["ratio"]
+            entry["size_changed"] = diffs[name]["size_changed"]
+        captures.append(entry)
+
+    jobs = [(entry, kind) for entry in captures for kind in ("current", "baseline", "diff") if kind in entry]
+    os.makedirs(thumbs_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        thumbs = executor.map(lambda job: make_thumb(job[0][job[1]], thumbs_dir, thumb_width), jobs)
+        for (entry, kind), (digest, thumb, size) in zip(jobs, thumbs):
+            entry[f"{kind}_thumb"] = thumb
+            if kind == "current":
+                entry["hash"], entry["size"] = digest, size
+    return captures
+
+
+def _status(entry):
+    if "baseline" not in entry:
+        return "new"
+    if entry.get("size_changed") or entry.get("ratio", 0) > 0:
+        return "changed"
+    return "same" if "ratio" in entry else "baseline"
+
+
+CSS = """
+body{font:14px/1.4 system-ui,sans-serif;margin:0;padding:16px 24px;color:#1d2330;background:#f6f7f9}
+h1{font-size:20px;margin:0 0 4px}h2{font-size:16px;margin:24px 0 8px}h3{font-size:14px;margin:16px 0 8px;color:#4a5263}
+.meta{color:#667085;margin-bottom:12px}.meta code{background:#eceef2;padding:1px 4px;border-radius:3px}
+table{border-collapse:collapse;background:#fff;margin:4px 0 12px;font-size:13px}
+th,td{border:1px solid #e1e4ea;padding:3px 8px;text-align:left;vertical-align:top}th{background:#eef0f4}
+td.num{text-align:right;font-variant-numeric:tabular-nums}
+details.route{background:#fff;border:1px solid #e1e4ea;border-radius:6px;margin:8px 0;padding:4px 12px;content-visibility:auto}
+details.route>summary{cursor:pointer;font-weight:600;padding:6px 0}
+.grid{display:flex;flex-wrap:wrap;gap:12px}
+.card{width:%(w)dpx;cursor:pointer;border:2px solid transparent;border-radius:6px;background:#fafbfc;padding:4px}
+.card:hover{border-color:#98a2b3}.card img{display:block;width:100%%;height:auto;background:#eceef2}
+.card .label{font-size:12px;display:flex;justify-content:space-between;gap:4px;margin-top:4px}
+.badge{border-radius:3px;padding:0 4px;font-size:11px;color:#fff;background:#98a2b3}
+.badge.changed{background:#d92d20}.badge.new{background:#1570ef}.badge.same{background:#079455}
+#viewer{position:fixed;inset:0;background:rgba(16,24,40,.92);display:none;flex-direction:column;z-index:10}
+#viewer.open{display:flex}#viewer .bar{display:flex;gap:8px;align-items:center;padding:8px 16px;color:#fff}
+#viewer .bar button{background:#344054;color:#fff;border:0;border-radius:4px;padding:4px 10px;cursor:pointer}
+#viewer .bar button.on{background:#1570ef}#viewer .bar .title{flex:1}
+#viewer .panes{flex:1;overflow:auto;display:flex;gap:12px;justify-content:center;align-items:flex-start;padding:0 16px 16px}
+#viewer .pane{color:#d0d5dd;font-size:12px;text-align:center}#viewer .pane img{max-width:100%%;display:block}
+#viewer.side .pane{flex:1;min-width:0}
+"""
+
+JS = """
+const viewer = document.getElementById('viewer');
+const panes = viewer.querySelector('.panes');
+let current = null, mode = 'current';
+function show() {
+  const c = current, kinds = mode === 'side' ? ['baseline', 'current', 'diff'] : [mode];
+  viewer.classList.toggle('side', mode === 'side');
+  panes.innerHTML = '';
+  for (const kind of kinds) {
+    if (!c.dataset[kind]) continue;
+    const pane = document.createElement('div');
+    pane.className = 'pane';
+    const img = document.createElement('img');
+    img.src = c.dataset[kind];
+    img.alt = kind;
+    pane.append(kind, img);
+    panes.append(pane);
+  }
+  viewer.querySelectorAll('[data-mode]').forEach((b) => {
+    b.classList.toggle('on', b.dataset.mode === mode);
+    b.disabled = b.dataset.mode !== 'side' && !c.dataset[b.dataset.mode];
+  });
+  viewer.querySelector('.title').textContent = c.dataset.title;
+}
+document.addEventListener('click', (e) => {
+  const card = e.target.closest('.card');
+  if (card) { current = card; mode = 'current'; viewer.classList.add('open'); show(); return; }
+  const button = e.target.closest('[data-mode]');
+  if (button) { mode = button.dataset.mode; show(); return; }
+  if (e.target.closest('.close') || e.target === panes) { viewer.classList.remove('open'); panes.innerHTML = ''; }
+});
+document.addEventListener('keydown', (e) => {
+  if (!viewer.classList.contains('open')) return;
+  if (e.key === 'Escape') { viewer.classList.remove('open'); panes.innerHTML = ''; }
+  const order = ['baseline', 'current', 'diff', 'side'];
+  if (e.key === 'ArrowRight' || e.key === 'ArrowLeft') {
+    const step = e.key === 'ArrowRight' ? 1 : order.length - 1;
+    do { mode = order[(order.indexOf(mode) + step) % order.length]; }
+    while (mode !== 'side' && !current.dataset[mode]);
+    show();
+  }
+});
+"""
+
+
+def _table(headers, rows, numeric=()):
+    out = ["<table><tr>" + "".join(f"<th>{html.escape(h)}</th>" for h in headers) + "</tr>"]
+    for row in rows:
+        out.append("<tr>" + "".join(
+            f"<td class=num>{html.escape(str(v))}</td>" if i in numeric else f"<td>{html.escape(str(v))}</td>"
+            for i, v in enumerate(row)) + "</tr>")
+    out.append("</table>")
+    return "\n".join(out)
+
+
+def render(captures, out_dir, title, run=None, timings=(), vitals=(), issues=(), thumb_width=THUMB_WIDTH):
+    e = html.escape
+
+    def rel(path):
+        return os.path.relpath(path, out_dir).replace(os.sep, "/")
+
+    statuses = [_status(c) for c in captures]
+    counts = {s: statuses.count(s) for s in ("changed", "new", "same")}
+    parts = [
+        "<!doctype html><html><head><meta charset=utf-8>",
+        f"<title>{e(title)}</title><style>{CSS % {'w': thumb_width + 8}}</style></head><body>",
+        f"<h1>{e(title)}</h1>",
+        f"<div class=meta>{len(captures)} capture(s): {counts['changed']} changed, {counts['new']} without "
+        f"baseline, {counts['same']} unchanged · generated {time.strftime('%Y-%m-%d %H:%M')}",
+    ]
+    if run:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(run["started"]))
+        commit = (run["commit_sha"] or "?")[:10] + (" (dirty)" if run["dirty"] else "")
+        parts.append(f"<br>results run #{run['id']} <code>{e(run['script'])}</code> {when} · commit "
+                     f"<code>{e(commit)}</code> · {e(run['base_url'] or '')} · throttle {e(run['throttle'] or 'off')}")
+    parts.append("</div>")
+
+    if issues:
+        parts.append(f"<h2>Issues ({len(issues)})</h2>")
+        parts.append(_table(["route", "viewport", "flow", "issue"],
+                            [(i["route"] or "-", i["profile"], i["flow"] or "", i["message"]) for i in issues]))
+    if timings:
+        profiles = sorted({t["profile"] for t in timings})
+        cells = {}
+        for t in timings:
+            cells.setdefault((t["route"] or "-", t["step"]), {})[t["profile"]] = format_value(t["metric"], t["value"])
+        parts.append("<h2>Timings</h2>")
+        parts.append(_table(["route", "step", *profiles],
+                            [(route, step, *(row.get(p, "") for p in profiles))
+                             for (route, step), row in cells.items()],
+                            numeric=range(2, 2 + len(profiles))))
+    if vitals:
+        parts.append("<h2>Web Vitals (p75 within the run)</h2>")
+        parts.append(_table(["route", "viewport", *(m.upper() for m in METRICS)],
+                            [(v["route"] or "-", v["profile"], *(format_value(m, v[m]) for m in METRICS))
+                             for v in vitals],
+                            numeric=range(2, 2 + len(METRICS))))
+
+    groups = {}
+    for c, status in zip(captures, statuses):
+        groups.setdefault(c.get("route") or UNRECORDED, {}).setdefault(c["step"], []).append((c, status))
+    parts.append("<h2>Captures</h2>")
+    for index, (route, steps) in enumerate(sorted(groups.items(), key=lambda kv: (kv[0] == UNRECORDED, kv[0]))):
+        changed = sum(1 for cards in steps.values() for _, s in cards if s == "changed")
+        n = sum(len(cards) for cards in steps.values())
+        summary = f"{e(route)} — {n} capture(s)" + (f", {changed} changed" if changed else "")
+        parts.append(f"<details class=route{' open' if index == 0 else ''}><summary>{summary}</summary>")
+        for step, cards in sorted(steps.items()):
+            parts.append(f"<h3>{e(step)}</h3><div class=grid>")
+            for c, status in sorted(cards, key=lambda cs: cs[0]["viewport"]):
+                width, height = c.get("size", (thumb_width, thumb_width * 2))
+                data = " ".join(f'data-{kind}="{e(rel(c[kind]))}"'
+                                for kind in ("baseline", "current", "diff") if kind in c)
+                ratio = f" {c['ratio']:.2%}" if status == "changed" and "ratio" in c else ""
+                parts.append(
+                    f'<div class=card {data} data-title="{e(route)} · {e(step)} · {e(c["viewport"])}">'
+                    f'<img loading=lazy decoding=async src="thumbs/{e(c["current_thumb"])}" '
+                    f'width={thumb_width} height={thumb_width * height // max(1, width)} alt="{e(c["name"])}">'
+                    f'<div class=label><span>{e(c["viewport"])}</span>'
+                    f'<span class="badge {status}">{status}{ratio}</span></div></div>'
+                )
+            parts.append("</div>")
+        parts.append("</details>")
+
+    parts.append(
+        "<div id=viewer><div class=bar><span class=title></span>"
+        + "".join(f"<button data-mode={m}>{m}</button>" for m in ("baseline", "current", "diff", "side"))
+        + "<button class=close>✕</button></div><div class=panes></div></div>"
+    )
+    parts.append(f"<script>{JS}</script></body></html>")
+    return "\n".join(parts)
+
+
+def build_report(capture_dir, profile_names, out_dir=None, baseline_dir=None, diff_dir=None, title=None,
+                 workers=None, thumb_width=THUMB_WIDTH, db_path=RESULTS_DB, copy=False):
+    """Write the report; returns (index.html path, captures, results run id or None)."""
+    out_dir = out_dir or os.path.join(capture_dir, "_report")
+    diff_dir = diff_dir or os.path.join(capture_dir, "_diff")
+    os.makedirs(out_dir, exist_ok=True)
+    captures = collect(capture_dir, profile_names, baseline_dir, diff_dir,
+                       os.path.join(out_dir, "thumbs"), workers, thumb_width)
+
+    found, run_id = _lookup_results(str(db_path), {c["hash"] for c in captures})
+    for c in captures:
+        if c["hash"] in found:
+            c["route"] = found[c["hash"]][0]
+    tables = _run_tables(str(db_path), run_id) if run_id else (None, (), (), ())
+
+    if copy:
+        for c in captures:
+            for kind in ("baseline", "current", "diff"):
+                if kind in c:
+                    target = os.path.join(out_dir, "full", kind, c["name"])
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(c[kind], target)
+                    c[kind] = target
+
+    page = render(captures, out_dir, title or f"Run report: {os.path.basename(os.path.normpath(capture_dir))}",
+                  *tables, thumb_width=thumb_width)
+    path = os.path.join(out_dir, "index.html")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(page)
+    os.replace(tmp, path)
+    return path, captures, run_id
@@ -0,0 +1,31 @@
+"""
+Result records shared by the runners and collectors.
+"""
+
+from dataclasses import asdict, dataclass, field
+
+
+@dataclass
+class FlowResult:
+    flow: str
+    profile: str
+    locale: str = "en"
+    issues: list = field(default_factory=list)
+    # [{"step": "step1", "path": "/tmp/.../iphone_se_step1.png"}, ...]
+    screenshots: list = field(default_factory=list)
+    # {"step2 layout": <layout_audit payload>, ...}
+    audits: dict = field(default_factory=dict)
+    duration: float = 0.0
+    # {"03 click continue": seconds, ...} for each step that ran
+    timings: dict = field(default_factory=dict)
+    # carried over from an earlier run by an incremental (`--since`) run
+    reused: bool = False
+    # {"checkpoint": name, "age": seconds} when the run resumed from a checkpoint
+    resumed: dict | None = None
+
+    @property
+    def key(self):
+        return f"{self.flow}/{self.profile}/{self.locale}"
+
+    def to_dict(self):
+        return asdict(self)
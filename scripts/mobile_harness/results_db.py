@@ -0,0 +1,253 @@
+"""
+SQLite results store: every run's numbers kept for trend queries.
+
+The scripts printed timings, vitals and issues and forgot them. A
+regression that adds 80 ms of LCP per week never fails a single run, but
+it is obvious over thirty runs. `ResultsDB` (HARNESS_HOME/results.sqlite)
+keeps one row per run and everything measured in it:
+
+  runs          script, start/end, git commit (+ dirty flag), base URL,
+                throttle mode
+  measurements  (profile, route, step, metric, value), one table for all
+                metrics: Web Vitals (lcp, cls, inp, fcp, ttfb, ...),
+                budget measurements (js_bytes, dom_nodes, ...),
+                per-step wall time (step_ms) and per-flow duration
+                (duration_ms)
+  issues        (profile, route, flow, message)
+  screenshots   (profile, route, step, sha256), the same hashes as the
+                artifact store
+
+Routes are locale-free path shapes (page_errors.route_of), so /it/trips/new
+and /trips/new are the same series. Measurements, issues and screenshots
+are indexed on route and run; runs on start time.
+
+`mobile-harness.py results trend lcp --route /trips/new --profile
+iphone_se --last 30` prints the per-run p75 and the p75 over the last 30
+runs that measured it. `results runs` lists recent runs, and `results
+issues` ranks issues across them.
+"""
+
+import os
+import sqlite3
+import subprocess
+import time
+
+from .config import HARNESS_HOME, REPO_ROOT
+from .page_errors import route_of
+from .vitals import METRICS, percentile
+
+RESULTS_DB = HARNESS_HOME / "results.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    commit_sha TEXT,
+    dirty INTEGER,
+    base_url TEXT,
+    throttle TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    profile TEXT NOT NULL,
+    route TEXT,
+    step TEXT,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    profile TEXT NOT NULL,
+    route TEXT,
+    flow TEXT,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS screenshots (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    profile TEXT NOT NULL,
+    route TEXT,
+    step TEXT NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE INDEX IF NOT EXISTS runs_script ON runs (script, started);
+CREATE INDEX IF NOT EXISTS measurements_route ON measurements (route, metric, profile, run_id);
+CREATE INDEX IF NOT EXISTS measurements_run ON measurements (run_id);
+CREATE INDEX IF NOT EXISTS issues_route ON issues (route, run_id);
+CREATE INDEX IF NOT EXISTS screenshots_route ON screenshots (route, profile, step, run_id);
+"""
+
+# VitalsReport sample fields and BudgetChecker measurements stored as metrics
+VITAL_FIELDS = (*METRICS, "long_task_ms", "blocking_ms")
+BUDGET_FIELDS = {"lcp_ms": "lcp", "js_bytes": "js_bytes", "transfer_bytes": "transfer_bytes",
+                 "long_task_ms": "long_task_ms", "dom_nodes": "dom_nodes"}
+
+
+def git_commit(repo=REPO_ROOT):
+    """(HEAD sha, working tree dirty) or (None, None) outside a git checkout."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, check=True,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=repo,
+                               check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return sha, bool(dirty)
+
+
+def format_value(metric, value):
+    if value is None:
+        return "-"
+    if metric == "cls":
+        return f"{value:.3f}"
+    if metric.endswith("_bytes"):
+        return f"{value / 1024:.0f}KB"
+    if metric == "dom_nodes":
+        return f"{value:.0f}"
+    return f"{value:.0f}ms"
+
+
+class ResultsDB:
+    def __init__(self, path=RESULTS_DB):
+        self.path = str(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- recording ---------------------------------------------------------
+
+    def begin_run(self, script, base_url, throttle=None, started=None):
+        sha, dirty = git_commit()
+        cursor = self.db.execute(
+            "INSERT INTO runs (script, started, commit_sha, dirty, base_url, throttle) VALUES (?, ?, ?, ?, ?, ?)",
+            (script, started or time.time(), sha, dirty, base_url, throttle),
+        )
+        self.db.commit()
+        return cursor.lastrowid
+
+    def finish_run(self, run_id):
+        self.db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), run_id))
+        self.db.commit()
+
+    def add_measurement(self, run_id, profile, route, step, metric, value):
+        if value is not None:
+            self.db.execute(
+                "INSERT INTO measurements (run_id, profile, route, step, metric, value) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, profile, route, step, metric, value),
+            )
+
+    def add_issues(self, run_id, profile, route, flow, issues):
+        self.db.executemany(
+            "INSERT INTO issues (run_id, profile, route, flow, message) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, profile, route, flow, str(issue)) for issue in issues],
+        )
+
+    def add_screenshot(self, run_id, profile, route, step, digest):
+        self.db.execute(
+            "INSERT INTO screenshots (run_id, profile, route, step, hash) VALUES (?, ?, ?, ?, ?)",
+            (run_id, profile, route, step, digest),
+        )
+
+    def add_flow(self, run_id, profile, route, flow, duration, issues=(), timings=None):
+        """One flow run: its duration, per-step timings and issues."""
+        self.add_measurement(run_id, profile, route, flow, "duration_ms", round(duration * 1000, 1))
+        for step, seconds in (timings or {}).items():
+            self.add_measurement(run_id, profile, route, f"{flow} {step}", "step_ms", round(seconds * 1000, 1))
+        self.add_issues(run_id, profile, route, flow, issues)
+
+    def add_flow_result(self, run_id, result, route, hashes=None):
+        """A FlowResult; `hashes` maps its screenshot paths to their sha256."""
+        self.add_flow(run_id, result.profile, route, result.flow, result.duration, result.issues, result.timings)
+        for shot in result.screenshots:
+            digest = (hashes or {}).get(shot["path"])
+            if digest:
+                self.add_screenshot(run_id, result.profile, route, f"{result.locale}/{shot['step']}", digest)
+
+    def add_artifact_run(self, run_id, manifest, route_for=lambda step: None):
+        """Screenshot hashes of an artifact_store RunManifest ("<viewport>/<step>" entries)."""
+        for key, entry in manifest.entries.items():
+            profile, step = key.split("/", 1)
+            self.add_screenshot(run_id, profile, route_for(step), step, entry["hash"])
+
+    def add_vitals(self, run_id, samples):
+        """VitalsReport.samples: one measurement per metric per sample."""
+        for s in samples:
+            route = route_of(s["url"])
+            for metric in VITAL_FIELDS:
+                self.add_measurement(run_id, s["profile"], route, s["step"], metric, s.get(metric))
+
+    def add_budget_measurements(self, run_id, measurements):
+        """BudgetChecker.measurements, keyed by page URL."""
+        for m in measurements:
+            route = route_of(m["url"])
+            for field, metric in BUDGET_FIELDS.items():
+                self.add_measurement(run_id, m["profile"], route, None, metric, m.get(field))
+
+    def commit(self):
+        self.db.commit()
+
+    # -- queries -----------------------------------------------------------
+
+    def runs(self, script=None, last=20):
+        query = "SELECT * FROM runs" + (" WHERE script = ?" if script else "") + " ORDER BY started DESC LIMIT ?"
+        return [dict(r) for r in self.db.execute(query, (*([script] if script else []), last))]
+
+    def series(self, metric, route=None, profile=None, step=None, script=None, last=30):
+        """Values per run, oldest first, over the last `last` runs that measured them."""
+        where, params = ["m.metric = ?"], [metric]
+        for column, value in (("m.route", route), ("m.profile", profile), ("m.step", step), ("r.script", script)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        rows = self.db.execute(
+            f"""SELECT r.id, r.started, r.commit_sha, r.script, m.value
+                FROM measurements m JOIN runs r ON r.id = m.run_id
+                WHERE {' AND '.join(where)} AND m.run_id IN (
+                    SELECT DISTINCT m.run_id FROM measurements m JOIN runs r ON r.id = m.run_id
+                    WHERE {' AND '.join(where)} ORDER BY m.run_id DESC LIMIT ?)
+                ORDER BY r.started""",
+            (*params, *params, last),
+        )
+        runs = {}
+        for row in rows:
+            run = runs.setdefault(row["id"], {"run": row["id"], "started": row["started"], "script": row["script"],
+                                              "commit": row["commit_sha"], "values": []})
+            run["values"].append(row["value"])
+        return list(runs.values())
+
+    def trend(self, metric, pct=75, **filters):
+        """(per-run rows with their percentile, percentile over every value in those runs)."""
+        series = self.series(metric, **filters)
+        for run in series:
+            run["n"] = len(run["values"])
+            run[f"p{pct}"] = percentile(run["values"], pct)
+        overall = percentile([v for run in series for v in run["values"]], pct)
+        return series, overall
+
+    def top_issues(self, route=None, profile=None, last=30):
+        where, params = [], []
+        for column, value in (("route", route), ("profile", profile)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        where.append("run_id IN (SELECT id FROM runs ORDER BY started DESC LIMIT ?)")
+        return [dict(r) for r in self.db.execute(
+            f"""SELECT message, route, COUNT(*) AS count, COUNT(DISTINCT run_id) AS runs,
+                       GROUP_CONCAT(DISTINCT profile) AS profiles, MAX(run_id) AS last_run
+                FROM issues WHERE {' AND '.join(where)}
+                GROUP BY message, route ORDER BY runs DESC, count DESC""",
+            (*params, last),
+        )]
@@ -0,0 +1,131 @@
+"""
+Off-thread screenshot encoding and writing.
+
+`page.screenshot(path=...)` returns only after Chromium has encoded the
+PNG and Playwright has written it to disk. For a full-page DPR-3 capture
+(1179 px wide and many thousand tall) the flow is blocked on that the
+whole time. `ScreenshotWriter.capture(page, path)` takes the capture as
+bytes and hands re-encoding and disk I/O to a thread pool, so the next
+flow step starts right away:
+
+  format="png"    bytes written as captured (default; what the diff and
+                  artifact-store tooling read)
+  format="webp"   re-encoded losslessly — typically a fraction of the PNG
+  format="jpeg"   re-encoded at `quality`, for captures nobody diffs
+  review_width=N  plus a downscaled `<name>.review.jpg` N px wide for
+                  reviewing on a laptop or in a PR
+
+Chromium still encodes the PNG it hands over; CDP has no raw-pixel
+capture. Re-encoding needs Pillow (`pip install pillow`), imported only
+when used. Leaving the `with` block (or calling `close()`) waits for every
+pending write and re-raises the first error. `await async_write(...)`
+resolves once its own file is on disk, for callers that record it as done
+(the crawler's status log).
+"""
+
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+FORMATS = {"png": ".png", "webp": ".webp", "jpeg": ".jpg"}
+
+
+def _image_lib():
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise SystemExit(f"WebP/JPEG output and review copies need Pillow: pip install pillow ({e})")
+    return Image
+
+
+class ScreenshotWriter:
+    def __init__(self, fmt="png", quality=90, review_width=None, workers=4):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown screenshot format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        if fmt != "png" or review_width:
+            _image_lib()  # fail before the run, not in a worker thread
+        self.fmt = fmt
+        self.quality = quality
+        self.review_width = review_width
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshot")
+        self._pending = []
+        self.written = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def target_path(self, path):
+        return os.path.splitext(path)[0] + FORMATS[self.fmt]
+
+    def capture(self, page, path, **options):
+        """Capture now, encode + write in the background; returns the final path."""
+        return self.submit(page.screenshot(**options), path)
+
+    async def async_capture(self, page, path, **options):
+        return self.submit(await page.screenshot(**options), path)
+
+    def submit(self, png_bytes, path):
+        target = self.target_path(path)
+        self._pending.append(self._executor.submit(self._write, png_bytes, target))
+        return target
+
+    async def async_write(self, png_bytes, path):
+        """submit() that resolves once the file is written; write errors raise here."""
+        target = self.target_path(path)
+        future = self._executor.submit(self._write, png_bytes, target)
+        self.written.extend(await asyncio.wrap_future(future))
+        return target
+
+    def _write(self, png_bytes, target):
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        written = [target]
+        if self.fmt == "png" and not self.review_width:
+            with open(target, "wb") as f:
+                f.write(png_bytes)
+            return written
+        Image = _image_lib()
+        with Image.open(io.BytesIO(png_bytes)) as img:
+            if self.fmt == "png":
+                with open(target, "wb") as f:
+                    f.write(png_bytes)
+            elif self.fmt == "webp":
+                img.save(target, "WEBP", lossless=True, method=4)
+            else:
+                img.convert("RGB").save(target, "JPEG", quality=self.quality, optimize=True)
+            if self.review_width and img.width > self.review_width:
+                review = os.path.splitext(target)[0] + ".review.jpg"
+                height = round(img.height * self.review_width / img.width)
+                img.convert("RGB").resize((self.review_width, height), Image.LANCZOS).save(
+                    review, "JPEG", quality=80, optimize=True,
+                )
+                written.append(review)
+        return written
+
+    def flush(self):
+        """Wait for pending writes; re-raises the first failure."""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            self.written.extend(future.result())
+        return self.written
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+
+def add_screenshot_arguments(parser):
+    parser.add_argument("--format", choices=list(FORMATS), default="png", dest="shot_format",
+                        help="screenshot file format (webp is lossless; default png)")
+    parser.add_argument("--quality", type=int, default=90, help="JPEG quality (default 90)")
+    parser.add_argument("--review-width", type=int,
+                        help="also write a downscaled <name>.review.jpg this many px wide")
+
+
+def writer_from_args(args):
+    return ScreenshotWriter(args.shot_format, args.quality, args.review_width)
@@ -0,0 +1,174 @@
+"""
+Process-pool sharded execution of (flow x viewport x locale) work items.
+
+Chromium rendering is CPU-bound, and one Python process driving one
+browser leaves most cores of a CI box idle. `run_sharded` fans work items
+out to a ProcessPoolExecutor (default: one worker per core). Each worker
+owns its own Playwright driver and warm BrowserPool, started once by the
+pool initializer; results stream back to a single Collector that merges
+issues and screenshot manifests.
+
+Workers use the "spawn" start method — forking a process that already has
+Playwright's driver threads is not safe.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing.util import Finalize
+
+from .browser_pool import BrowserPool
+from .config import BASE_URL
+from .devices import find_profile
+from .results import FlowResult
+from .tracing import StepProfiler
+from .wizard import run_wizard
+
+# Flow registry: name -> fn(page, profile, locale, out_dir, base_url, profiler) -> FlowResult.
+# Workers look flows up by name, so only the name crosses the process boundary.
+FLOWS = {
+    "wizard": run_wizard,
+}
+# Pages each flow visits, for incremental runs (impact.py).
+FLOW_ROUTES = {
+    "wizard": ("/trips/new",),
+}
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    flow: str
+    profile: str
+    locale: str = "en"
+
+    @property
+    def key(self):
+        return f"{self.flow}/{self.profile}/{self.locale}"
+
+
+def build_items(flows, profiles, locales):
+    return [
+        WorkItem(flow, profile.name, locale)
+        for flow in flows
+        for profile in profiles
+        for locale in locales
+    ]
+
+
+class Collector:
+    """Merges FlowResults from every worker into one issue list + manifest."""
+
+    def __init__(self, throttle=None):
+        self.results = []
+        self.throttle = throttle or "off"
+
+    def add(self, result):
+        self.results.append(result)
+
+    @property
+    def issues(self):
+        return {r.key: r.issues for r in self.results if r.issues}
+
+    @property
+    def screenshots(self):
+        return [
+            {"item": r.key, **shot}
+            for r in sorted(self.results, key=lambda r: r.key)
+            for shot in r.screenshots
+        ]
+
+    def record(self, store, script):
+        """Store this run's screenshots in the artifact store; returns the run manifest.
+
+        Entries are "<profile>/<flow>/<locale>/<step>"; reused results keep
+        their flow's entries from the script's previous run.
+        """
+        run_ids = store.run_ids(script)
+        previous = store.load_run(script, run_ids[-1]) if run_ids else None
+        run = store.begin_run(script)
+        for r in self.results:
+            if r.reused:
+                if previous:
+                    prefix = f"{r.profile}/{r.flow}/{r.locale}/"
+                    run.entries.update({k: e for k, e in previous.entries.items() if k.startswith(prefix)})
+                continue
+            for shot in r.screenshots:
+                run.add(r.profile, f"{r.flow}/{r.locale}/{shot['step']}", shot["path"])
+        run.save()
+        return run
+
+    def write_manifest(self, path):
+        manifest = {
+            "throttle": self.throttle,
+            "results": [r.to_dict() for r in sorted(self.results, key=lambda r: r.key)],
+            "issues": self.issues,
+            "screenshots": self.screenshots,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return path
+
+
+_worker_pool = None
+
+
+def _init_worker(headless, throttle):
+    global _worker_pool
+    _worker_pool = BrowserPool(headless=headless, throttle=throttle).start()
+    Finalize(_worker_pool, _worker_pool.close, exitpriority=10)
+
+
+def _run_item(item, out_dir, base_url, trace=False):
+    profile = find_profile(item.profile)
+    item_dir = os.path.join(out_dir, item.flow, item.locale)
+    profiler = StepProfiler(os.path.join(item_dir, "traces")) if trace else None
+    started = time.perf_counter()
+    try:
+        with _worker_pool.page(profile, fresh=True) as page:
+            return FLOWS[item.flow](page, profile, item.locale, item_dir, base_url, profiler)
+    except Exception as e:
+        result = FlowResult(item.flow, item.profile, item.locale, issues=[f"Error: {e}"])
+        result.duration = time.perf_counter() - started
+        return result
+
+
+def load_results(manifest_path):
+    """{key: FlowResult} from an earlier run's manifest.json (empty if there is none)."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        results = [FlowResult(**r) for r in json.load(f)["results"]]
+    return {r.key: r for r in results}
+
+
+def run_sharded(items, out_dir, workers=None, base_url=BASE_URL, headless=True, on_result=None, reused=(),
+                trace=False, throttle=None):
+    """Run work items across `workers` processes; returns the Collector.
+
+    `reused` results (from an earlier manifest) are merged in as they are.
+    `trace=True` records a Chromium trace around each `trace=True` step;
+    `throttle` is a throttling mode applied to every page.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(items)) or 1
+    collector = Collector(throttle)
+    for result in reused:
+        result.reused = True
+        collector.add(result)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(headless, throttle),
+    ) as executor:
+        futures = [executor.submit(_run_item, item, out_dir, base_url, trace) for item in items]
+        for future in as_completed(futures):
+            result = future.result()
+            collector.add(result)
+            if on_result:
+                on_result(result)
+    collector.write_manifest(os.path.join(out_dir, "manifest.json"))
+    return collector
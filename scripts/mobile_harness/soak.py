@@ -0,0 +1,190 @@
+"""
+Soak runs: repeat a flow in one page and watch the heap for leaks.
+
+Users restart the wizard and step back and forth without ever reloading.
+A listener or a detached DOM subtree leaked per pass adds up, but a single
+flow run never shows it. `run_soak(page, profile, iteration, n)` calls
+`iteration(page, i)` n times in the same document. After each pass it
+forces GC (HeapProfiler.collectGarbage, twice) and samples over a CDP
+session:
+
+  heap_used        Runtime.getHeapUsage usedSize (exact, unlike
+                   performance.memory, which Chromium quantizes; that is
+                   recorded too as perf_memory_used)
+  nodes, listeners, documents
+                   Memory.getDOMCounters
+  detached_nodes   DOM.getDetachedDomNodes (Chromium 124+; None before)
+
+It reports the least-squares slope per iteration for each counter, over
+iterations 2..n so first-visit caches don't read as growth. Heap snapshots
+of the first and last iteration are saved, so DevTools (Memory >
+Load > Comparison) shows what the extra iterations retained.
+
+A full reload throws the heap away, so iterations must restart the flow
+in-app: `soft_navigate` goes through the Next.js router (a client-side
+transition) and only reloads when there is no router to use.
+"""
+
+import json
+import os
+import time
+from urllib.parse import urljoin
+
+from .config import HARNESS_HOME
+
+SOAK_ROOT = HARNESS_HOME / "soak"
+# Growth per iteration beyond which a counter is flagged.
+LEAK_THRESHOLDS = {
+    "heap_used": 256 * 1024,
+    "nodes": 50,
+    "listeners": 5,
+    "detached_nodes": 10,
+    "documents": 0.5,
+}
+
+SOFT_NAVIGATE_SCRIPT = """
+(path) => {
+  const router = (window.next && window.next.router) || (window.nd && window.nd.router);
+  if (router && router.push) { router.push(path); return 'router'; }
+  const link = [...document.querySelectorAll('a[href]')].find((a) => new URL(a.href).pathname === path);
+  if (link) { link.click(); return 'link'; }
+  return null;
+}
+"""
+
+PERF_MEMORY_SCRIPT = "() => performance.memory ? performance.memory.usedJSHeapSize : null"
+
+
+async def soft_navigate(page, path):
+    """Client-side navigation to `path`; falls back to page.goto. Returns how it navigated."""
+    how = await page.evaluate(SOFT_NAVIGATE_SCRIPT, path)
+    if how:
+        await page.wait_for_url(f"**{path}")
+        return how
+    await page.goto(urljoin(page.url, path))
+    return "reload"
+
+
+def slope(values):
+    """Least-squares growth per step of a series (None with under two points)."""
+    points = [(i, v) for i, v in enumerate(values) if v is not None]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var
+
+
+class HeapSampler:
+    def __init__(self, page):
+        self.page = page
+        self.session = None
+
+    async def start(self):
+        self.session = await self.page.context.new_cdp_session(self.page)
+        await self.session.send("HeapProfiler.enable")
+        await self.session.send("DOM.enable")
+        return self
+
+    async def sample(self):
+        for _ in range(2):
+            await self.session.send("HeapProfiler.collectGarbage")
+        usage = await self.session.send("Runtime.getHeapUsage")
+        counters = await self.session.send("Memory.getDOMCounters")
+        try:
+            detached = len((await self.session.send("DOM.getDetachedDomNodes"))["detachedNodes"])
+        except Exception:
+            detached = None
+        return {
+            "heap_used": usage["usedSize"],
+            "heap_total": usage["totalSize"],
+            "perf_memory_used": await self.page.evaluate(PERF_MEMORY_SCRIPT),
+            "nodes": counters["nodes"],
+            "listeners": counters["jsEventListeners"],
+            "documents": counters["documents"],
+            "detached_nodes": detached,
+        }
+
+    async def snapshot(self, path):
+        chunks = []
+        handler = lambda event: chunks.append(event["chunk"])
+        self.session.on("HeapProfiler.addHeapSnapshotChunk", handler)
+        try:
+            await self.session.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+        finally:
+            self.session.remove_listener("HeapProfiler.addHeapSnapshotChunk", handler)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("".join(chunks))
+        return path
+
+
+class SoakReport:
+    def __init__(self, profile, out_dir):
+        self.profile = profile
+        self.out_dir = str(out_dir)
+        self.samples = []
+        self.snapshots = []
+
+    def slopes(self):
+        # iteration 1 warms caches and code; growth is measured from 2 on
+        rows = self.samples[1:] if len(self.samples) > 2 else self.samples
+        return {metric: slope([r[metric] for r in rows]) for metric in LEAK_THRESHOLDS}
+
+    def suspects(self):
+        return {m: s for m, s in self.slopes().items() if s is not None and s > LEAK_THRESHOLDS[m]}
+
+    def to_dict(self):
+        return {
+            "profile": self.profile.name,
+            "iterations": len(self.samples),
+            "slopes": self.slopes(),
+            "suspects": self.suspects(),
+            "samples": self.samples,
+            "snapshots": self.snapshots,
+        }
+
+    def write(self, path=None):
+        path = path or os.path.join(self.out_dir, f"{self.profile.name}_soak.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def print_summary(self):
+        if not self.samples:
+            print(f"\n🧪 Soak {self.profile.name}: no iterations completed")
+            return
+        first, last = self.samples[0], self.samples[-1]
+        print(f"\n🧪 Soak {self.profile.name}: {len(self.samples)} iterations")
+        for metric, growth in self.slopes().items():
+            if growth is None:
+                continue
+            start, end = first[metric], last[metric]
+            if metric.startswith("heap"):
+                line = f"{start / 1e6:.1f}MB -> {end / 1e6:.1f}MB, {growth / 1024:+.0f}KB/iteration"
+            else:
+                line = f"{start} -> {end}, {growth:+.1f}/iteration"
+            flag = "  ⚠️ growing" if metric in self.suspects() else ""
+            print(f"  {metric:15} {line}{flag}")
+        for path in self.snapshots:
+            print(f"  snapshot: {path}")
+
+
+async def run_soak(page, profile, iteration, iterations, out_dir=SOAK_ROOT, on_sample=None):
+    """Run `await iteration(page, i)` for i in 1..iterations in one page; returns a SoakReport."""
+    report = SoakReport(profile, out_dir)
+    sampler = await HeapSampler(page).start()
+    for i in range(1, iterations + 1):
+        started = time.perf_counter()
+        await iteration(page, i)
+        sample = {"iteration": i, "duration": round(time.perf_counter() - started, 3), **await sampler.sample()}
+        report.samples.append(sample)
+        if i in (1, iterations):
+            report.snapshots.append(await sampler.snapshot(
+                os.path.join(report.out_dir, f"{profile.name}_iter{i}.heapsnapshot")))
+        if on_sample:
+            on_sample(profile, sample)
+    return report
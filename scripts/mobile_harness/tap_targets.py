@@ -0,0 +1,159 @@
+"""
+Batch occlusion and tap-target analysis.
+
+test-wizard-mobile.py guards one regression by hand: it reads the
+Continue button's bounding box and asks `elementFromPoint` what sits on
+its centre, since MobileBottomNav once covered it. `analyze_taps(page)`
+runs that check in one evaluate for every visible control in the
+viewport (buttons, links, inputs, selects, role=button/link). It samples
+five points per control (centre plus four inset corners) and reports:
+
+  covered  controls where another element wins the hit test: fully (no
+           sample point reaches the control) or partly, whether the
+           centre (where a tap lands) is blocked, and the covering
+           element's CSS path and position/z-index
+  small    controls under MIN_TARGET_PX in either dimension (44px, the
+           Apple HIG / WCAG 2.5.5 size), except links inside running text
+
+Only the part of each control inside the viewport is sampled — what is
+below the fold can't be tapped without scrolling anyway.
+
+`hit_test(locator)` runs the same check on the one control a locator
+finds and returns its entry even when nothing covers it, or None when it
+is missing or outside the viewport.
+"""
+
+MIN_TARGET_PX = 44
+MAX_PER_KIND = 40
+
+# Shared by TAP_SCRIPT and HIT_TEST_SCRIPT: `check(el)` hit-tests one
+# control, or returns null when it isn't visible inside the viewport.
+_CHECK_JS = """
+  const vw = window.innerWidth, vh = window.innerHeight;
+  const describe = (el) => {
+    const parts = [];
+    for (let n = el; n && n.nodeType === 1 && parts.length < 4; n = n.parentElement) {
+      let part = n.tagName.toLowerCase();
+      if (n.id) { parts.unshift(part + '#' + n.id); break; }
+      const cls = (n.getAttribute('class') || '').split(/\\s+/).filter(Boolean).slice(0, 2);
+      if (cls.length) part += '.' + cls.join('.');
+      parts.unshift(part);
+    }
+    return parts.join(' > ');
+  };
+  const label = (el) => (el.innerText || el.value || el.getAttribute('aria-label') || el.getAttribute('placeholder') || '').trim().slice(0, 60);
+  const owns = (el, hit) => hit && (hit === el || el.contains(hit) || (el.labels && [...el.labels].some((l) => l.contains(hit))));
+  const check = (el) => {
+    const style = getComputedStyle(el);
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0 || style.visibility === 'hidden' || style.pointerEvents === 'none') return null;
+    const left = Math.max(rect.left, 0), right = Math.min(rect.right, vw);
+    const top = Math.max(rect.top, 0), bottom = Math.min(rect.bottom, vh);
+    if (right - left < 1 || bottom - top < 1) return null;
+
+    const w = right - left, h = bottom - top;
+    const points = [[0.5, 0.5], [0.2, 0.2], [0.8, 0.2], [0.2, 0.8], [0.8, 0.8]]
+      .map(([fx, fy]) => [left + w * fx, top + h * fy]);
+    let blocked = 0, coverer = null, centreBlocked = false;
+    points.forEach(([x, y], i) => {
+      const hit = document.elementFromPoint(x, y);
+      if (!owns(el, hit)) {
+        blocked += 1;
+        coverer = coverer || hit;
+        if (i === 0) centreBlocked = true;
+      }
+    });
+    const cs = coverer ? getComputedStyle(coverer) : null;
+    return {
+      selector: describe(el), text: label(el),
+      rect: [Math.round(rect.left), Math.round(rect.top), Math.round(rect.width), Math.round(rect.height)],
+      fully: blocked === points.length, centre_blocked: centreBlocked, blocked_points: blocked,
+      by: coverer ? describe(coverer) : null,
+      by_position: cs ? cs.position : null, by_z: cs ? cs.zIndex : null,
+    };
+  };
+"""
+
+TAP_SCRIPT = """
+([minPx, cap]) => {""" + _CHECK_JS + """
+  const selector = 'a[href], button, input:not([type=hidden]), select, textarea, [role=button], [role=link]';
+  const inRunningText = (el) => {
+    if (el.tagName !== 'A' || getComputedStyle(el).display !== 'inline') return false;
+    for (const c of el.parentElement ? el.parentElement.childNodes : []) {
+      if (c.nodeType === 3 && c.textContent.trim()) return true;
+    }
+    return false;
+  };
+
+  const covered = [], small = [];
+  let checked = 0;
+  for (const el of document.querySelectorAll(selector)) {
+    // a control nested in another control (icon button inside a link) is checked once, as the outer one
+    if (el.parentElement && el.parentElement.closest(selector)) continue;
+    const entry = check(el);
+    if (!entry) continue;
+    checked += 1;
+    if (entry.blocked_points && covered.length < cap) covered.push(entry);
+    const [, , width, height] = entry.rect;
+    if ((width < minPx || height < minPx) && !inRunningText(el) && small.length < cap) {
+      small.push({ selector: entry.selector, text: entry.text, rect: entry.rect });
+    }
+  }
+  return { viewport: [vw, vh], min_px: minPx, checked, covered, small };
+}
+"""
+
+# The first element a locator matches that is visible in the viewport
+HIT_TEST_SCRIPT = """
+(els) => {""" + _CHECK_JS + """
+  for (const el of els) {
+    const entry = check(el);
+    if (entry) return entry;
+  }
+  return null;
+}
+"""
+
+
+def analyze_taps(page, min_px=MIN_TARGET_PX, cap=MAX_PER_KIND):
+    return page.evaluate(TAP_SCRIPT, [min_px, cap])
+
+
+async def async_analyze_taps(page, min_px=MIN_TARGET_PX, cap=MAX_PER_KIND):
+    return await page.evaluate(TAP_SCRIPT, [min_px, cap])
+
+
+def hit_test(locator):
+    """Hit-test one control found by `locator`, covered or not: a covered-style
+    entry (blocked_points 0 when clear) or None when it isn't visible in the
+    viewport."""
+    return locator.evaluate_all(HIT_TEST_SCRIPT)
+
+
+async def async_hit_test(locator):
+    return await locator.evaluate_all(HIT_TEST_SCRIPT)
+
+
+def covering(report, selector):
+    """The covered-control entry for the control at CSS path `selector`, if any."""
+    return next((c for c in report["covered"] if c["selector"] == selector), None)
+
+
+def tap_issues(report, label, max_listed=3):
+    """Issue strings: controls a tap can't reach (centre blocked) one by one,
+    partial and small ones summarised."""
+    issues = []
+    fully = [c for c in report["covered"] if c["fully"] or c["centre_blocked"]]
+    partly = [c for c in report["covered"] if not (c["fully"] or c["centre_blocked"])]
+    for c in fully[:max_listed]:
+        issues.append(f"{label}: '{c['text'] or c['selector']}' covered by {c['by']}")
+    if len(fully) > max_listed:
+        issues.append(f"{label}: {len(fully) - max_listed} more covered control(s)")
+    if partly:
+        issues.append(f"{label}: {len(partly)} partly covered control(s), e.g. "
+                      f"'{partly[0]['text'] or partly[0]['selector']}' under {partly[0]['by']}")
+    if report["small"]:
+        first = report["small"][0]
+        issues.append(f"{label}: {len(report['small'])} tap target(s) under {report['min_px']}px, "
+                      f"e.g. '{first['text'] or first['selector']}' {first['rect'][2]}x{first['rect'][3]}")
+    return issues
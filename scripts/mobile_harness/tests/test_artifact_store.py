@@ -0,0 +1,100 @@
+import os
+
+from mobile_harness.artifact_store import ArtifactStore, RunManifest, file_hash, split_capture_name
+
+
+def capture(tmp_path, name, content):
+    path = tmp_path / "captures" / name
+    path.parent.mkdir(exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def record(store, tmp_path, run_id, captures, script="test"):
+    run = RunManifest(store, script, run_id=run_id)
+    for key, content in captures.items():
+        viewport, step = key.split("/", 1)
+        run.add(viewport, step, capture(tmp_path, f"{viewport}_{step}.png", content))
+    run.save()
+    return run
+
+
+def test_identical_files_share_one_blob(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    a = capture(tmp_path, "a.png", b"same")
+    b = capture(tmp_path, "b.png", b"same")
+    assert store.put_file(a) == store.put_file(b) == (file_hash(a), 4)
+    assert len(list(store.blobs.glob("*/*"))) == 1
+
+
+def test_changes_against_previous_run(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    record(store, tmp_path, "20260101-000000000-1",
+           {"iphone_se/login": b"login", "iphone_se/step2": b"old", "pixel_7/gone": b"x"})
+    run = record(store, tmp_path, "20260102-000000000-1",
+                 {"iphone_se/login": b"login", "iphone_se/step2": b"new", "pixel_7/added": b"y"})
+    changes = store.changes(run)
+    assert changes == {
+        "since": "20260101-000000000-1",
+        "added": ["pixel_7/added"],
+        "removed": ["pixel_7/gone"],
+        "changed": ["iphone_se/step2"],
+        "unchanged": ["iphone_se/login"],
+    }
+
+
+def test_changes_for_a_first_run_are_all_added(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    run = record(store, tmp_path, "20260101-000000000-1", {"iphone_se/login": b"login"})
+    changes = store.changes(run)
+    assert changes["since"] is None
+    assert changes["added"] == ["iphone_se/login"]
+
+
+def test_changes_only_compare_runs_of_the_same_script(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    record(store, tmp_path, "20260101-000000000-1", {"iphone_se/login": b"a"}, script="other")
+    run = record(store, tmp_path, "20260102-000000000-1", {"iphone_se/login": b"b"})
+    assert store.changes(run)["since"] is None
+
+
+def test_gc_drops_old_runs_and_their_unshared_blobs(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    old = record(store, tmp_path, "20260101-000000000-1", {"iphone_se/login": b"kept", "iphone_se/step2": b"old"})
+    new = record(store, tmp_path, "20260102-000000000-1", {"iphone_se/login": b"kept", "iphone_se/step2": b"new"})
+    assert store.gc(keep_runs=1, grace=0) == 1
+    assert store.run_ids("test") == [new.run_id]
+    blobs = {p.name.split(".")[0] for p in store.blobs.glob("*/*")}
+    assert blobs == {e["hash"] for e in new.entries.values()}
+    assert old.entries["iphone_se/step2"]["hash"] not in blobs
+
+
+def test_gc_keeps_blobs_referenced_by_any_script(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    record(store, tmp_path, "20260101-000000000-1", {"iphone_se/login": b"a"}, script="one")
+    record(store, tmp_path, "20260101-000000000-2", {"iphone_se/login": b"b"}, script="two")
+    assert store.gc(keep_runs=1, grace=0) == 0
+    assert len(list(store.blobs.glob("*/*"))) == 2
+
+
+def test_gc_spares_puts_in_progress(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    old = record(store, tmp_path, "20260101-000000000-1", {"iphone_se/login": b"old"})
+    old_blob = store.blob_path(old.entries["iphone_se/login"]["hash"])
+    os.utime(old_blob, (0, 0))
+    # a run still being ingested: its blob is stored, its manifest not saved yet
+    digest, _ = store.put_file(capture(tmp_path, "pending.png", b"pending"))
+    partial = store.blob_path(digest).with_name("ff.123.tmp")
+    partial.write_bytes(b"half")
+    assert store.gc(keep_runs=0) == 1
+    assert not old_blob.exists()
+    assert store.blob_path(digest).exists() and partial.exists()
+    assert store.gc(keep_runs=0, grace=0) == 1
+    assert not store.blob_path(digest).exists() and partial.exists()
+
+
+def test_split_capture_name_prefers_the_longest_profile():
+    profiles = ["iphone", "iphone_se"]
+    assert split_capture_name("iphone_se_step2.png", profiles) == ("iphone_se", "step2")
+    assert split_capture_name("iphone_login.png", profiles) == ("iphone", "login")
+    assert split_capture_name("other.png", profiles) == (None, "other")
@@ -0,0 +1,104 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mobile_harness.cache_probe import ProbeResult, path_locale, probe_all, rebase, route_pattern, summarize
+
+
+def result(path, cache="HIT", ttfb=100.0, status=200, connect=None, error=None):
+    return ProbeResult(f"https://example.test{path}", path, status=None if error else status, cache=cache,
+                       ttfb_ms=None if error else ttfb, connect_ms=connect, error=error)
+
+
+@pytest.mark.parametrize("path, route", [
+    ("/", "/"),
+    ("/it", "/"),
+    ("/blog", "/blog"),
+    ("/it/blog/best-time-to-visit-japan", "/blog/*"),
+    ("/destinations/paris/things-to-do", "/destinations/*"),
+])
+def test_route_pattern(path, route):
+    assert route_pattern(path) == route
+
+
+def test_path_locale():
+    assert path_locale("/es/blog/x") == "es"
+    assert path_locale("/blog/x") == "en"
+    assert path_locale("/") == "en"
+
+
+def test_rebase_moves_sitemap_urls_onto_the_probed_host():
+    assert rebase("https://monkeytravel.app/it/blog?page=2", "http://localhost:3000/") == (
+        "http://localhost:3000/it/blog?page=2", "/it/blog")
+
+
+def test_summarize_groups_by_route_and_locale():
+    results = [
+        result("/blog/a", "HIT", 100, connect=40.0),
+        result("/it/blog/b", "MISS", 300),
+        result("/blog/c", None, 200),
+        result("/explore", "STALE", 50, status=404),
+        result("/it/explore", error="timed out"),
+    ]
+    summary = summarize(results)
+    blog = summary["by_route"]["/blog/*"]
+    assert (blog["n"], blog["hit"], blog["miss"]) == (3, 1, 1)
+    # results without x-vercel-cache don't count towards the ratio
+    assert blog["hit_ratio"] == 0.5
+    assert blog["ttfb_p50"] == 200
+    assert (blog["connects"], blog["connect_p50"]) == (1, 40.0)
+    overall = summary["overall"]
+    assert (overall["n"], overall["errors"], overall["non_200"], overall["stale"]) == (5, 1, 1, 1)
+    assert overall["ttfb_p95"] == pytest.approx(285)
+    assert set(summary["by_locale"]) == {"en", "it"}
+    assert summary["by_locale"]["it"]["errors"] == 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("x-vercel-cache", "HIT" if "hit" in self.path else "MISS")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_probe_all_reads_pairs_lazily_and_keeps_input_order(server):
+    pulled, done = [], []
+
+    def pairs():
+        for i in range(60):
+            pulled.append(i)
+            yield f"{server}/{'hit' if i % 2 else 'miss'}/{i}", f"/{i}"
+
+    def on_result(r):
+        done.append(r)
+        # never more than workers * 2 probes submitted but unfinished
+        assert len(pulled) - len(done) <= 6
+
+    results = probe_all(pairs(), workers=3, on_result=on_result)
+    assert [r.path for r in results] == [f"/{i}" for i in range(60)]
+    assert [r.cache for r in results[:2]] == ["MISS", "HIT"]
+    # one connection per worker thread; every other probe reuses it
+    assert 1 <= sum(r.connect_ms is not None for r in results) <= 3
+    assert all(r.ttfb_ms is not None and r.error is None for r in results)
+
+
+def test_probe_all_records_connection_errors():
+    results = probe_all([("http://127.0.0.1:9/", "/")], workers=1, timeout=2)
+    assert results[0].error and results[0].status is None
@@ -0,0 +1,87 @@
+import pytest
+
+from mobile_harness import flow_engine
+from mobile_harness.checkpoints import CheckpointStore
+from mobile_harness.devices import IPHONE_14
+from mobile_harness.flow_engine import Flow, Step, run_flow
+
+FLOW = Flow(name="steps", steps=(
+    Step("goto", value="/one"),
+    Step("checkpoint", value="a"),
+    Step("goto", value="/two"),
+    Step("checkpoint", value="b"),
+    Step("goto", value="/three"),
+))
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies = []
+
+    def storage_state(self):
+        return {"cookies": [{"name": "sid", "value": "1"}],
+                "origins": [{"origin": "http://app", "localStorage": [{"name": "step", "value": "2"}]}]}
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+        self.context = FakeContext()
+        self.visited = []
+        self.init_scripts = []
+
+    def goto(self, url, wait_until=None):
+        self.url = url
+        self.visited.append(url)
+
+    def evaluate(self, script, arg=None):
+        return [["tab", "x"]]
+
+    def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+
+@pytest.fixture(autouse=True)
+def no_readiness_wait(monkeypatch):
+    monkeypatch.setattr(flow_engine, "wait_for_ready", lambda page: None)
+
+
+def run(store, resume=None):
+    page = FakePage()
+    result = run_flow(FLOW, page, IPHONE_14, "en", None, None, base_url="http://app",
+                      checkpoints=store, resume=resume)
+    return page, result
+
+
+def test_checkpoint_steps_save_the_page_state(tmp_path):
+    store = CheckpointStore("test", root=tmp_path)
+    page, result = run(store)
+    assert page.visited == ["http://app/one", "http://app/two", "http://app/three"]
+    assert result.issues == [] and result.resumed is None
+    b = store.load(IPHONE_14.name, "b")
+    assert b.url == "http://app/two"
+    assert b.session_storage == [["tab", "x"]]
+    assert b.storage_state["origins"][0]["localStorage"] == [{"name": "step", "value": "2"}]
+
+
+def test_resume_restores_the_checkpoint_and_skips_the_steps_before_it(tmp_path):
+    store = CheckpointStore("test", root=tmp_path)
+    run(store)
+    page, result = run(store, resume="b")
+    assert page.visited == ["http://app/two", "http://app/three"]
+    assert page.context.cookies == [{"name": "sid", "value": "1"}]
+    assert len(page.init_scripts) == 1 and '"step"' in page.init_scripts[0]
+    assert result.resumed["checkpoint"] == "b"
+    assert list(result.timings) == ["04 goto /three"]
+
+
+def test_missing_or_stale_checkpoint_is_an_issue_and_replays(tmp_path):
+    run(CheckpointStore("test", root=tmp_path))
+    stale = CheckpointStore("test", root=tmp_path, max_age=-1)
+    page, result = run(stale, resume="b")
+    assert page.visited == ["http://app/one", "http://app/two", "http://app/three"]
+    assert result.issues == ["No checkpoint 'b'; replayed from the start"]
+    assert result.resumed is None
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from mobile_harness.durations import (
+    KEEP_SAMPLES, DurationHistory, hash_shard, history_key, parse_shard, plan_shards, select_shard,
+)
+
+
+def history(tmp_path, samples=None):
+    h = DurationHistory(str(tmp_path / "durations.json"))
+    for key, seconds in (samples or {}).items():
+        h.record(key, seconds)
+    return h
+
+
+def plan(items, total, h):
+    return plan_shards(items, total, h, key=lambda item: item)
+
+
+@pytest.mark.parametrize("value, expected", [("1/1", (1, 1)), ("2/4", (2, 4)), ("4/4", (4, 4))])
+def test_parse_shard(value, expected):
+    assert parse_shard(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0/4", "5/4", "2", "a/b", "1/2/3", ""])
+def test_parse_shard_rejects(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_history_keeps_recent_samples_and_estimates_their_median(tmp_path):
+    h = history(tmp_path)
+    for seconds in (1, 2, 3, 100, 4, 5, 6):
+        h.record("wizard/iphone_se/en", seconds)
+    h.record("wizard/iphone_se/en", 0)
+    h.record("wizard/iphone_se/en", None)
+    assert len(h.samples["wizard/iphone_se/en"]) == KEEP_SAMPLES
+    assert h.samples["wizard/iphone_se/en"] == [3, 100, 4, 5, 6]
+    assert h.estimate("wizard/iphone_se/en") == 5
+    assert h.estimate("unknown") is None
+
+
+def test_history_round_trips_through_the_file(tmp_path):
+    h = history(tmp_path, {"a": 1.23456})
+    h.save()
+    assert DurationHistory(h.path).samples == {"a": [1.235]}
+
+
+def test_plan_balances_known_items_longest_first(tmp_path):
+    durations = {"a": 8, "b": 7, "c": 6, "d": 5, "e": 4, "f": 3, "g": 2, "h": 1}
+    shards, load = plan(list(durations), 2, history(tmp_path, durations))
+    assert sorted(item for shard in shards for item in shard) == sorted(durations)
+    assert load == [sum(durations[i] for i in shard) for shard in shards]
+    assert load == [18, 18]
+
+
+def test_plan_places_unseen_items_by_hash_at_the_median(tmp_path):
+    h = history(tmp_path, {"known1": 2, "known2": 4, "known3": 9})
+    shards, load = plan(["known1", "known2", "known3", "new"], 3, h)
+    assert "new" in shards[hash_shard("new", 3)]
+    assert sum(load) == 2 + 4 + 9 + 4
+
+
+def test_plan_is_independent_of_input_order(tmp_path):
+    durations = {f"flow/{i}": 1 + i % 4 for i in range(20)}
+    items = list(durations) + ["unseen/1", "unseen/2"]
+    h = history(tmp_path, durations)
+    forward, _ = plan(items, 3, h)
+    backward, _ = plan(list(reversed(items)), 3, h)
+    assert [set(s) for s in forward] == [set(s) for s in backward]
+
+
+def test_select_shard_partitions_the_items(tmp_path):
+    durations = {f"item{i}": i + 1 for i in range(10)}
+    h = history(tmp_path, durations)
+    picked = [select_shard(list(durations), (i, 3), h, key=lambda item: item)[0] for i in (1, 2, 3)]
+    assert sorted(item for shard in picked for item in shard) == sorted(durations)
+
+
+def test_history_keys_throttled_runs_apart(tmp_path):
+    assert history_key("wizard/iphone_se/en", "off") == "wizard/iphone_se/en"
+    assert history_key("wizard/iphone_se/en", None) == "wizard/iphone_se/en"
+    assert history_key("wizard/iphone_se/en", "slow_4g") == "wizard/iphone_se/en@slow_4g"
+    h = history(tmp_path)
+    for throttle, duration in ((None, 5), ("slow_4g", 40)):
+        path = tmp_path / f"manifest-{throttle}.json"
+        manifest = {"results": [{"flow": "wizard", "profile": "iphone_se", "locale": "en", "duration": duration}]}
+        if throttle:
+            manifest["throttle"] = throttle
+        path.write_text(json.dumps(manifest))
+        h.record_manifest(path)
+    assert h.estimate("wizard/iphone_se/en") == 5
+    assert h.estimate("wizard/iphone_se/en@slow_4g") == 40
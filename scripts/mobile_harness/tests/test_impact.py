@@ -0,0 +1,98 @@
+import pytest
+
+from mobile_harness.impact import analyze_impact, route_of_dir, split_locale
+
+SOURCES = {
+    "app/[locale]/layout.tsx": "export default function Layout() {}",
+    "app/[locale]/page.tsx": "import Hero from '@/components/Hero';",
+    "app/[locale]/blog/page.tsx": "import { getPosts } from '@/lib/blog/api';",
+    "app/[locale]/blog/[slug]/page.tsx": "import BlogCard from '@/components/BlogCard';",
+    "app/[locale]/blog/[slug]/layout.tsx": "export default function BlogLayout() {}",
+    "app/[locale]/(app)/trips/new/page.tsx":
+        "import { useTranslations } from 'next-intl';\nconst t = useTranslations('trips');",
+    "app/[locale]/(app)/trips/[id]/page.tsx": "const t = await getTranslations({ namespace: 'common' });",
+    "app/api/trips/route.ts": "import { getPosts } from '@/lib/blog/api';",
+    "components/Hero.tsx": "<img src=\"/images/hero.webp\" />",
+    "components/BlogCard.tsx": "import { getPost } from '../lib/blog/api';",
+    "components/BlogCard.test.tsx": "import BlogCard from './BlogCard';",
+    "lib/blog/api.ts": "const dir = path.join(process.cwd(), 'content/blog');",
+}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    for rel, text in SOURCES.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return tmp_path
+
+
+def routes(repo, *files):
+    impact = analyze_impact("main", repo=repo, files=list(files))
+    return {route: (sorted(l) if l is not None else None) for route, l in impact.routes.items()}
+
+
+def test_route_of_dir_drops_locale_groups_and_slots():
+    assert route_of_dir("app/[locale]/(marketing)/blog/[slug]") == "/blog/[slug]"
+    assert route_of_dir("app/[locale]/@modal/trips/new") == "/trips/new"
+    assert route_of_dir("app/[locale]") == "/"
+
+
+def test_split_locale():
+    assert split_locale("/it/blog/x") == ("it", "/blog/x")
+    assert split_locale("/blog/x") == ("en", "/blog/x")
+    assert split_locale("/pt") == ("pt", "/")
+
+
+def test_page_change_maps_to_its_route(repo):
+    assert routes(repo, "app/[locale]/(app)/trips/new/page.tsx") == {"/trips/new": None}
+
+
+def test_layout_change_maps_to_its_subtree(repo):
+    assert routes(repo, "app/[locale]/blog/[slug]/layout.tsx") == {"/blog/[slug]": None}
+    assert set(routes(repo, "app/[locale]/layout.tsx")) == {
+        "/", "/blog", "/blog/[slug]", "/trips/new", "/trips/[id]"}
+
+
+def test_component_change_follows_imports_transitively(repo):
+    assert routes(repo, "components/BlogCard.tsx") == {"/blog/[slug]": None}
+    # relative and @/ imports of lib/blog/api; the API route handler is ignored
+    assert routes(repo, "lib/blog/api.ts") == {"/blog": None, "/blog/[slug]": None}
+
+
+def test_data_and_public_files_map_through_the_files_that_mention_them(repo):
+    assert routes(repo, "content/blog/kyoto.mdx") == {"/blog": None, "/blog/[slug]": None}
+    assert routes(repo, "public/images/hero.webp") == {"/": None}
+
+
+def test_message_change_affects_its_namespace_in_its_locale_only(repo):
+    assert routes(repo, "messages/it/trips.json") == {"/trips/new": ["it"]}
+    assert routes(repo, "messages/es/common.json") == {"/trips/[id]": ["es"]}
+
+
+def test_tests_api_routes_and_scripts_affect_nothing(repo):
+    assert routes(repo, "components/BlogCard.test.tsx", "app/api/trips/route.ts", "scripts/x.ts") == {}
+
+
+def test_global_files_affect_everything(repo):
+    impact = analyze_impact("main", repo=repo, files=["package.json"])
+    assert impact.everything
+    assert impact.affects("/anything/at/all")
+
+
+def test_affects_matches_concrete_paths_per_locale(repo):
+    impact = analyze_impact("main", repo=repo, files=["messages/it/trips.json", "components/BlogCard.tsx"])
+    assert impact.affects("/it/trips/new")
+    assert not impact.affects("/trips/new")
+    assert impact.affects("/es/blog/kyoto?ref=home")
+    assert not impact.affects("/blog")
+    assert not impact.affects("/trips/42")
+
+
+def test_static_route_wins_over_dynamic(repo):
+    impact = analyze_impact("main", repo=repo, files=["app/[locale]/(app)/trips/new/page.tsx"])
+    assert impact.graph.route_for_path("/trips/new") == "/trips/new"
+    assert impact.graph.route_for_path("/trips/abc") == "/trips/[id]"
+    assert impact.affects("/trips/new")
+    assert not impact.affects("/trips/abc")
@@ -0,0 +1,100 @@
+import pytest
+
+from mobile_harness.page_errors import ErrorIndex, classify, normalize, ranked, request_shape, route_of
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("TypeError: x is undefined\n    at foo (https://app/_next/static/chunks/main.js:12:345)",
+     "TypeError: x is undefined"),
+    ("Failed to fetch https://monkeytravel.app/api/trips/42?x=1", "Failed to fetch <url>"),
+    ("at app.js:12:40 in render", "at app.js in render"),
+    ("Trip 550e8400-e29b-41d4-a716-446655440000 not found", "Trip <id> not found"),
+    ("chunk 8f3c9a1b2c4d failed", "chunk <id> failed"),
+    ("Request took 1200ms (retry 3)", "Request took <n>ms (retry <n>)"),
+    ("Minified React error #418; visit", "Minified React error #418; visit"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize(message, expected):
+    assert normalize(message) == expected
+
+
+def test_normalize_makes_the_same_bug_on_different_pages_one_message():
+    a = normalize("Cannot read properties of null (reading 'id') at https://x/trips/1:10:5")
+    b = normalize("Cannot read properties of null (reading 'id') at https://x/trips/2:88:1")
+    assert a == b
+
+
+@pytest.mark.parametrize("url, route", [
+    ("https://monkeytravel.app/", "/"),
+    ("https://monkeytravel.app/it", "/"),
+    ("https://monkeytravel.app/it/trips/new/", "/trips/new"),
+    ("https://monkeytravel.app/trips/550e8400-e29b-41d4-a716-446655440000/edit", "/trips/[id]/edit"),
+    ("https://monkeytravel.app/es/trips/12345", "/trips/[id]"),
+    ("https://monkeytravel.app/shared/V1StGXR8_Z5jdHi6B-myT", "/shared/[id]"),
+    ("https://monkeytravel.app/shared/clx9f2k3l0000abcdefgh", "/shared/[id]"),
+    # readable slugs are routes of their own, digits or not
+    ("https://monkeytravel.app/blog/best-time-to-visit-japan-in-spring", "/blog/best-time-to-visit-japan-in-spring"),
+    ("https://monkeytravel.app/pt/blog/top-10-things-to-do-in-rome", "/blog/top-10-things-to-do-in-rome"),
+    ("https://monkeytravel.app/blog/2026-travel-trends", "/blog/2026-travel-trends"),
+    ("https://monkeytravel.app/itinerary?trip=1", "/itinerary"),
+    ("about:blank", "about:blank"),
+    (None, "?"),
+])
+def test_route_of(url, route):
+    assert route_of(url) == route
+
+
+def test_request_shape_folds_ids_but_keeps_host():
+    assert request_shape("https://api.example.com/v1/trips/8f3c9a1b2c4d/share?x=1") == \
+        "api.example.com/v1/trips/[id]/share"
+
+
+@pytest.mark.parametrize("msg_type, text, kind", [
+    ("error", "Uncaught ReferenceError", "console"),
+    ("error", "Failed to load resource: the server responded with a status of 404", None),
+    ("warning", "Warning: Text content did not match. Server: \"a\" Client: \"b\"", "hydration"),
+    ("error", "Minified React error #423", "hydration"),
+    ("log", "hello", None),
+])
+def test_classify(msg_type, text, kind):
+    assert classify(msg_type, text) == kind
+
+
+def test_index_merges_pending_records_into_the_file(tmp_path):
+    path = tmp_path / "errors.json"
+    first = ErrorIndex(path)
+    key = first.record("console", "boom after 120ms", "https://x/it/trips/new", "iphone_se")
+    first.record("console", "boom after 80ms", "https://x/trips/new", "pixel_7")
+    assert first.save() == 1
+    assert first.pending == {}
+
+    second = ErrorIndex(path)
+    assert second.record("console", "boom after 5ms", "https://x/blog/some-post", "iphone_se") == key
+    second.record("http", "500 GET https://x/api/a", "https://x/", "iphone_se")
+    assert second.save() == 2
+
+    entries = ErrorIndex(path).load()
+    assert entries[key]["count"] == 3
+    assert entries[key]["message"] == "boom after <n>ms"
+    assert entries[key]["routes"] == {"/trips/new": 2, "/blog/some-post": 1}
+    assert entries[key]["viewports"] == {"iphone_se": 2, "pixel_7": 1}
+    assert entries[key]["example"] == "boom after 120ms"
+
+
+def test_save_without_records_leaves_no_file(tmp_path):
+    index = ErrorIndex(tmp_path / "errors.json")
+    assert index.save() == 0
+    assert index.load() == {}
+
+
+def test_ranked_sorts_by_count_and_filters():
+    entries = {
+        "a": {"kind": "console", "count": 2, "routes": {"/": 2}, "viewports": {"iphone_se": 2}, "last_seen": 10},
+        "b": {"kind": "http", "count": 5, "routes": {"/blog": 5}, "viewports": {"pixel_7": 5}, "last_seen": 20},
+        "c": {"kind": "console", "count": 5, "routes": {"/": 5}, "viewports": {"pixel_7": 5}, "last_seen": 30},
+    }
+    assert [key for key, _ in ranked(entries)] == ["b", "c", "a"]
+    assert [key for key, _ in ranked(entries, kind="console")] == ["c", "a"]
+    assert [key for key, _ in ranked(entries, route="/", viewport="iphone_se")] == ["a"]
+    assert [key for key, _ in ranked(entries, since=15)] == ["b", "c"]
@@ -0,0 +1,95 @@
+import pytest
+
+from mobile_harness import results_db
+from mobile_harness.results_db import ResultsDB
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_db, "git_commit", lambda: ("abc123", False))
+    with ResultsDB(tmp_path / "results.sqlite") as db:
+        yield db
+
+
+def run(db, started, measurements, script="test-mobile-final"):
+    """measurements: (profile, route, step, metric, value) tuples."""
+    run_id = db.begin_run(script, "http://localhost:3000", started=started)
+    for m in measurements:
+        db.add_measurement(run_id, *m)
+    db.commit()
+    db.finish_run(run_id)
+    return run_id
+
+
+def test_series_is_oldest_first_per_run(db):
+    first = run(db, 100, [("iphone_se", "/trips/new", None, "lcp", 1000),
+                          ("iphone_se", "/trips/new", None, "lcp", 1200)])
+    second = run(db, 200, [("iphone_se", "/trips/new", None, "lcp", 1500)])
+    series = db.series("lcp", route="/trips/new")
+    assert [(r["run"], r["values"]) for r in series] == [(first, [1000, 1200]), (second, [1500])]
+    assert series[0]["commit"] == "abc123"
+    assert series[0]["script"] == "test-mobile-final"
+
+
+def test_series_filters_by_route_profile_step_and_script(db):
+    run(db, 100, [("iphone_se", "/trips/new", "a", "lcp", 1), ("pixel_7", "/trips/new", "a", "lcp", 2),
+                  ("iphone_se", "/", "a", "lcp", 3), ("iphone_se", "/trips/new", "b", "lcp", 4),
+                  ("iphone_se", "/trips/new", "a", "cls", 0.1)])
+    run(db, 200, [("iphone_se", "/trips/new", "a", "lcp", 5)], script="shard-wizard")
+    values = lambda **f: [v for r in db.series("lcp", **f) for v in r["values"]]
+    assert values(route="/trips/new", profile="iphone_se", step="a") == [1, 5]
+    assert values(route="/trips/new", profile="iphone_se", step="a", script="shard-wizard") == [5]
+    assert values(profile="pixel_7") == [2]
+    assert values(route="/") == [3]
+    assert db.series("cls")[0]["values"] == [0.1]
+
+
+def test_series_last_counts_only_runs_that_measured_the_metric(db):
+    ids = [run(db, 100 + i, [("iphone_se", "/", None, "lcp", 1000 + i)]) for i in range(5)]
+    # newer runs without an lcp on this route don't push measured runs out
+    run(db, 200, [("iphone_se", "/", None, "cls", 0.2)])
+    run(db, 201, [("iphone_se", "/blog", None, "lcp", 9000)])
+    series = db.series("lcp", route="/", last=3)
+    assert [r["run"] for r in series] == ids[-3:]
+
+
+def test_trend_per_run_and_overall_percentiles(db):
+    run(db, 100, [("iphone_se", "/", None, "lcp", v) for v in (1000, 2000, 3000, 4000, 5000)])
+    run(db, 200, [("iphone_se", "/", None, "lcp", v) for v in (6000, 7000)])
+    series, overall = db.trend("lcp", route="/")
+    assert [(r["n"], r["p75"]) for r in series] == [(5, 4000), (2, 6750)]
+    assert overall == 5500
+    series, overall = db.trend("lcp", pct=50, route="/", last=1)
+    assert [r["p50"] for r in series] == [6500]
+    assert overall == 6500
+
+
+def test_trend_with_no_data(db):
+    assert db.trend("lcp", route="/nowhere") == ([], None)
+
+
+def test_vitals_are_stored_under_locale_free_routes(db):
+    run_id = db.begin_run("test-production-mobile", "https://monkeytravel.app")
+    db.add_vitals(run_id, [
+        {"url": "https://monkeytravel.app/it/trips/new", "profile": "iphone_se", "step": "load",
+         "lcp": 1800, "cls": 0.02, "inp": None},
+        {"url": "https://monkeytravel.app/trips/new", "profile": "iphone_se", "step": "load", "lcp": 2200},
+    ])
+    db.commit()
+    assert db.series("lcp", route="/trips/new")[0]["values"] == [1800, 2200]
+    assert db.series("cls", route="/trips/new")[0]["values"] == [0.02]
+    assert db.series("inp") == []
+
+
+def test_top_issues_rank_by_runs_then_count(db):
+    for started in (100, 200):
+        run_id = db.begin_run("test-mobile-final", "x", started=started)
+        db.add_issues(run_id, "iphone_se", "/trips/new", "wizard", ["Generate button never became visible"])
+        db.commit()
+    run_id = db.begin_run("test-mobile-final", "x", started=300)
+    db.add_issues(run_id, "pixel_7", "/auth/login", "login", ["overflow"] * 3)
+    db.commit()
+    issues = db.top_issues()
+    assert [(i["message"], i["runs"], i["count"]) for i in issues] == [
+        ("Generate button never became visible", 2, 2), ("overflow", 1, 3)]
+    assert [i["message"] for i in db.top_issues(last=1)] == ["overflow"]
@@ -0,0 +1,81 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from mobile_harness.visual_diff import compare_images, tile_regions
+
+
+def save(tmp_path, name, pixels):
+    path = tmp_path / name
+    Image.fromarray(pixels.astype(np.uint8)).save(path)
+    return str(path)
+
+
+def blank(height=192, width=128):
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+def test_identical_images_are_unchanged(tmp_path):
+    a = save(tmp_path, "a.png", blank())
+    b = save(tmp_path, "b.png", blank())
+    result = compare_images(a, b, diff_path=str(tmp_path / "diff.png"))
+    assert not result.changed
+    assert result.regions == []
+    assert result.diff_path is None
+    assert not (tmp_path / "diff.png").exists()
+
+
+def test_changed_block_is_reported_as_tile_aligned_region(tmp_path):
+    current = blank()
+    current[100:130, 40:80] = (255, 0, 0)
+    result = compare_images(save(tmp_path, "base.png", blank()), save(tmp_path, "cur.png", current),
+                            diff_path=str(tmp_path / "diff.png"))
+    assert result.changed_pixels == 30 * 40
+    # rows 100..129 -> tiles 3..4, columns 40..79 -> tiles 1..2
+    assert result.regions == [[32, 96, 64, 64]]
+    assert result.changed_tiles == 4
+    assert result.total_tiles == 4 * 6
+    assert (tmp_path / "diff.png").exists()
+
+
+def test_small_colour_noise_is_within_tolerance(tmp_path):
+    current = blank()
+    current[10:20, 10:20] = 245
+    result = compare_images(save(tmp_path, "base.png", blank()), save(tmp_path, "cur.png", current))
+    assert result.changed_pixels == 0
+
+
+def test_edge_shifted_one_pixel_is_forgiven_as_anti_aliasing(tmp_path):
+    baseline, current = blank(), blank()
+    baseline[:, 50:60] = 0
+    current[:, 51:61] = 0
+    base, cur = save(tmp_path, "base.png", baseline), save(tmp_path, "cur.png", current)
+    assert compare_images(base, cur).changed_pixels == 0
+    assert compare_images(base, cur, anti_aliasing=False).changed_pixels == 2 * 192
+
+
+def test_taller_capture_counts_the_extra_rows_as_changed(tmp_path):
+    result = compare_images(save(tmp_path, "base.png", blank()),
+                            save(tmp_path, "cur.png", blank(height=224)))
+    assert result.size_changed
+    assert result.changed_pixels == 32 * 128
+    assert result.regions == [[0, 192, 128, 32]]
+
+
+def test_tile_regions_merges_connected_tiles_only():
+    grid = np.zeros((4, 4), dtype=bool)
+    grid[0, 0] = grid[0, 1] = grid[1, 1] = True
+    grid[3, 3] = True
+    regions = tile_regions(grid, 32, 128, 128)
+    assert sorted(regions) == [[0, 0, 64, 64], [96, 96, 32, 32]]
+
+
+def test_tile_regions_clip_to_the_image_edge():
+    grid = np.ones((2, 2), dtype=bool)
+    assert tile_regions(grid, 32, 50, 40) == [[0, 0, 50, 40]]
+
+
+def test_diagonal_tiles_are_separate_regions():
+    grid = np.eye(3, dtype=bool)
+    assert len(tile_regions(grid, 10, 30, 30)) == 3
@@ -0,0 +1,97 @@
+"""
+CPU and network throttling per device profile, applied through CDP.
+
+The matrices only varied screen size and DPR. Every run had a desktop
+CPU and a LAN, so "iphone_se" said nothing about an actual iPhone SE on a
+train. Each DeviceProfile now carries a `cpu_slowdown` factor and a
+`network` profile name. When throttling is on, the pools open a CDP
+session on every new page and send:
+
+  Emulation.setCPUThrottlingRate      {rate: cpu_slowdown}
+  Network.emulateNetworkConditions    latency / throughput from NETWORK_PROFILES
+
+`--throttle` (default $HARNESS_THROTTLE, else "off") picks the mode:
+
+  off       no throttling; the default, so screenshot runs stay fast
+  device    each profile's own CPU factor and network
+  slow_4g, fast_3g, offline
+            that network for every profile, with each profile's CPU factor
+
+Timings and Web Vitals are reported per profile, labelled with the
+conditions they ran under (`describe`).
+"""
+
+import os
+
+# Request-level emulation (CDP can't shape packets), in bytes/s and ms.
+NETWORK_PROFILES = {
+    # Lighthouse's mobile target: 150 ms RTT, 1.6 Mbps down, 750 Kbps up
+    "slow_4g": {"latency": 150, "downloadThroughput": 1.6 * 1024 * 1024 / 8,
+                "uploadThroughput": 750 * 1024 / 8},
+    # DevTools' classic "Fast 3G" preset
+    "fast_3g": {"latency": 562.5, "downloadThroughput": 1.44 * 1024 * 1024 / 8,
+                "uploadThroughput": 675 * 1024 / 8},
+    "offline": {"latency": 0, "downloadThroughput": -1, "uploadThroughput": -1, "offline": True},
+}
+MODES = ("off", "device", *NETWORK_PROFILES)
+
+
+def conditions(profile, mode):
+    """(cpu_slowdown, network name or None) for `profile` under `mode`; None when unthrottled."""
+    if mode == "off":
+        return None
+    if mode not in MODES:
+        raise ValueError(f"Unknown throttle mode {mode!r} (expected one of {', '.join(MODES)})")
+    network = profile.network if mode == "device" else mode
+    if profile.cpu_slowdown <= 1 and not network:
+        return None
+    return profile.cpu_slowdown, network
+
+
+def describe(profile, mode):
+    throttle = conditions(profile, mode)
+    if not throttle:
+        return "unthrottled"
+    cpu, network = throttle
+    return ", ".join(filter(None, (network, f"{cpu:g}x CPU" if cpu > 1 else None)))
+
+
+def cdp_commands(cpu, network):
+    commands = [("Emulation.setCPUThrottlingRate", {"rate": cpu})]
+    if network:
+        commands += [
+            ("Network.enable", {}),
+            ("Network.emulateNetworkConditions", {"offline": False, **NETWORK_PROFILES[network]}),
+        ]
+    return commands
+
+
+def apply_throttling(page, profile, mode):
+    """Throttle a freshly opened page; returns the CDP session (or None when off)."""
+    throttle = conditions(profile, mode)
+    if not throttle:
+        return None
+    session = page.context.new_cdp_session(page)
+    for method, params in cdp_commands(*throttle):
+        session.send(method, params)
+    return session
+
+
+async def async_apply_throttling(page, profile, mode):
+    throttle = conditions(profile, mode)
+    if not throttle:
+        return None
+    session = await page.context.new_cdp_session(page)
+    for method, params in cdp_commands(*throttle):
+        await session.send(method, params)
+    return session
+
+
+def default_mode():
+    return os.environ.get("HARNESS_THROTTLE", "off")
+
+
+def add_throttle_arguments(parser):
+    parser.add_argument("--throttle", choices=MODES, default=default_mode(),
+                        help="CPU/network emulation: off, device (each profile's own), or one network "
+                             "profile for all (default: $HARNESS_THROTTLE or off)")
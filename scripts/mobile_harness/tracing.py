@@ -0,0 +1,249 @@
+"""
+Opt-in Chromium tracing around individual flow steps.
+
+When a Continue click feels slow on the iPhone SE profile, a screenshot
+shows the result but not the cost. `StepProfiler` opens a CDP session
+on the page, records a Chromium trace (Tracing.start / Tracing.end) around
+one step, and reduces it to a compact per-step summary of the page's
+renderer main thread:
+
+  tasks          top-level main-thread tasks in the step
+  long_tasks     tasks over 50 ms, with start offset, duration and the
+                 heaviest script under each (function @ url:line)
+  blocking_ms    sum of (task - 50 ms) over long tasks, as in TBT
+  scripting_ms   self time of script evaluation, calls, timers, events, GC
+  style_layout_ms  style recalc, layout and layer-tree updates
+  paint_ms       paint, pre-paint, layerize, composite, image decode
+
+Self time is attributed the way the DevTools summary does: each event's
+duration minus its children's, so nested calls are not counted twice.
+The raw trace goes next to the summaries as `<profile>_<label>.json.gz`,
+which DevTools (Performance > Load profile) and ui.perfetto.dev open
+directly.
+
+Tracing is browser-wide in Chromium. When steps run concurrently, a
+step waits until no other trace is being recorded. Only the traced
+page's renderer process is summarised, found by its main frame id.
+
+Begin and end are generators that yield every page call, like
+flow_engine steps. The engine traces Steps with `trace=True` itself.
+Hand-written scripts use `with profiler.step(...)` or `async with
+profiler.async_step(...)`.
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from .config import HARNESS_HOME
+from .flow_engine import _drive, _drive_async
+
+TRACE_ROOT = HARNESS_HOME / "traces"
+CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "blink.user_timing",
+    "loading",
+    "toplevel",
+]
+LONG_TASK_MS = 50
+# Polls while another page is tracing, or while Chromium flushes the trace.
+POLL_MS = 50
+MAX_POLLS = 600
+
+TASK_NAMES = {"RunTask", "ThreadControllerImpl::RunTask", "ThreadPool_RunTask"}
+SCRIPT_EVENTS = {"FunctionCall", "EvaluateScript", "TimerFire", "EventDispatch",
+                 "FireAnimationFrame", "FireIdleCallback", "v8.evaluateModule"}
+BUCKETS = {
+    **{name: "scripting" for name in (
+        *SCRIPT_EVENTS, "v8.compile", "v8.compileModule", "v8.run", "V8.Execute", "RunMicrotasks",
+        "XHRReadyStateChange", "XHRLoad", "MajorGC", "MinorGC", "V8.GCScavenger", "V8.GCCompactor",
+        "V8.GCFinalizeMC", "BlinkGC.AtomicPhase", "ParseHTML",
+    )},
+    **{name: "style_layout" for name in (
+        "UpdateLayoutTree", "RecalculateStyles", "Layout", "UpdateLayerTree", "HitTest",
+        "ParseAuthorStyleSheet", "IntersectionObserverController::computeIntersections",
+    )},
+    **{name: "paint" for name in (
+        "Paint", "PaintImage", "PrePaint", "Layerize", "CompositeLayers", "Commit",
+        "Decode Image", "ImageDecodeTask", "Decode LazyPixelRef", "UpdateLayer",
+    )},
+}
+
+
+def _slug(label):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", label).strip("_") or "step"
+
+
+def _main_threads(events, frame_id):
+    """{(pid, tid)} of the renderer main thread(s) hosting `frame_id` (all of them if unknown)."""
+    pids = set()
+    for ev in events:
+        if ev.get("name") in ("TracingStartedInBrowser", "FrameCommittedInBrowser"):
+            data = ev.get("args", {}).get("data", {})
+            for frame in data.get("frames", [data]):
+                if frame.get("frame") == frame_id and frame.get("processId"):
+                    pids.add(frame["processId"])
+    threads = {
+        (ev["pid"], ev["tid"]) for ev in events
+        if ev.get("ph") == "M" and ev.get("name") == "thread_name"
+        and ev.get("args", {}).get("name") == "CrRendererMain"
+    }
+    mine = {t for t in threads if t[0] in pids}
+    return mine or threads
+
+
+def _describe(ev):
+    data = ev.get("args", {}).get("data", {})
+    if ev["name"] == "EventDispatch":
+        return f"{data.get('type', '?')} handler"
+    fn = data.get("functionName") or ev["name"]
+    url = data.get("url")
+    if url:
+        return f"{fn} @ {url.rsplit('/', 1)[-1][:60]}:{data.get('lineNumber', '?')}"
+    return fn
+
+
+def summarize_trace(events, frame_id=None):
+    threads = _main_threads(events, frame_id)
+    spans = sorted(
+        (ev for ev in events
+         if ev.get("ph") == "X" and "dur" in ev and (ev["pid"], ev["tid"]) in threads),
+        key=lambda ev: (ev["pid"], ev["tid"], ev["ts"], -ev["dur"]),
+    )
+    totals = {"scripting": 0.0, "style_layout": 0.0, "paint": 0.0, "other": 0.0}
+    tasks, long_tasks, stack = 0, [], []
+    # the long task being scanned: (summary row, end ts, rank of its heaviest script so far);
+    # scripts with a source URL outrank wrappers like EventDispatch
+    current = None
+    origin = min((ev["ts"] for ev in spans), default=0)
+    for ev in spans:
+        thread, end = (ev["pid"], ev["tid"]), ev["ts"] + ev["dur"]
+        while stack and (stack[-1][0] != thread or ev["ts"] >= stack[-1][1]):
+            stack.pop()
+        parent = stack[-1] if stack else None
+        bucket = BUCKETS.get(ev["name"]) or (parent[2] if parent else "other")
+        totals[bucket] += ev["dur"]
+        if parent:
+            # a child's time is the child's, not the parent's
+            totals[parent[2]] -= min(end, parent[1]) - ev["ts"]
+        if not parent and ev["name"] in TASK_NAMES:
+            tasks += 1
+            current = None
+            if ev["dur"] >= LONG_TASK_MS * 1000:
+                row = {"start_ms": round((ev["ts"] - origin) / 1000, 1), "ms": round(ev["dur"] / 1000, 1), "top": None}
+                long_tasks.append(row)
+                current = (row, end, (False, 0))
+        elif current and ev["name"] in SCRIPT_EVENTS and ev["ts"] < current[1]:
+            rank = (bool(ev.get("args", {}).get("data", {}).get("url")), ev["dur"])
+            if rank > current[2]:
+                current[0]["top"] = _describe(ev)
+                current = (current[0], current[1], rank)
+        stack.append((thread, end, bucket))
+    return {
+        "tasks": tasks,
+        "long_tasks": long_tasks,
+        "long_task_ms": round(sum(t["ms"] for t in long_tasks), 1),
+        "blocking_ms": round(sum(t["ms"] - LONG_TASK_MS for t in long_tasks), 1),
+        **{f"{bucket}_ms": round(us / 1000, 1) for bucket, us in totals.items()},
+    }
+
+
+class StepProfiler:
+    def __init__(self, out_dir=TRACE_ROOT):
+        self.out_dir = str(out_dir)
+        self.summaries = []
+
+    def begin(self, page):
+        """Start tracing (waiting out any trace already running); yields page calls, returns the session."""
+        client = yield page.context.new_cdp_session(page)
+        frame_id = (yield client.send("Page.getFrameTree"))["frameTree"]["frame"]["id"]
+        for _ in range(MAX_POLLS):
+            try:
+                yield client.send("Tracing.start", {
+                    "transferMode": "ReturnAsStream",
+                    "traceConfig": {"includedCategories": CATEGORIES, "recordMode": "recordAsMuchAsPossible"},
+                })
+                break
+            except Exception as e:
+                if "already" not in str(e).lower():
+                    raise
+                yield page.wait_for_timeout(POLL_MS)
+        else:
+            raise TimeoutError("another page kept Chromium's tracing busy")
+        return client, frame_id, time.perf_counter()
+
+    def end(self, page, handle, profile_name, label):
+        """Stop tracing, store the raw trace and return the step summary."""
+        client, frame_id, started = handle
+        done = {}
+        client.on("Tracing.tracingComplete", done.update)
+        wall_ms = (time.perf_counter() - started) * 1000
+        yield client.send("Tracing.end")
+        for _ in range(MAX_POLLS):
+            if done:
+                break
+            yield page.wait_for_timeout(POLL_MS)
+        else:
+            raise TimeoutError("Chromium never delivered the trace")
+        chunks = []
+        while True:
+            chunk = yield client.send("IO.read", {"handle": done["stream"]})
+            chunks.append(chunk["data"])
+            if chunk.get("eof"):
+                break
+        yield client.send("IO.close", {"handle": done["stream"]})
+        yield client.detach()
+
+        raw = "".join(chunks)
+        trace = json.loads(raw)
+        events = trace["traceEvents"] if isinstance(trace, dict) else trace
+        path = os.path.join(self.out_dir, f"{profile_name}_{_slug(label)}.json.gz")
+        os.makedirs(self.out_dir, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(raw)
+        summary = {"profile": profile_name, "step": label, "wall_ms": round(wall_ms, 1),
+                   **summarize_trace(events, frame_id), "trace": path}
+        self.summaries.append(summary)
+        return summary
+
+    @contextmanager
+    def step(self, page, profile_name, label):
+        handle = _drive(self.begin(page))
+        try:
+            yield
+        finally:
+            _drive(self.end(page, handle, profile_name, label))
+
+    @asynccontextmanager
+    async def async_step(self, page, profile_name, label):
+        handle = await _drive_async(self.begin(page))
+        try:
+            yield
+        finally:
+            await _drive_async(self.end(page, handle, profile_name, label))
+
+    def write(self, path=None):
+        path = path or os.path.join(self.out_dir, "summary.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summaries, f, indent=2)
+        return path
+
+    def print_summary(self):
+        print_step_summaries(self.summaries)
+
+
+def print_step_summaries(summaries):
+    print("\n⏱  Step traces (main thread, ms):")
+    for s in summaries:
+        print(f"  [{s['profile']}] {s['step']}: wall {s['wall_ms']:.0f}, script {s['scripting_ms']:.0f}, "
+              f"style/layout {s['style_layout_ms']:.0f}, paint {s['paint_ms']:.0f}, "
+              f"{len(s['long_tasks'])} long task(s), TBT {s['blocking_ms']:.0f}")
+        for task in s["long_tasks"][:3]:
+            print(f"      {task['ms']:.0f}ms at +{task['start_ms']:.0f}ms: {task['top'] or '(no script)'}")
@@ -0,0 +1,222 @@
+"""
+Screenshot diffing against stored baselines, vectorized with NumPy.
+
+A pixel counts as changed when any RGB channel moves by more than
+`channel_tolerance`. With `anti_aliasing=True` a changed pixel is forgiven
+when each image's value lies inside the other image's 3x3 neighbourhood
+range — the signature of a glyph or edge re-rasterized half a pixel over,
+not a real change. Changed pixels are then bucketed into `tile` x `tile`
+cells; cells whose changed fraction exceeds `tile_threshold` are merged
+into connected regions and reported as bounding boxes.
+
+Everything is whole-array NumPy work (no per-pixel Python), and files are
+compared on a thread pool since Pillow decode and NumPy both release the
+GIL — hundreds of 1179x2556 DPR-3 captures stay in seconds, not minutes.
+
+Requires `pip install numpy pillow` (imported lazily, so the rest of the
+harness works without them).
+"""
+
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .config import HARNESS_HOME
+
+BASELINE_ROOT = HARNESS_HOME / "baselines"
+
+
+def _deps():
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError as e:
+        raise SystemExit(f"Visual diffing needs numpy and Pillow: pip install numpy pillow ({e})")
+    return np, Image
+
+
+@dataclass
+class DiffResult:
+    name: str
+    width: int
+    height: int
+    changed_pixels: int
+    size_changed: bool = False
+    # [x, y, w, h] boxes of changed regions, in image pixels.
+    regions: list = field(default_factory=list)
+    changed_tiles: int = 0
+    total_tiles: int = 0
+    diff_path: str | None = None
+
+    @property
+    def ratio(self):
+        return self.changed_pixels / max(1, self.width * self.height)
+
+    @property
+    def changed(self):
+        return self.size_changed or self.changed_pixels > 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "changed_pixels": self.changed_pixels,
+            "ratio": round(self.ratio, 6),
+            "size_changed": self.size_changed,
+            "regions": self.regions,
+            "changed_tiles": self.changed_tiles,
+            "total_tiles": self.total_tiles,
+            "diff_path": self.diff_path,
+        }
+
+
+def load_image(path):
+    np, Image = _deps()
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def _neighborhood_range(img):
+    """Per-channel min/max over each pixel's 3x3 neighbourhood (edge-padded)."""
+    np, _ = _deps()
+    h, w = img.shape[:2]
+    padded = np.pad(img, ((1, 1), (1, 1), (0, 0)), mode="edge")
+    lo = img.copy()
+    hi = img.copy()
+    for dy in range(3):
+        for dx in range(3):
+            shifted = padded[dy:dy + h, dx:dx + w]
+            np.minimum(lo, shifted, out=lo)
+            np.maximum(hi, shifted, out=hi)
+    return lo, hi
+
+
+def diff_mask(baseline, current, channel_tolerance=16, anti_aliasing=True):
+    """Boolean HxW mask of changed pixels over two same-sized RGB arrays."""
+    np, _ = _deps()
+    base16 = baseline.astype(np.int16)
+    cur16 = current.astype(np.int16)
+    mask = (np.abs(base16 - cur16) > channel_tolerance).any(axis=2)
+    if anti_aliasing and mask.any():
+        base_lo, base_hi = _neighborhood_range(base16)
+        cur_lo, cur_hi = _neighborhood_range(cur16)
+        t = channel_tolerance
+        cur_in_base = ((cur16 >= base_lo - t) & (cur16 <= base_hi + t)).all(axis=2)
+        base_in_cur = ((base16 >= cur_lo - t) & (base16 <= cur_hi + t)).all(axis=2)
+        mask &= ~(cur_in_base & base_in_cur)
+    return mask
+
+
+def tile_grid(mask, tile=32, tile_threshold=0.01):
+    """Boolean grid of tiles whose changed-pixel fraction exceeds the threshold."""
+    np, _ = _deps()
+    h, w = mask.shape
+    th, tw = -(-h // tile), -(-w // tile)
+    padded = np.zeros((th * tile, tw * tile), dtype=bool)
+    padded[:h, :w] = mask
+    fractions = padded.reshape(th, tile, tw, tile).mean(axis=(1, 3))
+    return fractions > tile_threshold
+
+
+def tile_regions(grid, tile, width, height):
+    """Merge 4-connected changed tiles into pixel bounding boxes [x, y, w, h]."""
+    rows, cols = grid.shape
+    seen = set()
+    regions = []
+    for start in zip(*grid.nonzero()):
+        start = (int(start[0]), int(start[1]))
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [start]
+        top, left, bottom, right = start[0], start[1], start[0], start[1]
+        while stack:
+            r, c = stack.pop()
+            top, bottom = min(top, r), max(bottom, r)
+            left, right = min(left, c), max(right, c)
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and grid[nr, nc] and (nr, nc) not in seen:
+                    seen.add((nr, nc))
+                    stack.append((nr, nc))
+        x, y = left * tile, top * tile
+        regions.append([x, y, min((right + 1) * tile, width) - x, min((bottom + 1) * tile, height) - y])
+    return regions
+
+
+def write_diff_image(current, mask, path):
+    """Dimmed grayscale of the current capture with changed pixels in red."""
+    np, Image = _deps()
+    gray = (current.mean(axis=2) * 0.4 + 153).astype(np.uint8)
+    out = np.stack([gray, gray, gray], axis=2)
+    out[mask] = (255, 0, 0)
+    Image.fromarray(out).save(path)
+    return path
+
+
+def compare_images(baseline_path, current_path, diff_path=None, channel_tolerance=16,
+                   anti_aliasing=True, tile=32, tile_threshold=0.01):
+    np, _ = _deps()
+    baseline = load_image(baseline_path)
+    current = load_image(current_path)
+    height, width = current.shape[:2]
+    size_changed = baseline.shape != current.shape
+
+    # Compare the overlapping area; anything outside it counts as changed.
+    h = min(baseline.shape[0], height)
+    w = min(baseline.shape[1], width)
+    mask = np.ones((height, width), dtype=bool)
+    mask[:h, :w] = diff_mask(baseline[:h, :w], current[:h, :w], channel_tolerance, anti_aliasing)
+
+    grid = tile_grid(mask, tile, tile_threshold)
+    result = DiffResult(
+        name=os.path.basename(current_path),
+        width=width,
+        height=height,
+        changed_pixels=int(mask.sum()),
+        size_changed=size_changed,
+        regions=tile_regions(grid, tile, width, height),
+        changed_tiles=int(grid.sum()),
+        total_tiles=int(grid.size),
+    )
+    if diff_path and result.changed:
+        result.diff_path = write_diff_image(current, mask, diff_path)
+    return result
+
+
+def _pngs(directory):
+    return sorted(f for f in os.listdir(directory) if f.lower().endswith(".png"))
+
+
+def compare_dirs(current_dir, baseline_dir, diff_dir=None, workers=None, **options):
+    """Compare every PNG in current_dir with its namesake in baseline_dir.
+
+    Returns (results, missing) — missing lists captures with no baseline yet.
+    """
+    if diff_dir:
+        os.makedirs(diff_dir, exist_ok=True)
+    names = _pngs(current_dir)
+    missing = [n for n in names if not os.path.exists(os.path.join(baseline_dir, n))]
+    pairs = [n for n in names if n not in missing]
+
+    def compare(name):
+        return compare_images(
+            os.path.join(baseline_dir, name),
+            os.path.join(current_dir, name),
+            diff_path=os.path.join(diff_dir, name) if diff_dir else None,
+            **options,
+        )
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        results = list(executor.map(compare, pairs))
+    return results, missing
+
+
+def promote_baselines(current_dir, baseline_dir, names=None):
+    """Copy captures into the baseline directory (all PNGs unless `names` given)."""
+    os.makedirs(baseline_dir, exist_ok=True)
+    names = names or _pngs(current_dir)
+    for name in names:
+        shutil.copy2(os.path.join(current_dir, name), os.path.join(baseline_dir, name))
+    return names
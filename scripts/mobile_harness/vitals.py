@@ -0,0 +1,167 @@
+"""
+Core Web Vitals + navigation/resource timing, sampled per flow step.
+
+`install_vitals(context)` adds an init script that starts buffered
+PerformanceObservers on every document before any app code runs:
+
+  LCP   last largest-contentful-paint entry (frozen by the first input)
+  CLS   largest session window of layout shifts without recent input
+        (1s gap / 5s cap, as web-vitals computes it)
+  INP   worst event-timing duration among real interactions (interactionId)
+  FCP   first-contentful-paint
+  TTFB  navigation responseStart
+
+plus long-task totals (duration and blocking time over 50ms) for budgets.
+
+`VitalsReport.sample(page, profile, step)` reads those values plus the
+navigation entry and the resource entries added since the previous sample
+in one evaluate, and `write()` emits JSON with every sample and p50/p75/p95
+per viewport — the same field-style numbers CrUX reports. Given the run's
+throttle mode, every sample and summary is labelled with the CPU/network
+conditions its profile ran under (throttling.py).
+"""
+
+import json
+import math
+import time
+
+from .throttling import default_mode, describe
+
+VITALS_INIT_SCRIPT = """
+(() => {
+  if (window.__harnessVitals) return;
+  const v = window.__harnessVitals = {
+    lcp: null, cls: 0, inp: null, fcp: null, longTaskMs: 0, blockingMs: 0, resourceIndex: 0,
+  };
+  const observe = (type, cb, opts = {}) => {
+    try { new PerformanceObserver((list) => list.getEntries().forEach(cb)).observe({ type, buffered: true, ...opts }); }
+    catch (e) {}
+  };
+  observe('largest-contentful-paint', (e) => { v.lcp = e.renderTime || e.loadTime || e.startTime; });
+  observe('paint', (e) => { if (e.name === 'first-contentful-paint') v.fcp = e.startTime; });
+  let session = 0, sessionStart = 0, sessionLast = 0;
+  observe('layout-shift', (e) => {
+    if (e.hadRecentInput) return;
+    if (session && (e.startTime - sessionLast > 1000 || e.startTime - sessionStart > 5000)) session = 0;
+    if (!session) sessionStart = e.startTime;
+    session += e.value;
+    sessionLast = e.startTime;
+    v.cls = Math.max(v.cls, session);
+  });
+  observe('longtask', (e) => {
+    v.longTaskMs += e.duration;
+    v.blockingMs += Math.max(0, e.duration - 50);
+  });
+  observe('event', (e) => {
+    if (e.interactionId) v.inp = Math.max(v.inp || 0, e.duration);
+  }, { durationThreshold: 16 });
+})();
+"""
+
+SAMPLE_SCRIPT = """
+() => {
+  const v = window.__harnessVitals || {};
+  const nav = performance.getEntriesByType('navigation')[0];
+  const resources = performance.getEntriesByType('resource');
+  const fresh = resources.slice(v.resourceIndex || 0);
+  v.resourceIndex = resources.length;
+  const round = (x) => (x == null ? null : Math.round(x * 1000) / 1000);
+  return {
+    lcp: round(v.lcp), cls: round(v.cls), inp: round(v.inp), fcp: round(v.fcp),
+    ttfb: nav ? round(nav.responseStart) : null,
+    long_task_ms: round(v.longTaskMs), blocking_ms: round(v.blockingMs),
+    navigation: nav ? {
+      type: nav.type,
+      dns: round(nav.domainLookupEnd - nav.domainLookupStart),
+      connect: round(nav.connectEnd - nav.connectStart),
+      ttfb: round(nav.responseStart),
+      response_end: round(nav.responseEnd),
+      dom_interactive: round(nav.domInteractive),
+      dom_content_loaded: round(nav.domContentLoadedEventEnd),
+      load: round(nav.loadEventEnd),
+      transfer_size: nav.transferSize,
+    } : null,
+    resources: fresh.map((r) => ({
+      name: r.name, type: r.initiatorType, start: round(r.startTime), duration: round(r.duration),
+      transfer_size: r.transferSize, encoded_size: r.encodedBodySize,
+    })),
+  };
+}
+"""
+
+METRICS = ("lcp", "cls", "inp", "fcp", "ttfb")
+PERCENTILES = (50, 75, 95)
+
+
+def install_vitals(target):
+    """Register the observers on a BrowserContext or Page (before navigation).
+
+    Returns add_init_script's result, so async callers `await` it.
+    """
+    return target.add_init_script(VITALS_INIT_SCRIPT)
+
+
+def percentile(values, p):
+    """Linear-interpolated percentile of a list of numbers (None if empty)."""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    rank = (len(values) - 1) * p / 100
+    lo, hi = math.floor(rank), math.ceil(rank)
+    return values[lo] + (values[hi] - values[lo]) * (rank - lo)
+
+
+class VitalsReport:
+    def __init__(self, target, throttle=None):
+        self.target = target
+        self.throttle = throttle or default_mode()
+        self.samples = []
+        # profile name -> conditions it ran under
+        self.conditions = {}
+
+    def _record(self, profile, step, url, data):
+        conditions = self.conditions.setdefault(profile.name, describe(profile, self.throttle))
+        sample = {"profile": profile.name, "conditions": conditions, "step": step, "url": url,
+                  "at": time.time(), **data}
+        self.samples.append(sample)
+        return sample
+
+    def sample(self, page, profile, step):
+        return self._record(profile, step, page.url, page.evaluate(SAMPLE_SCRIPT))
+
+    async def async_sample(self, page, profile, step):
+        return self._record(profile, step, page.url, await page.evaluate(SAMPLE_SCRIPT))
+
+    def percentiles(self):
+        """{profile: {metric: {"p50": .., "p75": .., "p95": .., "n": ..}}}"""
+        summary = {}
+        for profile in dict.fromkeys(s["profile"] for s in self.samples):
+            rows = [s for s in self.samples if s["profile"] == profile]
+            summary[profile] = {
+                metric: {
+                    **{f"p{p}": percentile([r[metric] for r in rows], p) for p in PERCENTILES},
+                    "n": sum(1 for r in rows if r[metric] is not None),
+                }
+                for metric in METRICS
+            }
+        return summary
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "target": self.target,
+                "generated": time.time(),
+                "conditions": self.conditions,
+                "percentiles": self.percentiles(),
+                "samples": self.samples,
+            }, f, indent=2)
+        return path
+
+    def print_summary(self):
+        for profile, metrics in self.percentiles().items():
+            print(f"\n  {profile} ({self.conditions[profile]}):")
+            for metric, stats in metrics.items():
+                if stats["n"]:
+                    values = "  ".join(f"p{p}={stats[f'p{p}']:.3f}" if metric == "cls"
+                                       else f"p{p}={stats[f'p{p}']:.0f}ms" for p in PERCENTILES)
+                    print(f"    {metric.upper():5} {values}  (n={stats['n']})")
@@ -0,0 +1,142 @@
+"""
+Canonical /trips/new wizard flows, declared once for every runner.
+
+WIZARD is the destination -> dates -> vibes walk up to the Generate
+button; GENERATE continues from there through the Onboarding modal to the
+Auth modal. test-mobile-modals.py, test-production-mobile.py,
+simple-mobile-test.py and test-mobile-final.py run them instead of
+hand-coding the walk, and test-wizard-mobile.py runs WIZARD_STEP1 (up to the
+first Continue) before its own occlusion checks. They are
+flow_engine.Flows parameterised by locale: button labels come from
+messages/<locale>/ so the same flows run on /it/trips/new, /es/trips/new, ...
+
+They are best-effort — steps whose controls aren't on screen are skipped —
+and cope with both the old 4-step wizard (native date inputs) and the
+current 2-step one (DateRangePicker calendar).
+"""
+
+import datetime
+from dataclasses import replace
+
+from .config import BASE_URL
+from .flow_engine import Flow, Step, Target, async_run_flow, run_flow
+
+WIZARD_TARGETS = {
+    "accept_cookies": Target(role="button", name="{accept_cookies}"),
+    # the step 1 title; clicking it closes the autocomplete that autoFocus opens
+    "step1_title": Target(css='text="{step1_title}"'),
+    "destination": Target(css="button:has-text('Tokyo')"),
+    "continue": Target(css="button:has-text('{continue}')"),
+    "date_inputs": Target(css="input[type='date']"),
+    "checkin": Target(role="button", has_text="{checkin}"),
+    # DateRangePicker day cells (disabled: before min date / past max length)
+    "calendar_day": Target(css="button.h-10.w-full.rounded-lg:not([disabled])"),
+    "next_month": Target(role="button", name="{next_month}"),
+    "vibe": Target(role="button", has_text="{vibe}"),
+    "generate": Target(css="button:has-text('{generate}')"),
+}
+
+WIZARD_LABELS = {
+    "accept_cookies": ("consent", "banner.acceptAll"),
+    "step1_title": ("trips", "wizard.step1.title"),
+        "continue": ("trips", "wizard.step1.continue"),
+        "checkin": ("trips", "wizard.step1.checkin"),
+        "next_month": ("trips", "wizard.datePicker.nextMonth"),
+        "generate": ("trips", "wizard.step2.generate"),
+        "vibe": ("common", "vibes.types.cultural.label"),
+}
+
+STEP1 = (
+    Step("goto", value="/trips/new", shot="step1_destination"),
+    Step("click", "accept_cookies"),
+    Step("click", "step1_title"),
+    Step("layout", value="Step 1 layout"),
+    Step("taps", value="Step 1 taps"),
+    Step("click", "destination"),
+    Step("dates"),
+)
+
+WIZARD = Flow(
+    name="wizard",
+    labels=WIZARD_LABELS,
+    targets=WIZARD_TARGETS,
+    steps=(
+        *STEP1,
+        *(
+            step
+            for n in range(2, 5)
+            for step in (
+                Step("click", "continue", shot=f"step{n}", stop=True, trace=True),
+                Step("layout", value=f"Step {n} layout"),
+                Step("taps", value=f"Step {n} taps"),
+                Step("dates"),
+                Step("click", "vibe", trace=True),
+            )
+        ),
+    ),
+    checks=(
+        Step("expect", "generate", shot="ready_to_generate", optional=False,
+             issue="Generate button never became visible"),
+    ),
+)
+
+# Destination and dates picked, stopping short of the first Continue
+WIZARD_STEP1 = replace(
+    WIZARD,
+    name="wizard_step1",
+    steps=STEP1,
+    checks=(
+        Step("expect", "continue", shot="step1_ready", optional=False,
+             issue="Continue button never became visible"),
+    ),
+)
+
+# From a filled-in wizard: Generate -> Onboarding modal (when the app shows
+# it) -> Create Account -> Auth modal
+GENERATE = Flow(
+    name="generate",
+    labels={
+        "generate": ("trips", "wizard.step2.generate"),
+        "personalize": ("common", "onboarding.modal.personalizeTrip"),
+        "style": ("common", "onboarding.travelStyle.styles.adventure.label"),
+        "next": ("common", "onboarding.modal.next"),
+        "create_account": ("common", "onboarding.modal.createAccount"),
+        "auth": ("common", "authPrompt.title"),
+    },
+    targets={
+        "generate": Target(css="button:has-text('{generate}')"),
+        "onboarding": Target(css="text={personalize}"),
+        "style": Target(css="button:has-text('{style}')"),
+        "next": Target(css="button:has-text('{next}')"),
+        "create_account": Target(css="button:has-text('{create_account}')"),
+        "auth": Target(css="text={auth}"),
+    },
+    steps=(
+        Step("click", "generate", trace=True),
+        Step("expect", "onboarding", shot="onboarding_step1", stop=True),
+        Step("click", "style", shot="onboarding_step1_selected"),
+        Step("click", "next", shot="onboarding_step2_dietary"),
+        Step("click", "next", shot="onboarding_step3_accessibility"),
+        Step("click", "next", shot="onboarding_step4_active_hours"),
+        Step("click", "create_account"),
+    ),
+    checks=(
+        Step("expect", "auth", shot="auth_modal"),
+        Step("shot", value="after Generate", shot="after_generate"),
+    ),
+)
+
+
+def trip_dates(today=None):
+    """A start/end pair a week out, so date validation never rejects it."""
+    today = today or datetime.date.today()
+    return today + datetime.timedelta(days=7), today + datetime.timedelta(days=11)
+
+
+def run_wizard(page, profile, locale, out_dir, base_url=BASE_URL, profiler=None, flow=WIZARD, writer=None):
+    return run_flow(flow, page, profile, locale, out_dir, trip_dates(), base_url, profiler, writer)
+
+
+async def async_run_wizard(page, profile, locale, out_dir, base_url=BASE_URL, profiler=None, flow=WIZARD,
+                           writer=None):
+    return await async_run_flow(flow, page, profile, locale, out_dir, trip_dates(), base_url, profiler, writer)
@@ -2,137 +2,140 @@
 """
 Final Mobile UI Testing - Multiple Viewports
 Tests the app on various mobile screen sizes for comprehensive coverage.
+
+Each viewport x flow pair runs as its own job on one shared browser.
+`--concurrency N` runs up to N jobs at once (default: all of them, up to the
+CPU count; 1 = one after another).
+
+Every flow is also checked against the per-route performance budgets in
+mobile_harness/budgets.json; any violation makes the run exit 1.
+`--throttle device` emulates each viewport's CPU and network (see
+mobile_harness/throttling.py); flow timings are printed per viewport.
+Timings, budget measurements, issues and screenshot hashes are kept in
+the results store (`mobile-harness.py results`).
 """
 
-from playwright.sync_api import sync_playwright
+from mobile_harness import FINAL_VIEWPORTS, async_wait_for_ready, run_matrix
+from mobile_harness.artifact_store import ArtifactStore, print_changes
+from mobile_harness.budgets import BudgetChecker
+from mobile_harness.config import PROD_URL
+from mobile_harness.devices import find_profile
+from mobile_harness.layout_audit import async_audit_layout, layout_issues, write_audits
+from mobile_harness.page_errors import ErrorIndex, print_ranked, ranked
+from mobile_harness.results_db import ResultsDB
+from mobile_harness.tap_targets import async_analyze_taps, tap_issues
+from mobile_harness.throttling import add_throttle_arguments, describe
+from mobile_harness.wizard import async_run_wizard
+from mobile_harness.vitals import install_vitals
+import argparse
 import os
+import sys
+import time
 
 OUTPUT_DIR = "/tmp/mobile-final"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Test multiple screen sizes
-VIEWPORTS = [
-    ("iphone_se", 375, 667),       # Smallest common iPhone
-    ("iphone_14", 390, 844),       # Standard iPhone
-    ("iphone_14_max", 430, 932),   # Largest iPhone
-    ("android_sm", 360, 640),      # Small Android
-    ("android_lg", 412, 915),      # Large Android (Pixel)
+# Test multiple screen sizes (see mobile_harness/devices.py)
+VIEWPORTS = FINAL_VIEWPORTS
+
+BUDGETS = BudgetChecker()
+
+# "<viewport>/<check>" -> layout / tap-target payload, written to layout-audit.json
+AUDITS = {}
+# viewport -> the wizard's per-step timings
+WIZARD_TIMINGS = {}
+
+async def check_layout(page, name, issues, label):
+    report = await async_audit_layout(page)
+    AUDITS[f"{name}/{label}"] = report
+    issues.extend(layout_issues(report, label))
+    # Covered controls and undersized tap targets, every control in one pass
+    taps = await async_analyze_taps(page)
+    AUDITS[f"{name}/{label} taps"] = taps
+    issues.extend(tap_issues(taps, f"{label} taps"))
+
+async def check_wizard(page, name, issues):
+    # The declarative wizard flow (mobile_harness/wizard.py), against production
+    result = await async_run_wizard(page, find_profile(name), "en", OUTPUT_DIR, base_url=PROD_URL)
+    for shot in result.screenshots:
+        print(f"  [{name}] ✓ {shot['step']} captured")
+    issues.extend(result.issues)
+    WIZARD_TIMINGS[name] = result.timings
+    AUDITS.update({f"{name}/wizard {label}": report for label, report in result.audits.items()})
+
+async def check_login(page, name, issues):
+    await page.goto(f"{PROD_URL}/auth/login", wait_until="networkidle")
+    await async_wait_for_ready(page)
+    await page.screenshot(path=f"{OUTPUT_DIR}/{name}_login.png")
+    print(f"  [{name}] ✓ Login page captured")
+
+    await check_layout(page, name, issues, "Login form layout")
+
+async def check_signup(page, name, issues):
+    await page.goto(f"{PROD_URL}/auth/signup", wait_until="networkidle")
+    await async_wait_for_ready(page)
+    await page.screenshot(path=f"{OUTPUT_DIR}/{name}_signup.png")
+    print(f"  [{name}] ✓ Signup page captured")
+
+    # Check the form doesn't overflow, clip or spill text
+    await check_layout(page, name, issues, "Signup form layout")
+
+def flow(check, label):
+    """Wrap a check so errors become issues (plus an error screenshot) and
+    the page it ends on is held to its route's performance budget."""
+    async def run(page, profile):
+        issues = []
+        try:
+            await install_vitals(page)
+            await check(page, profile.name, issues)
+            issues.extend(await BUDGETS.async_check(page, profile))
+        except Exception as e:
+            issues.append(f"Error: {str(e)}")
+            await page.screenshot(path=f"{OUTPUT_DIR}/{profile.name}_{label}_error.png")
+        return issues
+    return run
+
+FLOWS = [
+    ("wizard", flow(check_wizard, "wizard")),
+    ("login", flow(check_login, "login")),
+    ("signup", flow(check_signup, "signup")),
 ]
-
-def test_viewport(p, name, width, height):
-    print(f"\n{'='*50}")
-    print(f"Testing: {name} ({width}x{height})")
-    print("="*50)
-
-    browser = p.chromium.launch(headless=True)
-    context = browser.new_context(
-        viewport={"width": width, "height": height},
-        device_scale_factor=2,
-        is_mobile=True,
-        has_touch=True,
-    )
-    page = context.new_page()
-    page.set_default_timeout(20000)
-
-    issues = []
-
-    try:
-        # Test 1: Trip Creation Step 1
-        page.goto("https://monkeytravel.app/trips/new", wait_until="networkidle")
-        page.wait_for_timeout(1000)
-        page.screenshot(path=f"{OUTPUT_DIR}/{name}_step1.png")
-        print(f"  ✓ Step 1 captured")
-
-        # Check for horizontal overflow
-        scroll_width = page.evaluate("document.documentElement.scrollWidth")
-        viewport_width = page.evaluate("window.innerWidth")
-        if scroll_width > viewport_width + 5:
-            issues.append(f"Horizontal overflow detected: {scroll_width}px > {viewport_width}px")
-
-        # Select destination
-        tokyo = page.locator("button:has-text('Tokyo')").first
-        if tokyo.is_visible(timeout=3000):
-            tokyo.click()
-            page.wait_for_timeout(500)
-
-        # Continue to Step 2
-        continue_btn = page.locator("button:has-text('Continue')").first
-        if continue_btn.is_visible(timeout=3000) and continue_btn.is_enabled():
-            continue_btn.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/{name}_step2.png")
-            print(f"  ✓ Step 2 captured")
-
-            # Fill dates
-            date_inputs = page.locator("input[type='date']").all()
-            if len(date_inputs) >= 2:
-                date_inputs[0].fill("2025-02-01")
-                date_inputs[1].fill("2025-02-05")
-                page.wait_for_timeout(500)
-
-        # Continue to Step 3 (Vibes)
-        continue_btn = page.locator("button:has-text('Continue')").first
-        if continue_btn.is_visible(timeout=3000) and continue_btn.is_enabled():
-            continue_btn.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/{name}_step3_vibes.png")
-            print(f"  ✓ Step 3 (Vibes) captured")
-
-            # Check vibes selector isn't overflowing
-            scroll_width = page.evaluate("document.documentElement.scrollWidth")
-            if scroll_width > viewport_width + 5:
-                issues.append(f"Vibes selector overflow: {scroll_width}px")
-
-        # Test Auth pages
-        page.goto("https://monkeytravel.app/auth/login", wait_until="networkidle")
-        page.wait_for_timeout(800)
-        page.screenshot(path=f"{OUTPUT_DIR}/{name}_login.png")
-        print(f"  ✓ Login page captured")
-
-        page.goto("https://monkeytravel.app/auth/signup", wait_until="networkidle")
-        page.wait_for_timeout(800)
-        page.screenshot(path=f"{OUTPUT_DIR}/{name}_signup.png")
-        print(f"  ✓ Signup page captured")
-
-        # Check form doesn't overflow
-        scroll_width = page.evaluate("document.documentElement.scrollWidth")
-        if scroll_width > viewport_width + 5:
-            issues.append(f"Signup form overflow: {scroll_width}px")
-
-    except Exception as e:
-        issues.append(f"Error: {str(e)}")
-        page.screenshot(path=f"{OUTPUT_DIR}/{name}_error.png")
-
-    finally:
-        browser.close()
-
-    if issues:
-        print(f"\n  ⚠️ Issues found:")
-        for issue in issues:
-            print(f"     - {issue}")
-    else:
-        print(f"\n  ✓ No issues found!")
-
-    return issues
+# Route each flow (and its captures, by step name prefix) belongs to
+FLOW_ROUTES = {"wizard": "/trips/new", "login": "/auth/login", "signup": "/auth/signup"}
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int,
+                        help="viewport x flow jobs to run at once (default: one per job, up to the CPU count)")
+    add_throttle_arguments(parser)
+    args = parser.parse_args()
+
     print("="*60)
     print("FINAL MOBILE UI ANALYSIS")
     print("="*60)
+    print(f"Viewports: {', '.join(str(v) for v in VIEWPORTS)}")
+    print(f"Throttle: {args.throttle}")
 
-    all_issues = {}
+    started = time.time()
+    results = run_matrix(VIEWPORTS, FLOWS, concurrency=args.concurrency, timeout=20000,
+                         throttle=args.throttle)
 
-    with sync_playwright() as p:
-        for name, width, height in VIEWPORTS:
-            issues = test_viewport(p, name, width, height)
-            if issues:
-                all_issues[name] = issues
+    all_issues = {}
+    for result in results:
+        issues = result.value if result.ok else [f"Error: {result.error}"]
+        if issues:
+            all_issues.setdefault(result.profile.name, []).extend(issues)
 
     # Summary
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
 
+    print("\n⏱  Flow timings:")
+    for profile in VIEWPORTS:
+        timings = ", ".join(f"{r.flow} {r.duration:.1f}s" for r in results if r.profile is profile)
+        print(f"  {profile.name} ({describe(profile, args.throttle)}): {timings}")
+
     if all_issues:
         print("\n⚠️ Issues found on some viewports:")
         for viewport, issues in all_issues.items():
@@ -141,7 +144,10 @@ def main():
                 print(f"    - {issue}")
     else:
         print("\n✅ ALL VIEWPORTS PASSED!")
-        print("   No horizontal overflow or rendering issues detected.")
+        print("   No horizontal overflow, rendering or budget issues detected.")
+
+    audit_path = write_audits(AUDITS, f"{OUTPUT_DIR}/layout-audit.json")
+    print(f"\n📐 Layout audits: {audit_path}")
 
     # List screenshots
     print(f"\n📸 Screenshots saved to: {OUTPUT_DIR}")
@@ -150,5 +156,28 @@ def main():
         size = os.path.getsize(f"{OUTPUT_DIR}/{s}") // 1024
         print(f"   - {s} ({size}KB)")
 
+    # Dedupe this run's captures into the artifact store
+    store = ArtifactStore()
+    run = store.ingest_dir(OUTPUT_DIR, "test-mobile-final", [v.name for v in VIEWPORTS], since=started)
+    print_changes(store.changes(run))
+
+    with ResultsDB() as db:
+        run_id = db.begin_run("test-mobile-final", PROD_URL, args.throttle, started=started)
+        for result in results:
+            issues = result.value if result.ok else [f"Error: {result.error}"]
+            db.add_flow(run_id, result.profile.name, FLOW_ROUTES[result.flow], result.flow, result.duration,
+                        issues, WIZARD_TIMINGS.get(result.profile.name) if result.flow == "wizard" else None)
+        db.add_budget_measurements(run_id, BUDGETS.measurements)
+        db.add_artifact_run(run_id, run, lambda step: FLOW_ROUTES.get(step.split("_")[0], FLOW_ROUTES["wizard"]))
+        db.finish_run(run_id)
+    print(f"\n🗄  Results store run #{run_id}")
+
+    # Distinct console/page errors seen this run (totals are across runs)
+    print_ranked(ranked(ErrorIndex().load(), since=started), limit=10)
+
+    if BUDGETS.failures:
+        print(f"\n❌ {len(BUDGETS.failures)} performance budget violation(s)")
+    sys.exit(BUDGETS.exit_code)
+
 if __name__ == "__main__":
     main()
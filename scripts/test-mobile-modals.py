@@ -2,9 +2,48 @@
 """
 Mobile Modal Testing Script
 Tests all modals (Onboarding, Auth, EarlyAccess) on various mobile viewport sizes.
+
+Each viewport x flow pair runs as its own job on one shared browser.
+`--concurrency N` runs up to N jobs at once (default: all of them, up to the
+CPU count; 1 = one after another).
+`--network record` saves each job's traffic to a HAR; `--network replay`
+then runs the same jobs offline from those recordings.
+
+The wizard and the Generate -> Onboarding -> Auth walk are the shared
+mobile_harness/wizard.py flows.
+
+The onboarding_page job walks /onboarding from empty storage and
+checkpoints every step (mobile_harness/onboarding.py). Once the whole
+matrix has finished, a second pass reopens each step from those
+checkpoints and finishes the flow from there, checking that the page
+restores its progress. Checkpoints are cleared at the start of every run,
+so a resume never picks up an older run's state.
+
+`--trace` records a Chromium trace around each Continue click, vibe
+selection and the Generate click that opens the Onboarding modal. It
+prints the main-thread cost per step; raw traces go to OUTPUT_DIR/traces.
+
+`--soak N` runs the onboarding flow N times in one page per viewport
+instead of the matrix. Between iterations the wizard is left and
+re-entered through client-side navigation, so the heap is never reset.
+After each iteration it forces GC and samples heap size, DOM nodes, event
+listeners and detached nodes, then reports their growth per iteration.
+Heap snapshots of the first and last iteration go to OUTPUT_DIR/soak.
 """
 
-from playwright.sync_api import sync_playwright
+from mobile_harness import MODAL_VIEWPORTS, async_wait_for_ready, run_matrix
+from mobile_harness.artifact_store import ArtifactStore, print_changes
+from mobile_harness.checkpoints import CheckpointStore
+from mobile_harness.config import BASE_URL
+from mobile_harness.har import NetworkMode, add_network_arguments
+from mobile_harness.onboarding import STEP_CHECKPOINTS, async_run_onboarding
+from mobile_harness.page_errors import ErrorIndex, print_ranked, ranked
+from mobile_harness.soak import run_soak, soft_navigate
+from mobile_harness.throttling import add_throttle_arguments, describe
+from mobile_harness.tracing import StepProfiler
+from mobile_harness.wizard import GENERATE, WIZARD, async_run_wizard
+from dataclasses import replace
+import argparse
 import os
 import time
 
@@ -12,218 +51,81 @@ import time
 OUTPUT_DIR = "/tmp/mobile-modal-tests"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Mobile viewport configurations
-MOBILE_VIEWPORTS = {
-    "iphone_se": {"width": 375, "height": 667},
-    "iphone_12": {"width": 390, "height": 844},
-    "iphone_14_pro_max": {"width": 430, "height": 932},
-    "pixel_7": {"width": 412, "height": 915},
-    "galaxy_s21": {"width": 360, "height": 800},
-}
+# Mobile viewport configurations (see mobile_harness/devices.py)
+MOBILE_VIEWPORTS = MODAL_VIEWPORTS
+
+CHECKPOINTS = CheckpointStore("test-mobile-modals")
+# Set by --trace
+PROFILER = None
+# Cleared by --soak; N iterations would only overwrite the same files
+SCREENSHOTS = True
 
-def screenshot(page, name, viewport_name):
+async def screenshot(page, name, viewport_name):
     """Take a screenshot with a descriptive name"""
+    if not SCREENSHOTS:
+        return None
     path = f"{OUTPUT_DIR}/{viewport_name}_{name}.png"
-    page.screenshot(path=path)
+    await page.screenshot(path=path)
     print(f"  Screenshot: {path}")
     return path
 
-def test_trip_creation_page(page, viewport_name):
-    """Test the /trips/new page and its wizard steps"""
-    print(f"\n--- Testing Trip Creation Page ({viewport_name}) ---")
-
-    page.goto("http://localhost:3000/trips/new")
-    page.wait_for_load_state("networkidle")
-    time.sleep(0.5)
-
-    # Step 1: Destination
-    screenshot(page, "01_step1_destination", viewport_name)
-
-    # Enter destination
-    destination_input = page.locator("input[placeholder*='Paris']").first
-    if destination_input.is_visible():
-        destination_input.fill("Tokyo")
-        time.sleep(0.3)
-        screenshot(page, "02_step1_destination_filled", viewport_name)
-
-    # Click a popular destination chip
-    tokyo_chip = page.locator("button:has-text('Tokyo')").first
-    if tokyo_chip.is_visible():
-        tokyo_chip.click()
-        time.sleep(0.3)
-
-    # Click Continue
-    continue_btn = page.locator("button:has-text('Continue')").first
-    if continue_btn.is_visible():
-        continue_btn.click()
-        page.wait_for_timeout(500)
-
-    # Step 2: Dates
-    screenshot(page, "03_step2_dates", viewport_name)
-
-    # Select dates using the date picker
-    date_inputs = page.locator("input[type='date']").all()
-    if len(date_inputs) >= 2:
-        date_inputs[0].fill("2025-02-01")
-        date_inputs[1].fill("2025-02-05")
-        time.sleep(0.3)
-        screenshot(page, "04_step2_dates_selected", viewport_name)
-
-    # Click Continue
-    continue_btn = page.locator("button:has-text('Continue')").first
-    if continue_btn.is_visible():
-        continue_btn.click()
-        page.wait_for_timeout(500)
-
-    # Step 3: Vibes
-    screenshot(page, "05_step3_vibes", viewport_name)
-
-    # Select some vibes
-    vibe_buttons = page.locator("[class*='vibe'], button:has-text('Cultural'), button:has-text('Foodie')").all()
-    for i, btn in enumerate(vibe_buttons[:2]):
-        if btn.is_visible():
-            btn.click()
-            time.sleep(0.2)
-    screenshot(page, "06_step3_vibes_selected", viewport_name)
-
-    # Click Continue
-    continue_btn = page.locator("button:has-text('Continue')").first
-    if continue_btn.is_visible():
-        continue_btn.click()
-        page.wait_for_timeout(500)
-
-    # Step 4: Final details
-    screenshot(page, "07_step4_final_details", viewport_name)
-
-    # Scroll to see all options
-    page.evaluate("window.scrollBy(0, 300)")
-    time.sleep(0.3)
-    screenshot(page, "08_step4_final_details_scrolled", viewport_name)
-
-    return True
+def shots_dir():
+    return OUTPUT_DIR if SCREENSHOTS else None
 
-def test_onboarding_modal(page, viewport_name):
-    """Test the Onboarding Modal flow"""
-    print(f"\n--- Testing Onboarding Modal ({viewport_name}) ---")
-
-    # Clear localStorage to force onboarding
-    page.evaluate("localStorage.clear()")
-
-    page.goto("http://localhost:3000/trips/new")
-    page.wait_for_load_state("networkidle")
-    time.sleep(0.5)
-
-    # Fill in trip details to enable Generate button
-    # Destination
-    destination_input = page.locator("input[placeholder*='Paris']").first
-    if destination_input.is_visible():
-        destination_input.fill("Tokyo, Japan")
-        time.sleep(0.2)
-
-    # Select Tokyo chip
-    tokyo_chip = page.locator("button:has-text('Tokyo')").first
-    if tokyo_chip.is_visible():
-        tokyo_chip.click()
-        time.sleep(0.2)
-
-    # Navigate through steps
-    for _ in range(3):  # Click Continue 3 times to reach step 4
-        continue_btn = page.locator("button:has-text('Continue')").first
-        if continue_btn.is_visible() and continue_btn.is_enabled():
-            continue_btn.click()
-            page.wait_for_timeout(400)
-
-            # Check if we're on dates step - fill dates
-            date_inputs = page.locator("input[type='date']").all()
-            if len(date_inputs) >= 2:
-                date_inputs[0].fill("2025-02-01")
-                date_inputs[1].fill("2025-02-05")
-                time.sleep(0.2)
-
-            # Check if we're on vibes step - select vibes
-            vibe_options = page.locator("button").filter(has_text="Cultural").all()
-            if vibe_options:
-                for opt in vibe_options[:1]:
-                    opt.click()
-                    time.sleep(0.2)
-
-    # Now click Generate Itinerary to trigger Onboarding Modal
-    generate_btn = page.locator("button:has-text('Generate')").first
-    if generate_btn.is_visible():
-        generate_btn.click()
-        page.wait_for_timeout(800)
-
-        # Check if Onboarding Modal appeared
-        modal = page.locator("text=Personalize Your Trip").first
-        if modal.is_visible():
-            print("  Onboarding Modal opened!")
-            screenshot(page, "09_onboarding_step1", viewport_name)
-
-            # Step 1: Travel Style - select some options
-            style_buttons = page.locator("button").filter(has_text="Adventure").all()
-            for btn in style_buttons[:1]:
-                if btn.is_visible():
-                    btn.click()
-                    time.sleep(0.2)
-            screenshot(page, "10_onboarding_step1_selected", viewport_name)
-
-            # Click Next
-            next_btn = page.locator("button:has-text('Next')").first
-            if next_btn.is_visible():
-                next_btn.click()
-                page.wait_for_timeout(500)
-                screenshot(page, "11_onboarding_step2_dietary", viewport_name)
-
-            # Step 2: Dietary - click Next (optional)
-            next_btn = page.locator("button:has-text('Next')").first
-            if next_btn.is_visible():
-                next_btn.click()
-                page.wait_for_timeout(500)
-                screenshot(page, "12_onboarding_step3_accessibility", viewport_name)
-
-            # Step 3: Accessibility - click Next (optional)
-            next_btn = page.locator("button:has-text('Next')").first
-            if next_btn.is_visible():
-                next_btn.click()
-                page.wait_for_timeout(500)
-                screenshot(page, "13_onboarding_step4_active_hours", viewport_name)
-
-            # Step 4: Active Hours
-            # Scroll down if needed
-            page.evaluate("document.querySelector('[class*=modal]')?.scrollTo(0, 300)")
-            time.sleep(0.3)
-            screenshot(page, "14_onboarding_step4_scrolled", viewport_name)
-
-            # Click Create Account
-            create_btn = page.locator("button:has-text('Create Account')").first
-            if create_btn.is_visible():
-                create_btn.click()
-                page.wait_for_timeout(800)
-
-                # Auth Modal should appear
-                auth_modal = page.locator("text=Create Your Account").first
-                if auth_modal.is_visible():
-                    print("  Auth Modal opened!")
-                    screenshot(page, "15_auth_modal", viewport_name)
-        else:
-            # Maybe it went straight to Auth Modal
-            auth_modal = page.locator("text=Create Your Account, text=Sign up, text=Welcome").first
-            if auth_modal.is_visible():
-                print("  Auth Modal opened (skipped onboarding)")
-                screenshot(page, "15_auth_modal_direct", viewport_name)
+def report(result):
+    """Print a wizard flow's screenshots and issues"""
+    for shot in result.screenshots:
+        print(f"  Screenshot: {shot['path']}")
+    for issue in result.issues:
+        print(f"  Issue ({result.profile}): {issue}")
+    return result
 
-    return True
+async def test_trip_creation_page(page, profile):
+    """Test the /trips/new page and its wizard steps"""
+    print(f"\n--- Testing Trip Creation Page ({profile.name}) ---")
+    return report(await async_run_wizard(page, profile, "en", shots_dir(), profiler=PROFILER))
 
-def test_early_access_modal(page, viewport_name):
+async def test_onboarding_modal(page, profile):
+    """Test the Onboarding Modal flow"""
+    print(f"\n--- Testing Onboarding Modal ({profile.name}) ---")
+
+    # Each job runs in an isolated context, so localStorage starts empty
+    # and onboarding is forced without clearing it here.
+    await async_run_wizard(page, profile, "en", None, profiler=PROFILER)
+    return await walk_to_auth(page, profile)
+
+async def walk_to_auth(page, profile):
+    """From a filled-in wizard through the Onboarding modal to the Auth modal"""
+    return report(await async_run_wizard(page, profile, "en", shots_dir(), profiler=PROFILER, flow=GENERATE))
+
+async def test_onboarding_page(page, profile):
+    """Walk /onboarding from empty storage, checkpointing every step"""
+    print(f"\n--- Testing Onboarding Page ({profile.name}) ---")
+    return report(await async_run_onboarding(page, profile, "en", shots_dir(), profiler=PROFILER,
+                                             checkpoints=CHECKPOINTS))
+
+def resume_test(checkpoint):
+    """Reopen /onboarding from this run's `checkpoint` and finish the flow"""
+    async def test_onboarding_resume(page, profile):
+        print(f"\n--- Resuming Onboarding Page at {checkpoint} ({profile.name}) ---")
+        out_dir = f"{OUTPUT_DIR}/resumed/{checkpoint}" if SCREENSHOTS else None
+        result = await async_run_onboarding(page, profile, "en", out_dir, profiler=PROFILER,
+                                            checkpoints=CHECKPOINTS, resume=checkpoint)
+        if result.resumed:
+            print(f"  Resumed from {checkpoint} (saved {result.resumed['age']:.0f}s ago)")
+        return report(result)
+    return test_onboarding_resume
+
+async def test_early_access_modal(page, profile):
     """Test the Early Access Modal (Beta Code + Waitlist)"""
-    print(f"\n--- Testing Early Access Modal ({viewport_name}) ---")
+    print(f"\n--- Testing Early Access Modal ({profile.name}) ---")
 
     # We need to be logged in to trigger Early Access Modal
     # For now, let's just check the modal structure by navigating to a page that might show it
 
     # Simulate the modal by injecting it (since we can't easily trigger it without auth)
-    page.goto("http://localhost:3000/trips/new")
-    page.wait_for_load_state("networkidle")
+    await page.goto(f"{BASE_URL}/trips/new")
+    await page.wait_for_load_state("networkidle")
 
     # We can test the modal by examining the DOM structure from the component file
     # For visual testing, let's check the styling classes are applied correctly
@@ -241,44 +143,124 @@ def analyze_screenshots(viewport_name):
         print(f"    - {s}")
     return screenshots
 
+FLOWS = [
+    # Test 1: Trip Creation Wizard
+    ("trip_creation", test_trip_creation_page),
+    # Test 2: Onboarding Modal Flow
+    ("onboarding", test_onboarding_modal),
+    # Test 3: Onboarding page; seeds the checkpoints RESUMED reopens
+    ("onboarding_page", test_onboarding_page),
+    # Test 4: Early Access Modal
+    ("early_access", test_early_access_modal),
+]
+
+# Second pass, after every onboarding_page job has saved its checkpoints
+RESUMED = [(f"onboarding_page_from_{name}", resume_test(name)) for name in STEP_CHECKPOINTS]
+
+def as_job(test):
+    """Adapt a test(page, profile) to the runner; errors get a screenshot."""
+    async def run(page, profile):
+        try:
+            return await test(page, profile)
+        except Exception as e:
+            print(f"  Error ({profile.name}): {e}")
+            await screenshot(page, f"error_{test.__name__}", profile.name)
+            raise
+    return run
+
+# The wizard without its page load, so soak iterations keep the same heap
+IN_APP_WIZARD = replace(WIZARD, name="wizard_in_app",
+                        steps=tuple(step for step in WIZARD.steps if step.action != "goto"))
+
+def soak_job(iterations):
+    """Repeat the onboarding flow in one page, restarting the wizard in-app."""
+    async def iteration(page, profile, i):
+        if i == 1:
+            await page.goto(f"{BASE_URL}/trips/new")
+            await page.wait_for_load_state("networkidle")
+        else:
+            # Close the Auth modal, leave the wizard and come back without a reload
+            await page.keyboard.press("Escape")
+            await soft_navigate(page, "/")
+            await async_wait_for_ready(page)
+            await soft_navigate(page, "/trips/new")
+        await async_wait_for_ready(page)
+        await async_run_wizard(page, profile, "en", None, profiler=PROFILER, flow=IN_APP_WIZARD)
+        await walk_to_auth(page, profile)
+
+    async def run(page, profile):
+        report = await run_soak(
+            page, profile, lambda page, i: iteration(page, profile, i), iterations,
+            out_dir=f"{OUTPUT_DIR}/soak",
+            on_sample=lambda profile, s: print(
+                f"  [{profile.name}] iteration {s['iteration']}: heap {s['heap_used'] / 1e6:.1f}MB, "
+                f"{s['listeners']} listeners, {s['detached_nodes']} detached nodes"),
+        )
+        report.write()
+        return report
+    return run
+
 def main():
+    global PROFILER, SCREENSHOTS
+    parser = argparse.ArgumentParser(description="Mobile modal testing across MOBILE_VIEWPORTS")
+    parser.add_argument("--concurrency", type=int,
+                        help="viewport x flow jobs to run at once (default: one per job, up to the CPU count)")
+    parser.add_argument("--trace", action="store_true",
+                        help="trace Continue, vibe and Generate steps through CDP (see OUTPUT_DIR/traces)")
+    parser.add_argument("--soak", type=int, metavar="N",
+                        help="repeat the onboarding flow N times per viewport in one page and report heap growth")
+    add_network_arguments(parser)
+    add_throttle_arguments(parser)
+    args = parser.parse_args()
+    if args.trace:
+        PROFILER = StepProfiler(f"{OUTPUT_DIR}/traces")
+    network = NetworkMode.from_args(args, "test-mobile-modals")
+
     print("=" * 60)
     print("Mobile Modal Testing - Starting")
     print("=" * 60)
-
-    with sync_playwright() as p:
-        for viewport_name, viewport in MOBILE_VIEWPORTS.items():
-            print(f"\n{'='*60}")
-            print(f"Testing viewport: {viewport_name} ({viewport['width']}x{viewport['height']})")
-            print("=" * 60)
-
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                viewport=viewport,
-                device_scale_factor=2,  # Retina display
-                is_mobile=True,
-                has_touch=True,
-            )
-            page = context.new_page()
-
-            try:
-                # Test 1: Trip Creation Wizard
-                test_trip_creation_page(page, viewport_name)
-
-                # Test 2: Onboarding Modal Flow
-                test_onboarding_modal(page, viewport_name)
-
-                # Test 3: Early Access Modal
-                test_early_access_modal(page, viewport_name)
-
-                # Analyze screenshots
-                analyze_screenshots(viewport_name)
-
-            except Exception as e:
-                print(f"  Error: {e}")
-                screenshot(page, "error", viewport_name)
-            finally:
-                browser.close()
+    print(f"Viewports: {', '.join(str(v) for v in MOBILE_VIEWPORTS)}")
+    print(f"Network: {network.describe()}")
+    print(f"Throttle: {args.throttle}")
+
+    if args.soak:
+        SCREENSHOTS = False
+        results = run_matrix(
+            MOBILE_VIEWPORTS,
+            [("soak", soak_job(args.soak))],
+            concurrency=args.concurrency,
+            setup=None if network.live else network.job_setup,
+            throttle=args.throttle,
+        )
+        for result in results:
+            if result.ok:
+                result.value.print_summary()
+            else:
+                print(f"\n🧪 Soak {result.profile.name}: error: {result.error}")
+        return
+
+    started = time.time()
+    CHECKPOINTS.clear()
+    results = []
+    for flows in (FLOWS, RESUMED):
+        results += run_matrix(
+            MOBILE_VIEWPORTS,
+            [(name, as_job(test)) for name, test in flows],
+            concurrency=args.concurrency,
+            setup=None if network.live else network.job_setup,
+            throttle=args.throttle,
+        )
+
+    for profile in MOBILE_VIEWPORTS:
+        print(f"\n{'='*60}")
+        print(f"Viewport: {profile} — {describe(profile, args.throttle)}")
+        print("=" * 60)
+        for result in results:
+            if result.profile is profile:
+                status = "ok" if result.ok else f"error: {result.error}"
+                print(f"  {result.flow}: {status} ({result.duration:.1f}s)")
+        # Analyze screenshots
+        analyze_screenshots(profile.name)
 
     print("\n" + "=" * 60)
     print("Testing Complete!")
@@ -290,5 +272,17 @@ def main():
     for f in sorted(os.listdir(OUTPUT_DIR)):
         print(f"  {f}")
 
+    if PROFILER and PROFILER.summaries:
+        PROFILER.print_summary()
+        print(f"  summary: {PROFILER.write()}")
+
+    # Dedupe this run's captures into the artifact store
+    store = ArtifactStore()
+    run = store.ingest_dir(OUTPUT_DIR, "test-mobile-modals", [v.name for v in MOBILE_VIEWPORTS], since=started)
+    print_changes(store.changes(run))
+
+    # Distinct console/page errors seen this run (totals are across runs)
+    print_ranked(ranked(ErrorIndex().load(), since=started), limit=10)
+
 if __name__ == "__main__":
     main()
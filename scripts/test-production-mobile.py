@@ -2,204 +2,155 @@
 """
 Production Mobile UI Testing Script
 Tests the mobile UI of monkeytravel.app modals.
+
+The wizard and Generate walks are the shared mobile_harness/wizard.py
+flows. Every captured page, and the end of each flow, also samples Core Web Vitals (LCP, CLS, INP, FCP,
+TTFB) plus navigation/resource timing; the run writes them, with
+per-viewport p50/p75/p95, to vitals.json next to the screenshots.
+`--throttle device` runs each viewport with its device's CPU slowdown and
+network profile (CDP emulation), so the numbers match real phones.
+
+    python3 scripts/test-production-mobile.py [--viewports iphone_se,iphone_14] [--throttle device]
+
+Vitals, flow timings and screenshot hashes also go into the results store,
+for trends across runs (`mobile-harness.py results trend lcp --route /trips/new`).
 """
 
-from playwright.sync_api import sync_playwright
+from mobile_harness import BrowserPool, IPHONE_14, find_profile, wait_for_ready
+from mobile_harness.artifact_store import file_hash
+from mobile_harness.config import PROD_URL
+from mobile_harness.page_errors import route_of
+from mobile_harness.results_db import ResultsDB
+from mobile_harness.throttling import add_throttle_arguments, describe
+from mobile_harness.vitals import VitalsReport, install_vitals
+from mobile_harness.wizard import GENERATE, WIZARD, run_wizard
+import argparse
 import os
+import time
 
 OUTPUT_DIR = "/tmp/mobile-tests-prod"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+def run_flow(page, profile, out_dir, vitals):
+    """Homepage, the shared wizard and Generate flows, then the auth pages.
+
+    Returns the page captures as (route, step, path) and the flow results as
+    (route, FlowResult)."""
+    captures, flows = [], []
+
+    def capture(step, full_page=False):
+        path = f"{out_dir}/{profile.name}_{step}.png"
+        page.screenshot(path=path, full_page=full_page)
+        vitals.sample(page, profile, step)
+        captures.append((route_of(page.url), step, path))
+
+    def walk(flow):
+        result = run_wizard(page, profile, "en", out_dir, base_url=PROD_URL, flow=flow)
+        vitals.sample(page, profile, flow.name)
+        flows.append((route_of(page.url), result))
+        for shot in result.screenshots:
+            print(f"   {shot['step']} screenshot saved")
+        for issue in result.issues:
+            print(f"   ⚠️  {issue}")
+
+    # Test 1: Homepage
+    print("\n1. Testing Homepage...")
+    page.goto(PROD_URL, wait_until="networkidle")
+    wait_for_ready(page)
+    capture("01_homepage", full_page=True)
+    print("   Homepage screenshot saved")
+
+    # Test 2: Trip Creation wizard (mobile_harness/wizard.py)
+    print("\n2. Testing Trip Creation Page...")
+    walk(WIZARD)
+
+    # Test 3: Generate -> Onboarding Modal -> Auth Modal
+    print("\n3. Testing Onboarding Modal...")
+    page.evaluate("localStorage.clear()")
+    walk(GENERATE)
+
+    # Test 4: Login page
+    print("\n4. Testing Login Page...")
+    page.goto(f"{PROD_URL}/auth/login", wait_until="networkidle")
+    wait_for_ready(page)
+    capture("11_login_page")
+    print("   Login page screenshot saved")
+
+    # Test 5: Signup page
+    print("\n5. Testing Signup Page...")
+    page.goto(f"{PROD_URL}/auth/signup", wait_until="networkidle")
+    wait_for_ready(page)
+    capture("12_signup_page")
+    print("   Signup page screenshot saved")
+    return captures, flows
+
 def main():
+    parser = argparse.ArgumentParser(description="Production mobile UI + Web Vitals run")
+    parser.add_argument("--viewports", default=IPHONE_14.name,
+                        help="comma-separated device profiles (default: iphone_14)")
+    add_throttle_arguments(parser)
+    args = parser.parse_args()
+    profiles = [find_profile(name.strip()) for name in args.viewports.split(",")]
+
     print("Starting Production Mobile UI Tests...")
-    print("Testing: https://monkeytravel.app")
-
-    # iPhone 14 Pro viewport
-    viewport = {"width": 390, "height": 844}
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            viewport=viewport,
-            device_scale_factor=2,
-            is_mobile=True,
-            has_touch=True,
-        )
-        page = context.new_page()
-        page.set_default_timeout(30000)
-
-        try:
-            # Test 1: Homepage
-            print("\n1. Testing Homepage...")
-            page.goto("https://monkeytravel.app", wait_until="networkidle")
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/01_homepage.png", full_page=True)
-            print("   Homepage screenshot saved")
-
-            # Test 2: Trip Creation Page
-            print("\n2. Testing Trip Creation Page - Step 1 (Destination)...")
-            page.goto("https://monkeytravel.app/trips/new", wait_until="networkidle")
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/02_step1_destination.png")
-            print("   Step 1 screenshot saved")
-
-            # Select Tokyo destination
-            tokyo_btn = page.locator("button:has-text('Tokyo')").first
-            if tokyo_btn.is_visible(timeout=5000):
-                tokyo_btn.click()
-                page.wait_for_timeout(500)
-
-            # Check Continue button
-            continue_btn = page.locator("button:has-text('Continue')").first
-            if continue_btn.is_visible(timeout=5000) and continue_btn.is_enabled():
-                continue_btn.click()
-                page.wait_for_timeout(1500)
-                page.screenshot(path=f"{OUTPUT_DIR}/03_step2_dates.png")
-                print("   Step 2 (Dates) screenshot saved")
-
-                # Fill dates
-                date_inputs = page.locator("input[type='date']").all()
-                if len(date_inputs) >= 2:
-                    date_inputs[0].fill("2025-02-01")
-                    date_inputs[1].fill("2025-02-05")
-                    page.wait_for_timeout(500)
-                    page.screenshot(path=f"{OUTPUT_DIR}/03b_step2_dates_filled.png")
-                    print("   Step 2 (Dates filled) screenshot saved")
-
-            # Continue to Step 3
-            continue_btn = page.locator("button:has-text('Continue')").first
-            if continue_btn.is_visible(timeout=5000) and continue_btn.is_enabled():
-                continue_btn.click()
-                page.wait_for_timeout(1500)
-                page.screenshot(path=f"{OUTPUT_DIR}/04_step3_vibes.png")
-                print("   Step 3 (Vibes) screenshot saved")
-
-            # Select some vibes
-            vibe_btns = page.locator("button").all()
-            selected_vibes = 0
-            for btn in vibe_btns:
+    print(f"Testing: {PROD_URL}")
+
+    vitals = VitalsReport(PROD_URL, throttle=args.throttle)
+    timings = {}
+    runs = {}
+    run_started = time.time()
+    with BrowserPool(profiles, throttle=args.throttle) as pool:
+        for profile in profiles:
+            print(f"\n=== {profile} — {describe(profile, args.throttle)} ===")
+            install_vitals(pool.context(profile))
+            out_dir = OUTPUT_DIR if len(profiles) == 1 else f"{OUTPUT_DIR}/{profile.name}"
+            os.makedirs(out_dir, exist_ok=True)
+            started = time.perf_counter()
+            with pool.page(profile, timeout=30000) as page:
                 try:
-                    text = btn.text_content() or ""
-                    if any(v in text for v in ["Cultural", "Adventure", "Foodie"]):
-                        if btn.is_visible() and btn.is_enabled():
-                            btn.click()
-                            page.wait_for_timeout(300)
-                            selected_vibes += 1
-                            if selected_vibes >= 2:
-                                break
-                except:
-                    continue
-
-            page.screenshot(path=f"{OUTPUT_DIR}/04b_step3_vibes_selected.png")
-            print("   Step 3 (Vibes selected) screenshot saved")
-
-            # Continue to Step 4
-            continue_btn = page.locator("button:has-text('Continue')").first
-            if continue_btn.is_visible(timeout=5000) and continue_btn.is_enabled():
-                continue_btn.click()
-                page.wait_for_timeout(1500)
-                page.screenshot(path=f"{OUTPUT_DIR}/05_step4_final.png")
-                print("   Step 4 (Final details) screenshot saved")
-
-                # Scroll to see budget options
-                page.evaluate("window.scrollBy(0, 300)")
-                page.wait_for_timeout(500)
-                page.screenshot(path=f"{OUTPUT_DIR}/05b_step4_scrolled.png")
-                print("   Step 4 (Scrolled) screenshot saved")
-
-            # Test 3: Trigger Onboarding Modal
-            print("\n3. Testing Onboarding Modal...")
-            page.evaluate("localStorage.clear()")
-            page.wait_for_timeout(500)
-
-            generate_btn = page.locator("button:has-text('Generate')").first
-            if generate_btn.is_visible(timeout=5000):
-                generate_btn.click()
-                page.wait_for_timeout(2000)
-
-                # Check for Onboarding Modal
-                onboarding_visible = page.locator("text=Personalize Your Trip").is_visible(timeout=3000)
-                if onboarding_visible:
-                    page.screenshot(path=f"{OUTPUT_DIR}/06_onboarding_step1.png")
-                    print("   Onboarding Step 1 (Travel Style) screenshot saved")
-
-                    # Select travel style
-                    adventure_btn = page.locator("button:has-text('Adventure')").first
-                    if adventure_btn.is_visible(timeout=2000):
-                        adventure_btn.click()
-                        page.wait_for_timeout(500)
-
-                    # Click Next
-                    next_btn = page.locator("button:has-text('Next')").first
-                    if next_btn.is_visible(timeout=2000):
-                        next_btn.click()
-                        page.wait_for_timeout(1000)
-                        page.screenshot(path=f"{OUTPUT_DIR}/07_onboarding_step2.png")
-                        print("   Onboarding Step 2 (Dietary) screenshot saved")
-
-                        next_btn = page.locator("button:has-text('Next')").first
-                        if next_btn.is_visible(timeout=2000):
-                            next_btn.click()
-                            page.wait_for_timeout(1000)
-                            page.screenshot(path=f"{OUTPUT_DIR}/08_onboarding_step3.png")
-                            print("   Onboarding Step 3 (Accessibility) screenshot saved")
-
-                            next_btn = page.locator("button:has-text('Next')").first
-                            if next_btn.is_visible(timeout=2000):
-                                next_btn.click()
-                                page.wait_for_timeout(1000)
-                                page.screenshot(path=f"{OUTPUT_DIR}/09_onboarding_step4.png")
-                                print("   Onboarding Step 4 (Active Hours) screenshot saved")
-
-                                # Click Create Account
-                                create_btn = page.locator("button:has-text('Create Account')").first
-                                if create_btn.is_visible(timeout=2000):
-                                    create_btn.click()
-                                    page.wait_for_timeout(1500)
-                                    page.screenshot(path=f"{OUTPUT_DIR}/10_auth_modal.png")
-                                    print("   Auth Modal screenshot saved")
-                else:
-                    # Check for Auth Modal directly
-                    auth_visible = page.locator("text=Create Your Account").is_visible(timeout=2000)
-                    if auth_visible:
-                        page.screenshot(path=f"{OUTPUT_DIR}/06_auth_modal_direct.png")
-                        print("   Auth Modal (direct) screenshot saved")
-                    else:
-                        page.screenshot(path=f"{OUTPUT_DIR}/06_post_generate.png")
-                        print("   Post-generate state screenshot saved")
-
-            # Test 4: Login page
-            print("\n4. Testing Login Page...")
-            page.goto("https://monkeytravel.app/auth/login", wait_until="networkidle")
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/11_login_page.png")
-            print("   Login page screenshot saved")
-
-            # Test 5: Signup page
-            print("\n5. Testing Signup Page...")
-            page.goto("https://monkeytravel.app/auth/signup", wait_until="networkidle")
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{OUTPUT_DIR}/12_signup_page.png")
-            print("   Signup page screenshot saved")
-
-            print("\n" + "="*60)
-            print("MOBILE UI TEST COMPLETE!")
-            print("="*60)
-            print(f"\nScreenshots saved to: {OUTPUT_DIR}")
-
-            # List all screenshots
-            screenshots = sorted(os.listdir(OUTPUT_DIR))
-            print(f"\nGenerated {len(screenshots)} screenshots:")
-            for s in screenshots:
-                size = os.path.getsize(f"{OUTPUT_DIR}/{s}") // 1024
-                print(f"  - {s} ({size}KB)")
-
-        except Exception as e:
-            print(f"\nError: {e}")
-            page.screenshot(path=f"{OUTPUT_DIR}/error_state.png")
-            raise
-        finally:
-            browser.close()
+                    runs[profile.name] = run_flow(page, profile, out_dir, vitals)
+                    timings[profile.name] = time.perf_counter() - started
+                except Exception as e:
+                    print(f"\nError: {e}")
+                    page.screenshot(path=f"{out_dir}/error_state.png")
+                    raise
+
+    print("\n" + "="*60)
+    print("MOBILE UI TEST COMPLETE!")
+    print("="*60)
+    print(f"\nScreenshots saved to: {OUTPUT_DIR}")
+
+    # List all screenshots
+    screenshots = sorted(
+        os.path.relpath(os.path.join(root, f), OUTPUT_DIR)
+        for root, _, files in os.walk(OUTPUT_DIR) for f in files if f.endswith(".png")
+    )
+    print(f"\nGenerated {len(screenshots)} screenshots:")
+    for s in screenshots:
+        size = os.path.getsize(f"{OUTPUT_DIR}/{s}") // 1024
+        print(f"  - {s} ({size}KB)")
+
+    report_path = vitals.write(f"{OUTPUT_DIR}/vitals.json")
+    print(f"\nWeb Vitals ({len(vitals.samples)} samples) -> {report_path}")
+    vitals.print_summary()
+
+    print("\nFlow timings:")
+    for profile in profiles:
+        print(f"  {profile.name} ({describe(profile, args.throttle)}): {timings[profile.name]:.1f}s")
+
+    with ResultsDB() as db:
+        run_id = db.begin_run("test-production-mobile", PROD_URL, args.throttle, started=run_started)
+        db.add_vitals(run_id, vitals.samples)
+        for profile in profiles:
+            db.add_flow(run_id, profile.name, None, "production", timings[profile.name])
+            captures, flows = runs[profile.name]
+            for route, step, path in captures:
+                db.add_screenshot(run_id, profile.name, route, step, file_hash(path))
+            for route, result in flows:
+                hashes = {s["path"]: file_hash(s["path"]) for s in result.screenshots}
+                db.add_flow_result(run_id, result, route, hashes)
+        db.finish_run(run_id)
+    print(f"\nResults store run #{run_id}")
 
 if __name__ == "__main__":
     main()
@@ -6,17 +6,33 @@ Continue button is reachable (regression check for commit
 What it does:
   1. iPhone 14 Pro viewport + UA
   2. Goto /trips/new (forces en locale)
-  3. Click a popular destination pill ("Paris, France")
-  4. Pick start + end dates via the date input fields
+  3. Click a popular destination pill ("Tokyo")
+  4. Pick start + end dates in the DateRangePicker
+     (steps 2-4 are the shared wizard.WIZARD_STEP1 flow)
   5. Verify the Continue button is visible AND clickable AND not occluded
   6. Click Continue, verify step 2 loads (vibes selector visible)
   7. Take screenshots at each step
 
 Runs against an already-running dev server on http://localhost:3000.
+`--network record` saves the run's traffic to a HAR; `--network replay`
+reruns it offline from that recording, no dev server needed.
+Full-page DPR-3 screenshots are encoded and written on a background thread;
+`--format webp` stores them losslessly compressed and `--review-width 600`
+adds downscaled review copies. `--trace` records a Chromium trace around
+the Continue click and prints its main-thread cost (long tasks, scripting,
+style/layout, paint).
 """
-from playwright.sync_api import sync_playwright, expect
+from playwright.sync_api import expect
+from mobile_harness import IPHONE_14_PRO_SAFARI, open_page, wait_for_ready
+from mobile_harness.har import NetworkMode, add_network_arguments
+from mobile_harness.page_errors import track_errors
+from mobile_harness.screenshot_writer import ScreenshotWriter, add_screenshot_arguments, writer_from_args
+from mobile_harness.tap_targets import analyze_taps, hit_test, tap_issues
+from mobile_harness.tracing import StepProfiler
+from mobile_harness.wizard import WIZARD_STEP1, run_wizard
+import argparse
+import contextlib
 import sys
-import datetime
 
 BASE = "http://localhost:3002"
 SCREENSHOTS = "/tmp/wizard-test"
@@ -28,152 +44,114 @@ def step(label):
     print(f"\n=== {label} ===", flush=True)
 
 
+# Replaced in main() from the command-line flags
+WRITER = ScreenshotWriter()
+PROFILER = None
+
+
 def shot(page, name):
-    path = f"{SCREENSHOTS}/{name}.png"
-    page.screenshot(path=path, full_page=True)
+    # Capture now; encoding and the disk write happen off the main thread
+    path = WRITER.capture(page, f"{SCREENSHOTS}/{name}.png", full_page=True)
     print(f"  📷 {path}", flush=True)
 
 
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        # iPhone 14 Pro: 393x852 logical, DPR 3, mobile UA
-        ctx = browser.new_context(
-            viewport={"width": 393, "height": 852},
-            device_scale_factor=3,
-            is_mobile=True,
-            has_touch=True,
-            user_agent=(
-                "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) "
-                "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 "
-                "Mobile/15E148 Safari/604.1"
-            ),
-        )
-        page = ctx.new_page()
-        # Capture console errors so we know if the page is healthy.
-        errors = []
-        page.on("pageerror", lambda exc: errors.append(("pageerror", str(exc))))
-        page.on("console", lambda msg: errors.append(("console-error", msg.text))
-                if msg.type == "error" else None)
-
-        step("1. Navigate to /trips/new")
-        page.goto(f"{BASE}/trips/new", wait_until="domcontentloaded")
-        page.wait_for_load_state("networkidle", timeout=30000)
-        shot(page, "01-initial")
-
-        step("1b. Dismiss cookie banner if present")
-        cookie_btn = page.get_by_role("button", name="Accept All")
-        if cookie_btn.count() > 0 and cookie_btn.first.is_visible():
-            print("  cookie banner present — accepting")
-            cookie_btn.first.click()
-            page.wait_for_timeout(500)
-            shot(page, "01b-cookie-dismissed")
-        else:
-            print("  no cookie banner")
+def traced(page, label):
+    # Chromium trace around one step when --trace is on
+    if PROFILER is None:
+        return contextlib.nullcontext()
+    return PROFILER.step(page, IPHONE_14_PRO_SAFARI.name, label)
 
-        step("1c. Close the autocomplete dropdown (autoFocus opens it)")
-        # Click on the page header to defocus the autocomplete input.
-        page.get_by_text("Where and when?", exact=True).click()
-        page.wait_for_timeout(300)
-        shot(page, "01c-dropdown-closed")
 
-        # Detect if redirected to /auth/signup (wizard requires no auth for step 1
-        # but maybe auth check redirects us). The wizard auth check is in
-        # handleGenerate, NOT on page load — so we should always see step 1.
+def main():
+    global WRITER, PROFILER
+    parser = argparse.ArgumentParser(description="Wizard Continue-button smoke test")
+    add_network_arguments(parser)
+    add_screenshot_arguments(parser)
+    parser.add_argument("--trace", action="store_true",
+                        help="trace the Continue click; raw trace + summary in SCREENSHOTS/traces")
+    args = parser.parse_args()
+    network = NetworkMode.from_args(args, "test-wizard-mobile")
+    print(f"Network: {network.describe()}")
+    WRITER = writer_from_args(args)
+    if args.trace:
+        PROFILER = StepProfiler(f"{SCREENSHOTS}/traces")
+    try:
+        with WRITER:
+            run(network)
+    finally:
+        if PROFILER and PROFILER.summaries:
+            PROFILER.print_summary()
+            print(f"  summary: {PROFILER.write()}")
+
+
+def run(network):
+    # iPhone 14 Pro: 393x852 logical, DPR 3, mobile Safari UA
+    setup = network.setup(IPHONE_14_PRO_SAFARI.name, "wizard")
+    with open_page(IPHONE_14_PRO_SAFARI, setup=setup) as page:
+        # The pool records console/page errors and failed requests for every
+        # page (mobile-harness.py errors); this run's are listed at the end.
+        errors = track_errors(page).events
+
+        # Destination pill, DateRangePicker dates, cookie banner and the
+        # autocomplete dropdown: the shared wizard steps (mobile_harness/wizard.py)
+        step("1-4. /trips/new: destination + dates (wizard.WIZARD_STEP1)")
+        result = run_wizard(page, IPHONE_14_PRO_SAFARI, "en", SCREENSHOTS, base_url=BASE,
+                            flow=WIZARD_STEP1, writer=WRITER)
+        for taken in result.screenshots:
+            print(f"  📷 {taken['path']}", flush=True)
+        for issue in result.issues:
+            print(f"  ⚠️  {issue}")
+
+        # The wizard auth check is in handleGenerate, NOT on page load — so we
+        # should always see step 1.
         if "/auth" in page.url:
             print(f"  ❌ unexpectedly redirected to {page.url}")
             sys.exit(1)
         print(f"  url: {page.url}")
 
-        step("2. Verify step 1 is visible — 'Where and when?' header")
-        heading = page.get_by_text("Where and when?", exact=True).first
-        expect(heading).to_be_visible(timeout=10000)
-
-        step("3. Click 'Paris, France' popular pill")
-        paris = page.get_by_role("button", name="🇫🇷 Paris, France")
-        expect(paris).to_be_visible(timeout=5000)
-        paris.click()
-        shot(page, "02-destination-picked")
-
-        step("4. Pick travel dates via custom DateRangePicker")
-        # Open check-in picker
-        checkin_btn = page.get_by_role("button").filter(has_text="Check-in")
-        expect(checkin_btn).to_be_visible(timeout=5000)
-        checkin_btn.click()
-        page.wait_for_timeout(400)
-        shot(page, "03a-checkin-open")
-
-        # Pick a start date — today + 7 days, must be in current calendar view.
-        # Day buttons in the calendar grid are <button> elements containing
-        # just the day number (1-31). Filter by exact text + visible.
-        today = datetime.date.today()
-        start = today + datetime.timedelta(days=7)
-        end = today + datetime.timedelta(days=11)
-        # The calendar is open; day buttons are h-10 w-full rounded-lg.
-        # Pick the start day. Use exact-match to avoid matching '1' vs '11'.
-        # Calendar buttons render the day with optional Start/End label.
-        # We target the visible day cell with a specific class signature.
-        start_cell = page.locator(
-            "button.h-10.w-full.rounded-lg",
-        ).filter(has_text=str(start.day)).first
-        start_cell.click()
-        page.wait_for_timeout(300)
-        shot(page, "03b-start-picked")
-
-        # End date click — calendar should auto-switch to end-date mode.
-        end_cell = page.locator(
-            "button.h-10.w-full.rounded-lg",
-        ).filter(has_text=str(end.day)).first
-        end_cell.click()
-        page.wait_for_timeout(400)
-        shot(page, "03c-dates-picked")
-
         step("5. CRITICAL — Continue button must be visible AND not occluded")
-        continue_btn = page.get_by_role("button", name="Continue →")
+        labels = WIZARD_STEP1.resolve_labels("en")
+        continue_btn = WIZARD_STEP1.targets["continue"].locator(page, labels).first
         expect(continue_btn).to_be_visible(timeout=5000)
+        # Disabled until both a destination and dates are picked
+        expect(continue_btn).to_be_enabled(timeout=5000)
 
-        box = continue_btn.bounding_box()
-        if not box:
-            print("  ❌ Continue button has no bounding box (off-screen?)")
-            shot(page, "ERROR-no-bbox")
+        # The bug we fixed: MobileBottomNav (z-50) was covering Continue (z-40).
+        # Hit-test the control the wizard's Continue locator finds, covered or
+        # not; a tap lands on its centre, so that point must reach it.
+        hit = hit_test(continue_btn)
+        if hit is None:
+            print("  ❌ Continue button not found inside the viewport (off-screen?)")
+            shot(page, "ERROR-not-in-viewport")
             sys.exit(1)
-        print(f"  Continue button bbox: x={box['x']:.0f} y={box['y']:.0f} "
-              f"w={box['width']:.0f} h={box['height']:.0f}")
-        center_x = box["x"] + box["width"] / 2
-        center_y = box["y"] + box["height"] / 2
+        x, y, w, h = hit["rect"]
         viewport = page.viewport_size
+        print(f"  Continue button: {hit['selector']} at x={x} y={y} w={w} h={h}")
         print(f"  viewport: {viewport['width']}x{viewport['height']}")
-        print(f"  center:   {center_x:.0f},{center_y:.0f}")
-
-        # The bug we fixed: MobileBottomNav (z-50) was covering Continue (z-40).
-        # Confirm by hitting the center point and seeing what element is on top.
-        topmost = page.evaluate(
-            """([x, y]) => {
-              const el = document.elementFromPoint(x, y);
-              if (!el) return null;
-              return {
-                tag: el.tagName,
-                text: (el.innerText || '').slice(0, 60),
-                classes: el.className?.toString?.() || '',
-                role: el.getAttribute('role'),
-              };
-            }""",
-            [center_x, center_y],
-        )
-        print(f"  element at button center: {topmost}")
-
-        # Sanity: the topmost element at the Continue's center should be the
-        # button itself, an SVG inside it, or the inner text node.
-        if not topmost:
-            print("  ❌ no element at button center — completely occluded")
+        print(f"  center:   {x + w / 2:.0f},{y + h / 2:.0f}")
+        if hit["centre_blocked"] or hit["fully"]:
+            print(f"  ❌ Continue is covered by {hit['by']} "
+                  f"({hit['by_position']}, z-index {hit['by_z']}; "
+                  f"{hit['blocked_points']}/5 sample points, centre blocked: {hit['centre_blocked']})")
             shot(page, "ERROR-occluded")
             sys.exit(1)
-        if topmost["tag"] not in ("BUTTON", "SVG", "PATH", "SPAN", "DIV"):
-            print(f"  ⚠️  topmost is {topmost['tag']} — possibly still covered")
+        if hit["blocked_points"]:
+            print(f"  ⚠️  Continue corners partly covered by {hit['by']} "
+                  f"({hit['blocked_points']}/5 sample points)")
+        else:
+            print("  ✅ Continue is not occluded")
+
+        # Every other control on screen, in one pass
+        taps = analyze_taps(page)
+        print(f"  hit-tested {taps['checked']} controls: "
+              f"{len(taps['covered'])} covered, {len(taps['small'])} under {taps['min_px']}px")
+        for issue in tap_issues(taps, "step 1"):
+            print(f"  ⚠️  {issue}")
 
         step("6. Click Continue → expect step 2 (vibes)")
-        continue_btn.click()
-        page.wait_for_timeout(1000)
+        with traced(page, "continue to step 2"):
+            continue_btn.click()
+            wait_for_ready(page)
         shot(page, "04-step-2")
 
         # Step 2 should show vibes selector
@@ -199,7 +177,6 @@ def main():
         else:
             print("  none ✅")
 
-        browser.close()
         print("\n=== ALL CHECKS PASSED ===")
 
 
@@ -1,22 +1,17 @@
 #!/usr/bin/env python3
 """Verify landing page screenshots."""
 
-from playwright.sync_api import sync_playwright
+from mobile_harness import DESKTOP, open_page, wait_for_ready
+from mobile_harness.config import HARNESS_HOME
+from mobile_harness.image_audit import ImageAudit
 
 OUTPUT_DIR = "/mnt/c/Users/Samsung/Documents/Projects/travel-app-web/public/screenshots"
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
-
-    context = browser.new_context(
-        viewport={"width": 1440, "height": 900},
-        device_scale_factor=2
-    )
-    page = context.new_page()
-
+with open_page(DESKTOP) as page:
+    images = ImageAudit(page, DESKTOP)
     print("Loading landing page...")
     page.goto("http://localhost:3000", wait_until="networkidle")
-    page.wait_for_timeout(5000)
+    wait_for_ready(page)
 
     page.screenshot(path=f"{OUTPUT_DIR}/final-hero.png", full_page=False)
     print("  Saved: final-hero.png")
@@ -35,5 +30,9 @@ with sync_playwright() as p:
         status = "OK" if img['loaded'] and img['height'] > 0 else "FAILED"
         print(f"    {i}: {status} - {img['src'][:60]}...")
 
-    browser.close()
+    # Bytes, format and intrinsic vs rendered size for every image
+    images.audit()
+    images.print_summary()
+    print(f"  Report: {images.write(str(HARNESS_HOME / 'image-audit' / 'verify-landing-final.json'))}")
+
     print("\nDone!")
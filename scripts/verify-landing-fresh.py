@@ -1,26 +1,24 @@
 #!/usr/bin/env python3
 """Verify landing page with fresh browser context."""
 
-from playwright.sync_api import sync_playwright
+from dataclasses import replace
 
-OUTPUT_DIR = "/mnt/c/Users/Samsung/Documents/Projects/travel-app-web/public/screenshots"
+from mobile_harness import DESKTOP, open_page, wait_for_ready
+from mobile_harness.config import HARNESS_HOME
+from mobile_harness.image_audit import ImageAudit
 
-with sync_playwright() as p:
-    browser = p.chromium.launch(headless=True)
+OUTPUT_DIR = "/mnt/c/Users/Samsung/Documents/Projects/travel-app-web/public/screenshots"
 
-    # Fresh context with no caching
-    context = browser.new_context(
-        viewport={"width": 1440, "height": 900},
-        device_scale_factor=2,
-        bypass_csp=True
-    )
-    page = context.new_page()
+# Fresh context with no caching
+FRESH_DESKTOP = replace(DESKTOP, name="desktop_fresh", context_overrides={"bypass_csp": True})
 
+with open_page(FRESH_DESKTOP) as page:
+    images = ImageAudit(page, FRESH_DESKTOP)
     print("Capturing fresh landing page...")
     # Hard refresh
     page.goto("http://localhost:3000", wait_until="networkidle")
     page.reload(wait_until="networkidle")
-    page.wait_for_timeout(3000)  # Wait for images to load
+    wait_for_ready(page)  # Images decoded, layout stable
 
     # Check for image errors
     errors = page.evaluate("""() => {
@@ -34,6 +32,7 @@ with sync_playwright() as p:
         return errors;
     }""")
     print(f"Image load errors: {errors}")
+    images.audit()
 
     page.screenshot(path=f"{OUTPUT_DIR}/landing-fresh.png", full_page=False)
     print("  Saved: landing-fresh.png")
@@ -41,9 +40,12 @@ with sync_playwright() as p:
     # Scroll to app preview section (phones)
     print("Looking for phone preview section...")
     page.evaluate("window.scrollTo(0, 3500)")
-    page.wait_for_timeout(1000)
+    wait_for_ready(page)
     page.screenshot(path=f"{OUTPUT_DIR}/landing-phones-section.png", full_page=False)
     print("  Saved: landing-phones-section.png")
+    images.audit()  # lazy images below the fold are loaded now
+
+    images.print_summary()
+    print(f"  Report: {images.write(str(HARNESS_HOME / 'image-audit' / 'verify-landing-fresh.json'))}")
 
-    browser.close()
     print("\nDone!")